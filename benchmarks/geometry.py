@@ -0,0 +1,89 @@
+"""
+Time the polygon helpers used by the exporters.
+
+The area, bbox and RLE of random polygons on a large image are timed with `xtreme1.exporter.geometry`.
+If OpenCV is installed, the full-image `cv2.fillPoly` mask the COCO exporter used to build
+for every polygon is timed too, for comparison. Run it with the SDK installed (`pip install -e .`):
+
+    python benchmarks/geometry.py --width 3840 --height 2160 --polygons 200
+"""
+import sys
+import time
+import argparse
+
+import numpy as np
+
+from xtreme1.exporter.geometry import polygon_area, bounding_box, polygon_to_rle
+
+
+def _polygons(
+        count: int,
+        vertices: int,
+        size: float,
+        height: int,
+        width: int,
+        seed: int = 0
+):
+    # Star-shaped polygons, so they're simple, of about 'size' pixels across.
+    rng = np.random.default_rng(seed)
+    angles = np.sort(rng.uniform(0, 2 * np.pi, (count, vertices)), axis=1)
+    radii = rng.uniform(size / 4, size / 2, (count, vertices))
+    cx = rng.uniform(size / 2, width - size / 2, (count, 1))
+    cy = rng.uniform(size / 2, height - size / 2, (count, 1))
+    xs, ys = cx + radii * np.cos(angles), cy + radii * np.sin(angles)
+
+    return [[{'x': float(x), 'y': float(y)} for x, y in zip(px, py)] for px, py in zip(xs, ys)]
+
+
+def _time(
+        func,
+        polygons
+) -> float:
+    start = time.perf_counter()
+    for points in polygons:
+        func(points)
+
+    return (time.perf_counter() - start) / len(polygons) * 1000
+
+
+def _fill_poly(height: int, width: int):
+    import cv2
+
+    def area(points):
+        mask = np.zeros((height, width), dtype=np.int32)
+        contour = np.array([[p['x'], p['y']] for p in points], dtype=np.int32)
+        cv2.fillPoly(mask, [contour], 1)
+        return int(mask.sum())
+
+    return area
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--width', type=int, default=3840)
+    parser.add_argument('--height', type=int, default=2160)
+    parser.add_argument('--polygons', type=int, default=200)
+    parser.add_argument('--vertices', type=int, default=12)
+    parser.add_argument('--size', type=float, default=800, help='The rough width of a polygon in pixels.')
+    args = parser.parse_args()
+
+    polygons = _polygons(args.polygons, args.vertices, args.size, args.height, args.width)
+    timings = {
+        'polygon_area': _time(polygon_area, polygons),
+        'bounding_box': _time(bounding_box, polygons),
+        'polygon_to_rle': _time(lambda p: polygon_to_rle(p, args.height, args.width), polygons),
+    }
+    try:
+        timings['cv2.fillPoly mask'] = _time(_fill_poly(args.height, args.width), polygons)
+    except ImportError:
+        print('OpenCV is not installed, the old fillPoly path is not timed.')
+
+    print(f'{args.polygons} polygons of {args.vertices} vertices on a {args.width}x{args.height} image:')
+    for name, ms in timings.items():
+        print(f'  {name:<20} {ms:8.3f} ms per polygon')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Check that `import xtreme1` stays fast.
+
+Every run imports the SDK in a fresh interpreter and fails when the best time is over the budget,
+or when a heavy dependency that's only needed by some exporters is imported up front.
+
+    python benchmarks/import_time.py --budget 0.3
+"""
+import sys
+import argparse
+import subprocess
+
+# Only loaded when an exporter, a progress bar or an async model needs them.
+LAZY_MODULES = ['numpy', 'cv2', 'rich', 'xml.dom.minidom', 'aiohttp', 'asyncio', 'xtreme1.exporter.popular']
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import xtreme1
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(','.join(m for m in sys.argv[1:] if m in sys.modules))
+"""
+
+
+def _import_once():
+    out = subprocess.run(
+        [sys.executable, '-c', _PROBE, *LAZY_MODULES],
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout.splitlines()
+    elapsed = float(out[0])
+    loaded = [m for m in out[1].split(',') if m] if len(out) > 1 else []
+
+    return elapsed, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget', type=float, default=0.3, help='The most seconds `import xtreme1` may take.')
+    parser.add_argument('--repeat', type=int, default=5, help='The number of fresh interpreters to time.')
+    args = parser.parse_args()
+
+    results = [_import_once() for _ in range(max(1, args.repeat))]
+    best = min(elapsed for elapsed, _ in results)
+    loaded = sorted({m for _, modules in results for m in modules})
+
+    print(f'import xtreme1: best {best:.3f}s of {len(results)}, budget {args.budget:.3f}s')
+    failed = False
+    if best > args.budget:
+        print('Over budget!')
+        failed = True
+    if loaded:
+        print(f"Imported up front: {', '.join(loaded)}")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -23,5 +23,9 @@ setuptools.setup(
         'rich',
         'requests'
     ],
+    extras_require={
+        'async': ['aiohttp'],
+        'fast': ['orjson']
+    },
     python_requires='>=3.9',  # 对python的最低版本要求
 )
@@ -1,2 +1,9 @@
 from xtreme1.client import Client
-from xtreme1.exporter.converter import Result
+
+
+def __getattr__(name):
+    # `Result` brings in the whole exporter, so it's only imported when it's used.
+    if name == 'Result':
+        from xtreme1.exporter.converter import Result
+        return Result
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
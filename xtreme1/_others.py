@@ -1,4 +1,12 @@
+import json
 from functools import reduce
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    # orjson decodes several times faster, use it when it's installed.
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 
 # from typing import Union, List, Dict, Optional
@@ -118,3 +126,22 @@ def _parse_data_info(data_content: list):
         }
         datas.append(one_data)
     return datas
+
+
+def _iter_pages(fetch_page):
+    # `fetch_page(page_no)` returns a page dict with 'list' and 'total'.
+    # The next page is requested in the background while the current one is being consumed.
+    # Received items are counted instead of pages, since the server may cap the page size.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        page_no = 1
+        received = 0
+        future = executor.submit(fetch_page, page_no)
+        while future is not None:
+            page = future.result()
+            items = page.get('list') or []
+            received += len(items)
+            future = None
+            if items and received < page.get('total', 0):
+                future = executor.submit(fetch_page, page_no + 1)
+            page_no += 1
+            yield from items
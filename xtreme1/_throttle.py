@@ -0,0 +1,116 @@
+import time
+import random
+import threading
+from typing import Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket that allows `rate` calls per second with bursts up to `capacity`.
+
+    `reserve()` takes a token right away and returns how long the caller has to wait before
+    using it, so it works for threads (`acquire()`) and for coroutines
+    (`await asyncio.sleep(bucket.reserve())`) alike.
+    """
+
+    def __init__(
+            self,
+            rate: float,
+            capacity: Optional[float] = None
+    ):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(
+            self
+    ) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(
+            self
+    ):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before a failed request is sent again.
+
+    Idempotent requests are retried on connection errors, timeouts and 429/5xx responses.
+    Other requests (a 'POST' creates things) are only retried on 429, which means the server
+    didn't handle them. The wait is the server's 'Retry-After' when there is one, otherwise
+    a random ("full jitter") share of an exponentially growing backoff.
+    """
+    IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'})
+    RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+            self,
+            max_retries: int = 3,
+            backoff: float = 0.5,
+            max_backoff: float = 60.0
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def retry_status(
+            self,
+            method: str,
+            status: int,
+            attempt: int
+    ) -> bool:
+        if attempt >= self.max_retries or status not in self.RETRY_STATUS:
+            return False
+        return status == 429 or method.upper() in self.IDEMPOTENT_METHODS
+
+    def retry_error(
+            self,
+            method: str,
+            attempt: int
+    ) -> bool:
+        return attempt < self.max_retries and method.upper() in self.IDEMPOTENT_METHODS
+
+    def delay(
+            self,
+            attempt: int,
+            retry_after: Optional[str] = None
+    ) -> float:
+        seconds = _parse_retry_after(retry_after)
+        if seconds is not None:
+            return min(seconds, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+def _parse_retry_after(
+        value: Optional[str]
+) -> Optional[float]:
+    # 'Retry-After' is either a number of seconds or an http date.
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
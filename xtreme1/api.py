@@ -1,22 +1,133 @@
-from typing import List, Dict, Optional, Union
+import time
+from typing import List, Dict, Optional, Union, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from .exceptions import SDKException, EXCEPTIONS
+from ._throttle import TokenBucket, RetryPolicy
+
+DEFAULT_TIMEOUT = (10, 120)
+
+
+def _unpack(
+        info: Dict
+):
+    if info['code'] == 'OK':
+        return info['data']
+    else:
+        cur_exception = EXCEPTIONS.get(info['code'], SDKException)
+        raise cur_exception(code=info['code'], message=info['message'])
+
+
+def _rewindable(
+        kwargs: Dict
+) -> Tuple[bool, Optional[int]]:
+    # A request can only be sent again if its body can be sent again.
+    if kwargs.get('files'):
+        return False, None
+    body = kwargs.get('data')
+    if body is None or isinstance(body, (bytes, str, dict, list, tuple)):
+        return True, None
+    if hasattr(body, 'seek') and hasattr(body, 'tell'):
+        try:
+            return True, body.tell()
+        except OSError:
+            pass
+
+    return False, None
 
 
 class Api:
+    """
+    The http transport of `Client`.
+
+    Every request has a timeout. Failed idempotent requests (and any request answered
+    with 429) are retried with jittered exponential backoff, honouring 'Retry-After'.
+    With a 'rate_limit', calls to the Xtreme1 api are spread out by a token bucket
+    shared by all threads using this instance; object-store requests are not limited.
+    """
 
     def __init__(
             self,
             access_token: str,
-            base_url: str
+            base_url: str,
+            pool_size: int = 10,
+            keep_alive: bool = True,
+            timeout: Union[float, Tuple[float, float], None] = DEFAULT_TIMEOUT,
+            max_retries: int = 3,
+            backoff: float = 0.5,
+            rate_limit: Optional[float] = None
     ):
         self.access_token = access_token
         self._headers = {
             'Authorization': f'Bearer {access_token}'
         }
         self.base_url = base_url
+        self.pool_size = pool_size
+        self.session = self._build_session(pool_size, keep_alive)
+        self.timeout = timeout
+        self.retry_policy = RetryPolicy(max_retries=max_retries, backoff=backoff)
+        self.rate_limiter = TokenBucket(rate_limit) if rate_limit else None
+
+    @staticmethod
+    def _build_session(
+            pool_size: int,
+            keep_alive: bool
+    ) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if not keep_alive:
+            session.headers['Connection'] = 'close'
+
+        return session
+
+    def close(
+            self
+    ):
+        """
+        Close the underlying session and release all pooled connections.
+        """
+        self.session.close()
+
+    def _send(
+            self,
+            method: str,
+            url: str,
+            limited: bool = True,
+            retry: bool = True,
+            **kwargs
+    ) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        rewindable, position = _rewindable(kwargs)
+        retry = retry and rewindable
+        policy = self.retry_policy
+
+        attempt = 0
+        while True:
+            if limited and self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                resp = self.session.request(method=method, url=url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if not (retry and policy.retry_error(method, attempt)):
+                    raise
+                wait = policy.delay(attempt)
+            else:
+                if not (retry and policy.retry_status(method, resp.status_code, attempt)):
+                    return resp
+                wait = policy.delay(attempt, resp.headers.get('Retry-After'))
+                resp.close()
+
+            attempt += 1
+            time.sleep(wait)
+            if position is not None:
+                kwargs['data'].seek(position)
 
     def _base_request(
             self,
@@ -33,7 +144,7 @@ class Api:
         if not full_url:
             full_url = f'{self.base_url}/api/{endpoint}'
 
-        resp = requests.request(
+        resp = self._send(
             method=method,
             url=full_url,
             headers=headers,
@@ -44,12 +155,7 @@ class Api:
         )
 
         if resp.status_code == 200:
-            info = resp.json()
-            if info['code'] == 'OK':
-                return info['data']
-            else:
-                cur_exception = EXCEPTIONS.get(info['code'], SDKException)
-                raise cur_exception(code=info['code'], message=info['message'])
+            return _unpack(resp.json())
         else:
             raise EXCEPTIONS.get(resp.status_code, SDKException(code=resp.status_code))
 
@@ -132,3 +238,39 @@ class Api:
             files=files,
             full_url=full_url
         )
+
+    def file_request(
+            self,
+            method: str,
+            url: str,
+            retry: bool = True,
+            **kwargs
+    ) -> requests.Response:
+        """
+        Send a request to an object-store url (e.g. a presigned upload or download url).
+        No authorization header is attached and the raw response is returned.
+        It has the same timeout and retries as api calls, but isn't rate limited.
+
+        Parameters
+        ----------
+        method: str
+            'GET', 'PUT', 'HEAD' and so on.
+        url: str
+            A complete url.
+        retry: bool, default True
+            Retry failed requests. Set it to False if the caller retries by itself.
+        kwargs:
+            Other arguments accepted by `requests.Session.request`.
+
+        Returns
+        -------
+        requests.Response
+            The raw response.
+        """
+        return self._send(
+            method=method,
+            url=url,
+            limited=False,
+            retry=retry,
+            **kwargs
+        )
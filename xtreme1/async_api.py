@@ -0,0 +1,248 @@
+import asyncio
+from typing import List, Dict, Optional, Union, Tuple
+
+import aiohttp
+
+from .api import _unpack, _rewindable, DEFAULT_TIMEOUT
+from .exceptions import SDKException, EXCEPTIONS
+from ._throttle import TokenBucket, RetryPolicy
+
+
+def _to_query(
+        params: Optional[Dict]
+) -> List[Tuple[str, str]]:
+    # Encode params the way `requests` does: drop None values and repeat the key for list values.
+    query = []
+    if not params:
+        return query
+    for k, v in params.items():
+        if v is None:
+            continue
+        if isinstance(v, (list, tuple)):
+            query.extend((k, str(x)) for x in v)
+        else:
+            query.append((k, str(v)))
+
+    return query
+
+
+def _client_timeout(
+        timeout: Union[float, Tuple[float, float], None]
+) -> aiohttp.ClientTimeout:
+    # Same meaning as in `requests`: a (connect, read) pair or one value for both.
+    if timeout is None:
+        return aiohttp.ClientTimeout(total=None)
+    if isinstance(timeout, (list, tuple)):
+        connect, read = timeout
+    else:
+        connect = read = timeout
+
+    return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+
+
+class _RetryingRequest:
+    # An async context manager like the one of `aiohttp.ClientSession.request`,
+    # which sends the request again as the `RetryPolicy` of the api says.
+
+    def __init__(
+            self,
+            api,
+            method: str,
+            url: str,
+            limited: bool,
+            retry: bool,
+            kwargs: Dict
+    ):
+        self._api = api
+        self._method = method
+        self._url = url
+        self._limited = limited
+        self._kwargs = kwargs
+        rewindable, self._position = _rewindable(kwargs)
+        self._retry = retry and rewindable
+        self._resp = None
+
+    async def __aenter__(self) -> aiohttp.ClientResponse:
+        api = self._api
+        policy = api.retry_policy
+
+        attempt = 0
+        while True:
+            if self._limited and api.rate_limiter:
+                await asyncio.sleep(api.rate_limiter.reserve())
+            try:
+                resp = await api.session.request(method=self._method, url=self._url, **self._kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not (self._retry and policy.retry_error(self._method, attempt)):
+                    raise
+                wait = policy.delay(attempt)
+            else:
+                if not (self._retry and policy.retry_status(self._method, resp.status, attempt)):
+                    self._resp = resp
+                    return resp
+                wait = policy.delay(attempt, resp.headers.get('Retry-After'))
+                resp.release()
+
+            attempt += 1
+            await asyncio.sleep(wait)
+            if self._position is not None:
+                self._kwargs['data'].seek(self._position)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._resp is not None:
+            self._resp.release()
+
+
+class AsyncApi:
+    """
+    The http transport of `AsyncClient`, with the same timeout, retries and rate limit as `Api`.
+    """
+
+    def __init__(
+            self,
+            access_token: str,
+            base_url: str,
+            pool_size: int = 100,
+            keep_alive: bool = True,
+            timeout: Union[float, Tuple[float, float], None] = DEFAULT_TIMEOUT,
+            max_retries: int = 3,
+            backoff: float = 0.5,
+            rate_limit: Optional[float] = None
+    ):
+        self.access_token = access_token
+        self._headers = {
+            'Authorization': f'Bearer {access_token}'
+        }
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self._session = None
+        self.timeout = timeout
+        self.retry_policy = RetryPolicy(max_retries=max_retries, backoff=backoff)
+        self.rate_limiter = TokenBucket(rate_limit) if rate_limit else None
+
+    @property
+    def session(
+            self
+    ) -> aiohttp.ClientSession:
+        """
+        The shared `aiohttp.ClientSession`.
+        It's created on first use so that it's bound to the running event loop.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                force_close=not self.keep_alive
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=_client_timeout(self.timeout)
+            )
+
+        return self._session
+
+    async def close(
+            self
+    ):
+        """
+        Close the underlying session and release all pooled connections.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _base_request(
+            self,
+            method: str,
+            headers: Dict,
+            endpoint: str,
+            params: Optional[Dict] = None,
+            data: Optional[Dict] = None,
+            json: Optional[Dict] = None,
+            full_url: Optional[str] = None
+    ):
+
+        if not full_url:
+            full_url = f'{self.base_url}/api/{endpoint}'
+
+        kwargs = {
+            'headers': headers or None,
+            'params': _to_query(params),
+            'data': data,
+            'json': json
+        }
+        async with _RetryingRequest(self, method, full_url, True, True, kwargs) as resp:
+            if resp.status == 200:
+                return _unpack(await resp.json(content_type=None))
+            else:
+                raise EXCEPTIONS.get(resp.status, SDKException(code=resp.status))
+
+    async def get_request(
+            self,
+            endpoint: str,
+            params: Optional[Dict] = None,
+            headers: bool = True,
+            full_url: Optional[str] = None
+    ) -> Union[Dict, List[Dict]]:
+        """
+        An awaitable 'GET' method. See `Api.get_request`.
+        """
+        if headers:
+            headers = self._headers
+        return await self._base_request(
+            method='GET',
+            headers=headers,
+            endpoint=endpoint,
+            params=params,
+            full_url=full_url
+        )
+
+    async def post_request(
+            self,
+            endpoint: str,
+            payload: Optional[Dict] = None,
+            data: Optional[Dict] = None,
+            headers: bool = True,
+            full_url: Optional[str] = None
+    ) -> Union[str, Dict, None, bool]:
+        """
+        An awaitable 'POST' method. See `Api.post_request`.
+        """
+        if headers:
+            headers = self._headers
+        return await self._base_request(
+            method='POST',
+            headers=headers,
+            endpoint=endpoint,
+            data=data,
+            json=payload,
+            full_url=full_url
+        )
+
+    def file_request(
+            self,
+            method: str,
+            url: str,
+            retry: bool = True,
+            **kwargs
+    ):
+        """
+        Send a request to an object-store url. Use it as an async context manager::
+
+            async with api.file_request('GET', url) as resp:
+                content = await resp.read()
+
+        It has the same timeout and retries as api calls, but isn't rate limited.
+
+        Parameters
+        ----------
+        method: str
+            'GET', 'PUT', 'HEAD' and so on.
+        url: str
+            A complete url.
+        retry: bool, default True
+            Retry failed requests.
+        kwargs:
+            Other arguments accepted by `aiohttp.ClientSession.request`.
+        """
+        return _RetryingRequest(self, method, url, False, retry, kwargs)
@@ -0,0 +1,542 @@
+import os
+import asyncio
+from typing import List, Dict, Optional, Union, Iterable, AsyncIterator, Tuple
+from datetime import datetime
+
+from .api import DEFAULT_TIMEOUT
+from .async_api import AsyncApi
+from .cache import TTLCache, _as_cache
+from .client import Client, QUERY_BATCH_SIZE, _join_data_and_result, _batches
+from .dataset import AsyncDataset
+from .downloader import AsyncDownloader
+from .exceptions import SDKException, ParamException, DatasetIdException
+from .exporter.annotation import Annotation
+from .models import AsyncImageModel, AsyncPointCloudModel
+from ._others import _to_single, _parse_data_info
+
+
+class AsyncClient:
+    """
+    An asyncio version of `Client`.
+    Every network method is a coroutine and shares one `aiohttp` connection pool,
+    so thousands of requests can be in flight from one event loop.
+    It returns `AsyncDataset` objects, whose network methods are coroutines too,
+    and the same `Annotation` objects as `Client`.
+    """
+
+    def __init__(
+            self,
+            access_token: str,
+            base_url: str,
+            pool_size: int = 100,
+            keep_alive: bool = True,
+            cache_dir: Optional[str] = None,
+            cache_size: Optional[int] = None,
+            timeout: Union[float, Tuple[float, float], None] = DEFAULT_TIMEOUT,
+            max_retries: int = 3,
+            rate_limit: Optional[float] = None,
+            metadata_ttl: Optional[float] = 300
+    ):
+        self.api = AsyncApi(
+            access_token=access_token,
+            base_url=base_url,
+            pool_size=pool_size,
+            keep_alive=keep_alive,
+            timeout=timeout,
+            max_retries=max_retries,
+            rate_limit=rate_limit
+        )
+        self.cache = _as_cache(cache_dir, cache_size)
+        self.dataset_info = TTLCache(metadata_ttl)
+        self.image_model = AsyncImageModel(self)
+        self.point_cloud_model = AsyncPointCloudModel(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(
+            self
+    ):
+        """
+        Close the pooled http connections of this client.
+        """
+        await self.api.close()
+
+    async def _query_dataset_info(
+            self,
+            dataset_id: Union[int, str]
+    ) -> Dict:
+        info = self.dataset_info.get(str(dataset_id))
+        if info is None:
+            endpoint = f'dataset/info/{dataset_id}'
+            info = await self.api.get_request(endpoint=endpoint, params=None)
+            self.dataset_info.put(str(dataset_id), info)
+
+        return info
+
+    def _to_dataset(
+            self,
+            org_json: Dict
+    ) -> AsyncDataset:
+        # The datasets listed by the server come with the same info as 'dataset/info'.
+        self.dataset_info.put(str(org_json.get('id')), org_json)
+        return AsyncDataset(org_json, self)
+
+    async def edit_dataset(
+            self,
+            dataset_id: Union[int, str],
+            new_name: str,
+            new_description: Optional[str] = None
+    ) -> bool:
+        """
+        Awaitable version of `Client.edit_dataset`.
+        """
+        endpoint = f'dataset/update/{dataset_id}'
+        payload = {
+            'name': new_name,
+            'description': new_description
+        }
+
+        await self.api.post_request(endpoint, payload=payload)
+        self.dataset_info.invalidate(str(dataset_id))
+
+        return True
+
+    async def delete_dataset(
+            self,
+            dataset_id: Union[int, str],
+            is_sure: bool = False
+    ) -> bool:
+        """
+        Awaitable version of `Client.delete_dataset`.
+        """
+        if not is_sure:
+            return False
+
+        try:
+            endpoint = f'dataset/delete/{dataset_id}'
+            await self.api.post_request(
+                endpoint=endpoint,
+                payload=None
+            )
+        except DatasetIdException:
+            return False
+        finally:
+            self.dataset_info.invalidate(str(dataset_id))
+
+        return True
+
+    async def _query_the_list_of_datasets(
+            self,
+            page_no: int,
+            page_size: int,
+            name: Optional[str] = None,
+            create_start_time: Optional[Iterable] = None,
+            create_end_time: Optional[Iterable] = None,
+            sort_by: Optional[str] = None,
+            ascending: Optional[bool] = True,
+            dataset_type: Optional[str] = None
+    ) -> Dict:
+        endpoint = 'dataset/findByPage'
+
+        create_start_time = datetime(*create_start_time) if create_start_time else datetime(1000, 1, 1)
+        create_end_time = datetime(*create_end_time) if create_end_time else datetime.today()
+
+        params = {
+            'pageNo': page_no,
+            'pageSize': page_size,
+            'name': name,
+            'createStartTime': create_start_time,
+            'createEndTime': create_end_time,
+            'sortField': sort_by,
+            'ascOrDesc': 'ASC' if ascending else 'DESC',
+            'type': dataset_type
+        }
+
+        return await self.api.get_request(endpoint=endpoint, params=params)
+
+    async def query_dataset(
+            self,
+            dataset_id: Union[int, str, None] = None,
+            page_no: int = 1,
+            page_size: int = 10,
+            dataset_name: Optional[str] = None,
+            create_start_time: Optional[Iterable] = None,
+            create_end_time: Optional[Iterable] = None,
+            sort_by: str = 'CREATED_AT',
+            ascending: Optional[bool] = True,
+            dataset_type: Optional[str] = None
+    ) -> Tuple[List[AsyncDataset], int]:
+        """
+        Awaitable version of `Client.query_dataset`.
+        """
+        if dataset_id:
+            dataset_name = (await self._query_dataset_info(dataset_id))['name']
+
+        resp = await self._query_the_list_of_datasets(
+            page_no=page_no,
+            page_size=page_size,
+            name=dataset_name,
+            create_start_time=create_start_time,
+            create_end_time=create_end_time,
+            sort_by=sort_by,
+            ascending=ascending,
+            dataset_type=dataset_type
+        )
+
+        datasets = [self._to_dataset(d) for d in resp['list']]
+        total = resp['total']
+
+        return _to_single(datasets, total)
+
+    @staticmethod
+    def _data_page_params(
+            dataset_id: Union[int, str],
+            page_no: int,
+            page_size: int,
+            name: Optional[str] = None,
+            create_start_time: Optional[Iterable] = None,
+            create_end_time: Optional[Iterable] = None,
+            sort_by: str = 'CREATED_AT',
+            ascending: Optional[bool] = True,
+            annotation_status: Optional[str] = None
+    ) -> Dict:
+        create_start_time = datetime(*create_start_time) if create_start_time else datetime(1000, 1, 1)
+        create_end_time = datetime(*create_end_time) if create_end_time else datetime.today()
+
+        return {
+            'datasetId': dataset_id,
+            'pageNo': page_no,
+            'pageSize': page_size,
+            'name': name,
+            'createStartTime': create_start_time,
+            'createEndTime': create_end_time,
+            'sortField': sort_by,
+            'ascOrDesc': 'ASC' if ascending else 'DESC',
+            'annotationStatus': annotation_status
+        }
+
+    async def query_data_under_dataset(
+            self,
+            dataset_id: Union[int, str],
+            page_no: int = 1,
+            page_size: int = 10,
+            name: Optional[str] = None,
+            create_start_time: Optional[Iterable] = None,
+            create_end_time: Optional[Iterable] = None,
+            sort_by: str = 'CREATED_AT',
+            ascending: Optional[bool] = True,
+            annotation_status: Optional[str] = None
+    ) -> Dict:
+        """
+        Awaitable version of `Client.query_data_under_dataset`.
+        """
+        params = self._data_page_params(
+            dataset_id=dataset_id,
+            page_no=page_no,
+            page_size=page_size,
+            name=name,
+            create_start_time=create_start_time,
+            create_end_time=create_end_time,
+            sort_by=sort_by,
+            ascending=ascending,
+            annotation_status=annotation_status
+        )
+
+        resp = await self.api.get_request(endpoint='data/findByPage', params=params)
+
+        rps_dict = {
+            "pageSize": resp.get('pageSize'),
+            "pageNo": resp.get('pageNo'),
+            "total": resp.get('total'),
+            "datas": _parse_data_info(resp.get('list'))
+        }
+
+        return rps_dict
+
+    async def iter_data_under_dataset(
+            self,
+            dataset_id: Union[int, str],
+            page_size: int = 1000,
+            **kwargs
+    ) -> AsyncIterator[Dict]:
+        """
+        Async version of `Client.iter_data_under_dataset`.
+        The next page is requested in the background while the current one is being consumed.
+        """
+
+        async def fetch_page(page_no):
+            return await self.api.get_request(
+                endpoint='data/findByPage',
+                params=self._data_page_params(dataset_id, page_no, page_size, **kwargs)
+            )
+
+        page_no = 1
+        received = 0
+        task = asyncio.ensure_future(fetch_page(page_no))
+        try:
+            while task is not None:
+                page = await task
+                items = page.get('list') or []
+                received += len(items)
+                task = None
+                # Received items are counted instead of pages, since the server may cap the page size.
+                if items and received < page.get('total', 0):
+                    task = asyncio.ensure_future(fetch_page(page_no + 1))
+                page_no += 1
+                for item in items:
+                    yield item
+        finally:
+            # The consumer stopped early: don't leave the prefetch of the next page behind.
+            if task is not None:
+                task.cancel()
+
+    async def query_data(
+            self,
+            data_id: Union[int, List[int]]
+    ) -> List[Dict]:
+        """
+        Awaitable version of `Client.query_data`.
+        """
+        endpoint = 'data/listByIds'
+
+        if type(data_id) == str:
+            data_id = int(data_id)
+        if not isinstance(data_id, list):
+            data_id = [data_id]
+        params = {
+            'dataIds': data_id
+        }
+
+        return await self.api.get_request(endpoint=endpoint, params=params)
+
+    async def _generate_data_direct_upload_address(
+            self,
+            data_name: str,
+            dataset_id: Union[int, str]
+    ) -> Dict:
+        endpoint = 'data/generatePresignedUrl'
+
+        params = {
+            'fileName': data_name,
+            'datasetId': dataset_id
+        }
+
+        return await self.api.get_request(endpoint=endpoint, params=params)
+
+    async def _upload(
+            self,
+            url: str,
+            dataset_id: Union[int, str],
+            source: str
+    ) -> str:
+        endpoint = 'data/upload'
+
+        payload = {
+            'fileUrl': url,
+            'datasetId': dataset_id,
+            'source': source
+        }
+
+        return await self.api.post_request(endpoint=endpoint, payload=payload)
+
+    async def upload_data(
+            self,
+            data_path: str,
+            dataset_id: Union[int, str],
+            is_local: bool = True
+    ) -> str:
+        """
+        Awaitable version of `Client.upload_data`.
+        """
+        if is_local:
+            data_name = os.path.split(data_path)[-1]
+            url_dict = await self._generate_data_direct_upload_address(data_name, dataset_id)
+            with open(data_path, 'rb') as f:
+                async with self.api.file_request('PUT', url_dict['presignedUrl'], data=f) as put_resp:
+                    if put_resp.status != 200:
+                        raise SDKException(code=put_resp.status, message=await put_resp.text())
+
+            upload_url = url_dict['accessUrl']
+            source = 'LOCAL'
+
+        else:
+            upload_url = data_path
+            source = 'URL'
+
+        return await self._upload(upload_url, dataset_id, source)
+
+    async def query_upload_status(
+            self,
+            serial_numbers: Union[str, List[str]]
+    ) -> List[Dict]:
+        """
+        Awaitable version of `Client.query_upload_status`.
+        """
+        endpoint = 'data/findUploadRecordBySerialNumbers'
+
+        params = {
+            'serialNumbers': serial_numbers
+        }
+
+        return await self.api.get_request(endpoint=endpoint, params=params)
+
+    async def download_data(
+            self,
+            output_folder: str,
+            data_id: Union[int, List[int], None] = None,
+            dataset_id: Union[int, str, None] = None,
+            remain_directory_structure: bool = True,
+            concurrency: int = 16,
+            chunk_size: int = 1 << 20
+    ) -> Union[str, Dict]:
+        """
+        Awaitable version of `Client.download_data`.
+        Files are downloaded concurrently, at most `concurrency` at a time,
+        and the same report is returned.
+        """
+        if data_id:
+            if not isinstance(data_id, list):
+                data_id = [data_id]
+        else:
+            if dataset_id:
+                data_id = [x['id'] async for x in self.iter_data_under_dataset(dataset_id)]
+            else:
+                raise ParamException(message='You need to pass either data_id or dataset_id !!!')
+
+        batches = await asyncio.gather(*[
+            self.query_data(data_id[i: i + QUERY_BATCH_SIZE])
+            for i in range(0, len(data_id), QUERY_BATCH_SIZE)
+        ])
+
+        total_list = []
+        Client._recursive_search_url(
+            data=batches,
+            output_folder=output_folder,
+            total=total_list,
+            remain_directory_structure=remain_directory_structure,
+        )
+
+        if not total_list:
+            return 'No data'
+
+        downloader = AsyncDownloader(
+            api=self.api,
+            workers=concurrency,
+            chunk_size=chunk_size,
+            cache=self.cache
+        )
+
+        return await downloader.download(
+            files=total_list,
+            output_folder=output_folder,
+            remain_directory_structure=remain_directory_structure
+        )
+
+    async def query_classes_stat(
+            self,
+            dataset_id: Union[int, str]
+    ) -> Dict:
+        """
+        Awaitable version of `Client.query_classes_stat`.
+        """
+        endpoint = f'dataset/{dataset_id}/statistics/classObject'
+
+        return await self.api.get_request(
+            endpoint=endpoint
+        )
+
+    async def _get_data_and_result_info(
+            self,
+            dataset_id: Union[int, str],
+            data_ids: Union[int, List[int], None] = None
+    ) -> Dict:
+        endpoint = 'data/getDataAndResult'
+
+        params = {
+            'datasetId': dataset_id,
+            'dataIds': data_ids
+        }
+
+        return await self.api.get_request(endpoint=endpoint, params=params)
+
+    async def _data_ids_to_query(
+            self,
+            dataset_id: Union[int, str],
+            data_ids: Union[int, List[int], None],
+            limit: Optional[int]
+    ) -> List[int]:
+        if data_ids is not None:
+            return (data_ids if isinstance(data_ids, list) else [data_ids])[:limit]
+        if limit == 0:
+            return []
+        page_size = min(limit, 1000) if limit else 1000
+        listed = self.iter_data_under_dataset(dataset_id, page_size=page_size)
+        ids = []
+        try:
+            async for data in listed:
+                if limit is not None and len(ids) >= limit:
+                    break
+                ids.append(data['id'])
+        finally:
+            await listed.aclose()
+
+        return ids
+
+    async def query_data_and_result(
+            self,
+            dataset_id: Union[int, str],
+            data_ids: Union[int, List[int], None] = None,
+            limit: Optional[int] = 5000,
+            dropna: bool = False,
+            columnar: bool = False,
+            batch_size: Optional[int] = QUERY_BATCH_SIZE,
+            concurrency: int = 4
+    ) -> Annotation:
+        """
+        Awaitable version of `Client.query_data_and_result`.
+        At most 'concurrency' batches are fetched at the same time.
+        """
+        ids, info = await asyncio.gather(
+            self._data_ids_to_query(dataset_id, data_ids, limit) if batch_size is not None else asyncio.sleep(0),
+            self._query_dataset_info(dataset_id)
+        )
+        if batch_size is None:
+            responses = [await self._get_data_and_result_info(dataset_id, data_ids)]
+        elif not ids:
+            return Annotation(
+                client=self,
+                annotation=[],
+                dataset_name=info['name'],
+                dataset_id=dataset_id,
+                dataset_type=info['type'],
+                columnar=columnar
+            )
+        else:
+            semaphore = asyncio.Semaphore(max(1, concurrency))
+
+            async def _bounded(batch):
+                async with semaphore:
+                    return await self._get_data_and_result_info(dataset_id, batch)
+
+            responses = await asyncio.gather(*[_bounded(batch) for batch in _batches(ids, batch_size)])
+
+        resp = responses[0]
+        annotation = [item for r in responses for item in _join_data_and_result(r)][:limit]
+
+        if dropna:
+            annotation = list(filter(lambda x: x['result'], annotation))
+
+        return Annotation(
+            client=self,
+            annotation=annotation,
+            dataset_name=resp['datasetName'],
+            version=resp['version'],
+            dataset_id=resp['datasetId'],
+            export_time=resp['exportTime'],
+            columnar=columnar,
+            dataset_type=info['type']
+        )
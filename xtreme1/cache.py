@@ -0,0 +1,352 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+from typing import Optional, Union, List, Tuple
+
+META_SUFFIX = '.meta'
+
+
+def _stable_url(
+        url: str
+) -> str:
+    # Presigned urls of the same object differ only in their query string.
+    return url.split('?')[0]
+
+
+def _blob_path(
+        directory: str,
+        url: str
+) -> str:
+    key = hashlib.sha256(_stable_url(url).encode()).hexdigest()
+    ext = os.path.splitext(_stable_url(url).split('/')[-1])[1]
+
+    return os.path.join(directory, key[:2], key + ext)
+
+
+class BlobCache:
+    """
+    An on-disk cache of data files, shared by downloads and exports.
+
+    A file is keyed by the hash of its url without the query string, so the ever changing
+    presigned urls of one object all hit the same entry. Next to every blob a small '.meta'
+    file records its url, size, ETag and inode; an entry whose blob doesn't match its recorded
+    size and inode, or the size and ETag the caller expects, is a miss.
+
+    Writes go to a unique temporary file that is renamed into place, so several threads or
+    processes can share one cache folder. Reading an entry refreshes its mtime, and once the
+    cache grows over 'max_size' bytes the least recently used entries are evicted.
+    """
+
+    def __init__(
+            self,
+            directory: str,
+            max_size: Optional[int] = None
+    ):
+        self.directory = directory
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._size = None
+        os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self):
+        return f"BlobCache(directory={self.directory}, max_size={self.max_size})"
+
+    def path(
+            self,
+            url: str
+    ) -> str:
+        """
+        The path a url is (or would be) cached at. The extension of the original file is kept.
+        """
+        return _blob_path(self.directory, url)
+
+    def _read_meta(
+            self,
+            blob_path: str
+    ) -> Optional[dict]:
+        try:
+            with open(blob_path + META_SUFFIX, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get(
+            self,
+            url: str,
+            size: Optional[int] = None,
+            etag: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Look a url up.
+
+        Parameters
+        ----------
+        url: str
+            The url of the file, with or without its query string.
+        size: Optional[int], default None
+            The expected size in bytes, if it's known.
+        etag: Optional[str], default None
+            The expected ETag, if it's known.
+
+        Returns
+        -------
+        Optional[str]
+            The path of the cached file, or None on a miss.
+        """
+        blob_path = self.path(url)
+        meta = self._read_meta(blob_path)
+        if meta is None:
+            return None
+        try:
+            stat = os.stat(blob_path)
+        except OSError:
+            return None
+        actual_size = stat.st_size
+        if actual_size != meta.get('size'):
+            return None
+        # A blob and a '.meta' committed by two different writers don't belong together.
+        if meta.get('ino') is not None and stat.st_ino != meta['ino']:
+            return None
+        if size is not None and size != actual_size:
+            return None
+        if etag and meta.get('etag') and etag != meta['etag']:
+            return None
+
+        try:
+            os.utime(blob_path)
+        except OSError:
+            return None
+
+        return blob_path
+
+    def read(
+            self,
+            url: str,
+            size: Optional[int] = None,
+            etag: Optional[str] = None
+    ) -> Optional[bytes]:
+        blob_path = self.get(url, size=size, etag=etag)
+        if blob_path is None:
+            return None
+        try:
+            with open(blob_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _commit(
+            self,
+            url: str,
+            tmp_path: str,
+            etag: Optional[str]
+    ) -> str:
+        blob_path = self.path(url)
+        stat = os.stat(tmp_path)
+        size = stat.st_size
+        # The inode of the blob survives the rename, so a reader can tell whether
+        # the '.meta' next to a blob was written for that very blob.
+        meta = {
+            'url': _stable_url(url),
+            'size': size,
+            'etag': etag,
+            'ino': stat.st_ino or None
+        }
+        meta_tmp = f'{tmp_path}{META_SUFFIX}'
+        with open(meta_tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        with self._lock:
+            os.replace(tmp_path, blob_path)
+            os.replace(meta_tmp, blob_path + META_SUFFIX)
+            if self._size is not None:
+                self._size += size
+        if self.max_size is not None and self.size > self.max_size:
+            self.evict()
+
+        return blob_path
+
+    def _tmp_path(
+            self,
+            url: str
+    ) -> str:
+        blob_path = self.path(url)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        return f'{blob_path}.{uuid.uuid4().hex}.tmp'
+
+    def put(
+            self,
+            url: str,
+            content: bytes,
+            etag: Optional[str] = None
+    ) -> str:
+        """
+        Cache some bytes for a url.
+
+        Returns
+        -------
+        str
+            The path of the cached file.
+        """
+        tmp_path = self._tmp_path(url)
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+
+        return self._commit(url, tmp_path, etag)
+
+    def put_file(
+            self,
+            url: str,
+            file_path: str,
+            etag: Optional[str] = None
+    ) -> str:
+        """
+        Cache a copy of a local file for a url.
+
+        Returns
+        -------
+        str
+            The path of the cached file.
+        """
+        tmp_path = self._tmp_path(url)
+        shutil.copyfile(file_path, tmp_path)
+
+        return self._commit(url, tmp_path, etag)
+
+    def _entries(
+            self
+    ) -> List[Tuple[float, int, str]]:
+        entries = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(META_SUFFIX) or name.endswith('.tmp'):
+                    continue
+                blob_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(blob_path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, blob_path))
+
+        return entries
+
+    @property
+    def size(
+            self
+    ) -> int:
+        """
+        The total size of the cached files in bytes.
+        It's counted once and then kept up to date by this instance's own writes.
+        """
+        with self._lock:
+            if self._size is None:
+                self._size = sum(entry[1] for entry in self._entries())
+            return self._size
+
+    def evict(
+            self,
+            target: Optional[int] = None
+    ):
+        """
+        Remove the least recently used files until the cache is under 'target' bytes,
+        90% of 'max_size' by default.
+        """
+        if target is None:
+            if self.max_size is None:
+                return
+            target = int(self.max_size * 0.9)
+
+        entries = sorted(self._entries())
+        total = sum(entry[1] for entry in entries)
+        for _, size, blob_path in entries:
+            if total <= target:
+                break
+            for path in (blob_path + META_SUFFIX, blob_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+        with self._lock:
+            self._size = total
+
+    def clear(
+            self
+    ):
+        """
+        Remove every cached file.
+        """
+        self.evict(target=0)
+
+
+class TTLCache:
+    """
+    A small thread-safe in-memory cache whose entries expire 'ttl' seconds after they're stored.
+    It keeps metadata that rarely changes, like the name and type of a dataset, so that it isn't
+    requested again and again. A 'ttl' of None keeps entries until they're invalidated,
+    and 0 turns the cache off.
+    """
+
+    def __init__(
+            self,
+            ttl: Optional[float] = 300
+    ):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"TTLCache(ttl={self.ttl}, entries={len(self._entries)})"
+
+    def get(
+            self,
+            key
+    ):
+        """
+        The value stored for a key, or None if there's none or it has expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and time.monotonic() >= expires:
+                del self._entries[key]
+                return None
+            return value
+
+    def put(
+            self,
+            key,
+            value
+    ):
+        if self.ttl == 0:
+            return
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+
+    def invalidate(
+            self,
+            key
+    ):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(
+            self
+    ):
+        with self._lock:
+            self._entries.clear()
+
+
+def _as_cache(
+        cache: Union[str, BlobCache, None],
+        max_size: Optional[int] = None
+) -> Optional[BlobCache]:
+    if cache is None or isinstance(cache, BlobCache):
+        return cache
+    return BlobCache(cache, max_size=max_size)
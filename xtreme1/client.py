@@ -1,18 +1,42 @@
 import os
-from pathlib import Path
-from typing import List, Dict, Optional, Union, Iterable, Tuple
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Union, Iterable, Iterator, Tuple, Callable
 from datetime import datetime
 
-import requests
-from rich.progress import track
-
-from .api import Api
+from .api import Api, DEFAULT_TIMEOUT
 from .dataset import Dataset
+from .cache import TTLCache, _as_cache
+from .downloader import Downloader
 from .exceptions import SDKException, ParamException, DatasetIdException, DataIdException
 from .exporter.annotation import Annotation
 from .models import ImageModel, PointCloudModel
 from .ontology.ontology import Ontology
-from ._others import _to_single, _parse_data_info
+from .sync import LocalStore, sync_dataset, _annotation_of
+from .uploader import Uploader, UploadTracker
+from ._others import _to_single, _parse_data_info, _iter_pages
+
+QUERY_BATCH_SIZE = 100
+
+
+def _join_data_and_result(
+        resp: Dict
+) -> List[Dict]:
+    result_dict = {result['dataId']: result for result in resp['results']}
+    return [
+        {
+            'data': data,
+            'result': result_dict.get(data['id'], {})
+        }
+        for data in resp['data']
+    ]
+
+
+def _batches(
+        ids: List[int],
+        batch_size: int
+) -> List[List[int]]:
+    return [ids[i: i + batch_size] for i in range(0, len(ids), batch_size)]
 
 
 class Client:
@@ -20,12 +44,44 @@ class Client:
     def __init__(
             self,
             access_token: str,
-            base_url: str
+            base_url: str,
+            pool_size: int = 10,
+            keep_alive: bool = True,
+            cache_dir: Optional[str] = None,
+            cache_size: Optional[int] = None,
+            timeout: Union[float, Tuple[float, float], None] = DEFAULT_TIMEOUT,
+            max_retries: int = 3,
+            rate_limit: Optional[float] = None,
+            metadata_ttl: Optional[float] = 300
     ):
-        self.api = Api(access_token=access_token, base_url=base_url)
+        self.api = Api(
+            access_token=access_token,
+            base_url=base_url,
+            pool_size=pool_size,
+            keep_alive=keep_alive,
+            timeout=timeout,
+            max_retries=max_retries,
+            rate_limit=rate_limit
+        )
+        self.cache = _as_cache(cache_dir, cache_size)
+        self.dataset_info = TTLCache(metadata_ttl)
         self.image_model = ImageModel(self)
         self.point_cloud_model = PointCloudModel(self)
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(
+            self
+    ):
+        """
+        Close the pooled http connections of this client.
+        """
+        self.api.close()
+
     def create_dataset(
             self, name: str,
             annotation_type: str,
@@ -58,7 +114,7 @@ class Client:
 
         resp = self.api.post_request(endpoint, payload=payload)
 
-        return Dataset(resp, self)
+        return self._to_dataset(resp)
 
     def edit_dataset(
             self,
@@ -92,6 +148,7 @@ class Client:
         }
 
         self.api.post_request(endpoint, payload=payload)
+        self.dataset_info.invalidate(str(dataset_id))
 
         return True
 
@@ -129,6 +186,8 @@ class Client:
             )
         except DatasetIdException:
             return False
+        finally:
+            self.dataset_info.invalidate(str(dataset_id))
 
         return True
 
@@ -136,10 +195,22 @@ class Client:
             self,
             dataset_id: Union[int, str]
     ) -> Dict:
-        endpoint = f'dataset/info/{dataset_id}'
-        resp = self.api.get_request(endpoint=endpoint, params=None)
+        # Dataset info rarely changes, so it's kept in 'dataset_info' for 'metadata_ttl' seconds.
+        info = self.dataset_info.get(str(dataset_id))
+        if info is None:
+            endpoint = f'dataset/info/{dataset_id}'
+            info = self.api.get_request(endpoint=endpoint, params=None)
+            self.dataset_info.put(str(dataset_id), info)
 
-        return resp
+        return info
+
+    def _to_dataset(
+            self,
+            org_json: Dict
+    ) -> Dataset:
+        # The datasets listed by the server come with the same info as 'dataset/info'.
+        self.dataset_info.put(str(org_json.get('id')), org_json)
+        return Dataset(org_json, self)
 
     def _query_the_list_of_datasets(
             self,
@@ -238,11 +309,103 @@ class Client:
             dataset_type=dataset_type
         )
 
-        datasets = [Dataset(d, self) for d in resp['list']]
+        datasets = [self._to_dataset(d) for d in resp['list']]
         total = resp['total']
 
         return _to_single(datasets, total)
 
+    def iter_datasets(
+            self,
+            page_size: int = 100,
+            dataset_name: Optional[str] = None,
+            create_start_time: Optional[Iterable] = None,
+            create_end_time: Optional[Iterable] = None,
+            sort_by: str = 'CREATED_AT',
+            ascending: Optional[bool] = True,
+            dataset_type: Optional[str] = None
+    ) -> Iterator[Dataset]:
+        """
+        Iterate over all datasets that match the filters, page by page.
+        The next page is fetched in the background while you are consuming the current one.
+
+        Parameters
+        ----------
+        page_size: int, default 100
+            Number of datasets fetched in one request.
+        dataset_name: str
+            Name of the dataset you want to query.
+            Notice that it's a fuzzy query.
+        create_start_time: Iterable, default None
+            An iterable object. For example:
+            (2023, 1, 1, 12, 30, 30) means querying datasets created after 2023-01-01T12:30:30.
+            Hour, minute and second are optional.
+        create_end_time: Iterable, default None
+            An iterable object. For example:
+            (2023, 1, 1, 12, 30, 30) means querying datasets created before 2023-01-01T12:30:30.
+            Hour, minute and second are optional.
+        sort_by: str, default 'CREATED_AT'
+            A sort field that can only choose from this list:
+            ['NAME', 'CREATED_AT', 'UPDATED_AT']
+        ascending: bool, default True
+            Whether the order of datasets is ascending or descending.
+        dataset_type: str, default None
+            An annotation type that can only choose from this list:
+            ['LIDAR_FUSION', 'LIDAR_BASIC', 'IMAGE']
+
+        Returns
+        -------
+        Iterator[Dataset]
+            A generator of `Dataset` objects.
+        """
+
+        def fetch_page(page_no):
+            return self._query_the_list_of_datasets(
+                page_no=page_no,
+                page_size=page_size,
+                name=dataset_name,
+                create_start_time=create_start_time,
+                create_end_time=create_end_time,
+                sort_by=sort_by,
+                ascending=ascending,
+                dataset_type=dataset_type
+            )
+
+        for d in _iter_pages(fetch_page):
+            yield self._to_dataset(d)
+
+    def _query_the_list_of_data(
+            self,
+            dataset_id: Union[int, str],
+            page_no: int,
+            page_size: int,
+            name: Optional[str] = None,
+            create_start_time: Optional[Iterable] = None,
+            create_end_time: Optional[Iterable] = None,
+            sort_by: str = 'CREATED_AT',
+            ascending: Optional[bool] = True,
+            annotation_status: Optional[str] = None
+    ) -> Dict:
+        endpoint = 'data/findByPage'
+
+        create_start_time = datetime(*create_start_time) if create_start_time else datetime(1000, 1, 1)
+        create_end_time = datetime(*create_end_time) if create_end_time else datetime.today()
+
+        params = {
+            'datasetId': dataset_id,
+            'pageNo': page_no,
+            'pageSize': page_size,
+            'name': name,
+            'createStartTime': create_start_time,
+            'createEndTime': create_end_time,
+            'sortField': sort_by,
+            'ascOrDesc': 'ASC' if ascending else 'DESC',
+            'annotationStatus': annotation_status
+        }
+
+        resp = self.api.get_request(endpoint=endpoint, params=params)
+
+        return resp
+
     def query_data_under_dataset(
             self,
             dataset_id: Union[int, str],
@@ -297,24 +460,17 @@ class Client:
         Dict
             JSON data containing all the data you're querying and information of all the files within these data.
         """
-        endpoint = 'data/findByPage'
-
-        create_start_time = datetime(*create_start_time) if create_start_time else datetime(1000, 1, 1)
-        create_end_time = datetime(*create_end_time) if create_end_time else datetime.today()
-
-        params = {
-            'datasetId': dataset_id,
-            'pageNo': page_no,
-            'pageSize': page_size,
-            'name': name,
-            'createStartTime': create_start_time,
-            'createEndTime': create_end_time,
-            'sortField': sort_by,
-            'ascOrDesc': 'ASC' if ascending else 'DESC',
-            'annotationStatus': annotation_status
-        }
-
-        resp = self.api.get_request(endpoint=endpoint, params=params)
+        resp = self._query_the_list_of_data(
+            dataset_id=dataset_id,
+            page_no=page_no,
+            page_size=page_size,
+            name=name,
+            create_start_time=create_start_time,
+            create_end_time=create_end_time,
+            sort_by=sort_by,
+            ascending=ascending,
+            annotation_status=annotation_status
+        )
 
         rps_dict = {
             "pageSize": resp.get('pageSize'),
@@ -325,6 +481,71 @@ class Client:
 
         return rps_dict
 
+    def iter_data_under_dataset(
+            self,
+            dataset_id: Union[int, str],
+            page_size: int = 1000,
+            name: Optional[str] = None,
+            create_start_time: Optional[Iterable] = None,
+            create_end_time: Optional[Iterable] = None,
+            sort_by: str = 'CREATED_AT',
+            ascending: Optional[bool] = True,
+            annotation_status: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """
+        Iterate over all data under a specific dataset, page by page.
+        The next page is fetched in the background while you are consuming the current one,
+        and only one page is kept in memory no matter how big the dataset is.
+
+        Parameters
+        ----------
+        dataset_id: Union[int, str]
+            A dataset id. You can find this in the last part of the dataset url, for example:
+            ``https://x1-community.alidev.beisai.com/#/datasets/overview?id=766416``.
+            Also, the id can be found in the attributes of an `Dataset` object.
+        page_size: int, default 1000
+            Number of data fetched in one request.
+        name: str
+            Name of the data you want to query.
+            Notice that it's a fuzzy query.
+        create_start_time: Iterable, default None
+            An iterable object. For example:
+            (2023, 1, 1, 12, 30, 30) means querying data created after 2023-01-01T12:30:30.
+            Hour, minute and second are optional.
+        create_end_time: Iterable, default None
+            An iterable object. For example:
+            (2023, 1, 1, 12, 30, 30) means querying data created before 2023-01-01T12:30:30.
+            Hour, minute and second are optional.
+        sort_by: str, default 'CREATED_AT'
+            A sort field that can only choose from this list:
+            ['NAME', 'CREATED_AT', 'UPDATED_AT']
+        ascending: bool, default True
+            Whether the order of data is ascending or descending.
+        annotation_status: Optional[str], default None
+            Annotation status of the data that can only choose from this list:
+            ['ANNOTATED', 'NOT_ANNOTATED', 'INVALID'].
+
+        Returns
+        -------
+        Iterator[Dict]
+            A generator of data information dicts.
+        """
+
+        def fetch_page(page_no):
+            return self._query_the_list_of_data(
+                dataset_id=dataset_id,
+                page_no=page_no,
+                page_size=page_size,
+                name=name,
+                create_start_time=create_start_time,
+                create_end_time=create_end_time,
+                sort_by=sort_by,
+                ascending=ascending,
+                annotation_status=annotation_status
+            )
+
+        yield from _iter_pages(fetch_page)
+
     def delete_data(
             self,
             dataset_id: Union[int, str],
@@ -479,7 +700,8 @@ class Client:
         if is_local:
             data_name = os.path.split(data_path)[-1]
             url_dict = self._generate_data_direct_upload_address(data_name, dataset_id)
-            put_resp = requests.put(url_dict['presignedUrl'], data=open(data_path, 'rb'))
+            with open(data_path, 'rb') as f:
+                put_resp = self.api.file_request('PUT', url_dict['presignedUrl'], data=f)
 
             if put_resp.status_code != 200:
                 raise SDKException(code=put_resp.status_code, message=put_resp.text)
@@ -495,6 +717,50 @@ class Client:
 
         return resp
 
+    def upload_files(
+            self,
+            paths: Union[str, List[str]],
+            dataset_id: Union[int, str],
+            workers: int = 4,
+            max_retries: int = 3
+    ) -> Dict:
+        """
+        Upload several local files and directories to a specific dataset concurrently.
+        Every file is streamed from disk, so it's fine to upload multi-GB zips.
+        Like 'upload_data', check the upload status with the returned serial numbers.
+
+        Parameters
+        ----------
+        paths: Union[str, List[str]]
+            A local file, a directory or a list of them.
+            Every file under a directory is uploaded as a separate copy of data.
+        dataset_id: Union[int, str]
+            A dataset id. You can find this in the last part of the dataset url, for example:
+            ``https://x1-community.alidev.beisai.com/#/datasets/overview?id=766416``.
+            Also, the id can be found in the attributes of an `Dataset` object.
+        workers: int, default 4
+            The number of files uploaded at the same time.
+        max_retries: int, default 3
+            How many times a failed put is retried.
+
+        Returns
+        -------
+        Dict
+            An upload report. 'serial_numbers' are the serial numbers of uploaded files,
+            'mb_per_second' and 'files_per_second' show the throughput,
+            'files' has a record of every file and 'errors' has the failed ones.
+        """
+        uploader = Uploader(
+            client=self,
+            workers=workers,
+            max_retries=max_retries
+        )
+
+        return uploader.upload(
+            paths=paths,
+            dataset_id=dataset_id
+        )
+
     def query_upload_status(
             self,
             serial_numbers: Union[str, List[str]]
@@ -525,6 +791,46 @@ class Client:
 
         return resp
 
+    def track_uploads(
+            self,
+            serial_numbers: Union[str, List[str], None] = None,
+            callback: Optional[Callable[[Dict], None]] = None,
+            min_interval: float = 1.0,
+            max_interval: float = 30.0
+    ) -> UploadTracker:
+        """
+        Track the upload status of serial numbers in the background instead of
+        calling 'query_upload_status' in a loop.
+        All pending serial numbers are checked in one request per tick, and the tick
+        slows down while parsing makes no progress.
+
+        Parameters
+        ----------
+        serial_numbers: Union[str, List[str], None], default None
+            Serial numbers to track right away. More can be added with `UploadTracker.add`.
+        callback: Optional[Callable[[Dict], None]], default None
+            Called with the final upload record when parsing of an upload finishes.
+        min_interval: float, default 1.0
+            Seconds between two checks while parsing is making progress.
+        max_interval: float, default 30.0
+            The max seconds between two checks.
+
+        Returns
+        -------
+        UploadTracker
+            Use `UploadTracker.add` to get futures of final upload records,
+            or `UploadTracker.wait` to block until everything is parsed.
+        """
+        tracker = UploadTracker(
+            client=self,
+            min_interval=min_interval,
+            max_interval=max_interval
+        )
+        if serial_numbers:
+            tracker.add(serial_numbers, callback)
+
+        return tracker
+
     @staticmethod
     def _recursive_search_url(
             data: Union[List, Dict],
@@ -550,10 +856,14 @@ class Client:
             output_folder: str,
             data_id: Union[int, List[int], None] = None,
             dataset_id: Union[int, str, None] = None,
-            remain_directory_structure: bool = True
-    ) -> Union[str, List[Dict]]:
+            remain_directory_structure: bool = True,
+            workers: int = 8,
+            chunk_size: int = 1 << 20
+    ) -> Union[str, Dict]:
         """
         Download all data from a given dataset or download given data.
+        Files are downloaded concurrently and streamed to disk.
+        Partially downloaded files are resumed and complete files are skipped if you run it again.
 
         Parameters
         ----------
@@ -572,51 +882,55 @@ class Client:
             will remain exactly the same as it was uploaded.
             If this parameter is set to False, all data will be put in 'output_folder'
             even if there are files with the same name.
+        workers: int, default 8
+            The number of files downloaded at the same time.
+        chunk_size: int, default 1MB
+            The size of each chunk written to disk.
 
         Returns
         -------
-        Union[str, List[Dict]]
-            If find target data, returns a list of error information produced during downloading.
+        Union[str, Dict]
+            If find target data, returns a download report:
+            the count of 'downloaded', 'resumed', 'cached', 'skipped' and 'failed' files,
+            total 'bytes' and 'elapsed' seconds,
+            a record of every file in 'files' and the failed records in 'errors'.
             If not find target data, returns 'No data'.
         """
         if data_id:
-            data = self.query_data(data_id)
+            if not isinstance(data_id, list):
+                data_id = [data_id]
         else:
             if dataset_id:
-                data = self.query_data_under_dataset(dataset_id)
+                data_id = [x['id'] for x in self.iter_data_under_dataset(dataset_id)]
             else:
                 raise ParamException(message='You need to pass either data_id or dataset_id !!!')
 
-        if not data:
+        total_list = []
+        for i in range(0, len(data_id), QUERY_BATCH_SIZE):
+            data = self.query_data(data_id[i: i + QUERY_BATCH_SIZE])
+            self._recursive_search_url(
+                data=data,
+                output_folder=output_folder,
+                total=total_list,
+                remain_directory_structure=remain_directory_structure,
+            )
+
+        if not total_list:
             return 'No data'
 
-        error_list = []
-        total_list = []
+        downloader = Downloader(
+            api=self.api,
+            workers=workers,
+            chunk_size=chunk_size,
+            cache=self.cache
+        )
 
-        self._recursive_search_url(
-            data=data,
+        return downloader.download(
+            files=total_list,
             output_folder=output_folder,
-            total=total_list,
-            remain_directory_structure=remain_directory_structure,
+            remain_directory_structure=remain_directory_structure
         )
 
-        for file in track(total_list, description='Downloading', ):
-            try:
-                if not remain_directory_structure:
-                    output_path = os.path.join(output_folder, os.path.split(file[1])[2])
-                else:
-                    output_path = Path(output_folder, *Path(file[1]).parts[3:])
-                cur_folder, cur_name = os.path.split(output_path)
-                if not os.path.exists(cur_folder):
-                    os.makedirs(cur_folder)
-
-                with open(output_path, 'wb') as f:
-                    f.write(requests.request('GET', file[2]).content)
-            except:
-                error_list.append(file)
-
-        return error_list
-
     def _get_data_and_result_info(
             self,
             dataset_id: Union[int, str],
@@ -633,28 +947,58 @@ class Client:
 
         return resp
 
+    def _data_ids_to_query(
+            self,
+            dataset_id: Union[int, str],
+            data_ids: Union[int, List[int], None],
+            limit: Optional[int]
+    ) -> List[int]:
+        if data_ids is not None:
+            return (data_ids if isinstance(data_ids, list) else [data_ids])[:limit]
+        # Only list as many pages as the limit needs.
+        page_size = min(limit, 1000) if limit else 1000
+        listed = (data['id'] for data in self.iter_data_under_dataset(dataset_id, page_size=page_size))
+
+        return list(islice(listed, limit))
+
     def query_data_and_result(
             self,
             dataset_id: Union[int, str],
             data_ids: Union[int, List[int], None] = None,
-            limit: int = 5000,
-            dropna: bool = False
+            limit: Optional[int] = 5000,
+            dropna: bool = False,
+            columnar: bool = False,
+            batch_size: Optional[int] = QUERY_BATCH_SIZE,
+            workers: int = 4
     ) -> Annotation:
         """
         Query both the data information and the annotation result of a specific dataset.
         Accept a 'data_ids' parameter to query specific data.
 
+        The ids of the data are listed first (at most 'limit' of them), then their data and results
+        are fetched 'batch_size' at a time, 'workers' batches at the same time.
+        So 'limit' and 'data_ids' bound what is requested from the server,
+        and nothing more is requested if there's no data to fetch.
+
         Parameters
         ----------
         dataset_id: Union[int, str]
             The id of the dataset you want to query.
         data_ids: Union[int, List[int], None], default None
             The id or ids of the data you want to query.
-        limit: int, default 5000
-            The max number of returned annotation results.
+        limit: Optional[int], default 5000
+            The max number of returned annotation results. None for no limit.
             Change this parameter according to your system memory.
         dropna: bool, default False
             Whether drop no result data or not.
+        columnar: bool, default False
+            Keep the objects in numpy arrays instead of nested dicts,
+            which takes several times less memory for large datasets. See `ColumnarAnnotation`.
+        batch_size: Optional[int], default 100
+            Number of data fetched in one request.
+            None fetches the whole dataset (or all 'data_ids') in a single request.
+        workers: int, default 4
+            The number of batches fetched at the same time.
 
         Returns
         -------
@@ -662,15 +1006,28 @@ class Client:
             An instance of Annotation class.
             It has some methods to convert the format of annotation result.
         """
-        resp = self._get_data_and_result_info(dataset_id, data_ids)
-        result_dict = {result['dataId']: result for result in resp['results']}
-        annotation = [
-            {
-                'data': data,
-                'result': result_dict.get(data['id'], {})
-            }
-            for data in resp['data'][:limit]
-        ]
+        if batch_size is None:
+            responses = [self._get_data_and_result_info(dataset_id, data_ids)]
+        else:
+            ids = self._data_ids_to_query(dataset_id, data_ids, limit)
+            if not ids:
+                info = self._query_dataset_info(dataset_id)
+                return Annotation(
+                    client=self,
+                    annotation=[],
+                    dataset_name=info['name'],
+                    dataset_id=dataset_id,
+                    dataset_type=info['type'],
+                    columnar=columnar
+                )
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                responses = list(executor.map(
+                    lambda batch: self._get_data_and_result_info(dataset_id, batch),
+                    _batches(ids, batch_size)
+                ))
+
+        resp = responses[0]
+        annotation = [item for r in responses for item in _join_data_and_result(r)][:limit]
 
         if dropna:
             annotation = list(filter(lambda x: x['result'], annotation))
@@ -681,9 +1038,52 @@ class Client:
             dataset_name=resp['datasetName'],
             version=resp['version'],
             dataset_id=resp['datasetId'],
-            export_time=resp['exportTime']
+            export_time=resp['exportTime'],
+            columnar=columnar
         )
 
+    def sync_dataset(
+            self,
+            dataset_id: Union[int, str],
+            db_path: str,
+            batch_size: int = QUERY_BATCH_SIZE,
+            dropna: bool = False,
+            columnar: bool = False,
+            full: bool = False
+    ) -> Annotation:
+        """
+        Keep a local SQLite mirror of the data and annotation results of a dataset up to date,
+        and query them from it.
+        Only data that are new or whose 'updatedAt' changed since the last sync are downloaded,
+        so refreshing a large, mostly unchanged dataset is cheap. Data listed without an 'updatedAt'
+        are always downloaded. Unlike `query_data_and_result`, it has no limit.
+
+        Parameters
+        ----------
+        dataset_id: Union[int, str]
+            The id of the dataset you want to query.
+        db_path: str
+            The SQLite file of the mirror. It's created if it doesn't exist
+            and can hold several datasets.
+        batch_size: int, default 100
+            Number of changed data fetched in one request.
+        dropna: bool, default False
+            Whether drop no result data or not.
+        columnar: bool, default False
+            Keep the objects in numpy arrays instead of nested dicts. See `query_data_and_result`.
+        full: bool, default False
+            Download every data again, for example if results were changed without
+            the 'updatedAt' of their data changing.
+
+        Returns
+        -------
+        Annotation
+            An instance of Annotation class, built from the local mirror.
+        """
+        with LocalStore(db_path) as store:
+            sync_dataset(self, dataset_id, store, batch_size=batch_size, full=full)
+            return _annotation_of(self, dataset_id, store, dropna=dropna, columnar=columnar)
+
     def query_classes_stat(
             self,
             dataset_id: Union[int, str]
@@ -711,9 +1111,9 @@ class Client:
             self,
             endpoint: str,
             des_id: str,
-            page_no: int = 1,
-            page_size: int = 100,
-    ):
+            page_size: int = 500,
+    ) -> List[Dict]:
+        # Every page of classes/classifications, the next one requested while the current one is read.
         if 'dataset' not in endpoint:
             params = {
                 'ontologyId': des_id,
@@ -723,19 +1123,13 @@ class Client:
                 'datasetId': des_id,
             }
 
-        params.update(
-            {
-                'pageNo': page_no,
-                'pageSize': page_size
-            }
-        )
-
-        resp = self.api.get_request(
-            endpoint=endpoint,
-            params=params
-        )
+        def fetch_page(page_no):
+            return self.api.get_request(
+                endpoint=endpoint,
+                params={**params, 'pageNo': page_no, 'pageSize': page_size}
+            )
 
-        return resp['list']
+        return list(_iter_pages(fetch_page))
 
     def _query_ontology_list(
             self,
@@ -776,22 +1170,19 @@ class Client:
             des_type,
     ):
         if 'dataset' in des_type:
-            endpoint1 = 'datasetClass/findByPage'
-            endpoint2 = 'datasetClassification/findByPage'
-            dataset_type = self._query_dataset_info(des_id)['type']
+            endpoint = 'datasetClass/findByPage'
+            query_info = self._query_dataset_info
         else:
-            endpoint1 = 'class/findByPage'
-            endpoint2 = 'classification/findByPage'
-            dataset_type = self._query_ontology_info(des_id)['type']
+            endpoint = 'class/findByPage'
+            query_info = self._query_ontology_info
 
-        classes = self._query_complete_ontology(
-            endpoint=endpoint1,
-            des_id=des_id
-        )
-        classifications = self._query_complete_ontology(
-            endpoint=endpoint2,
-            des_id=des_id
-        )
+        # The info and the classes don't depend on each other. Classifications aren't
+        # built into an `Ontology` yet, so they aren't requested at all.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            info = executor.submit(query_info, des_id)
+            classes = executor.submit(self._query_complete_ontology, endpoint=endpoint, des_id=des_id)
+            dataset_type = info.result()['type']
+            classes = classes.result()
 
         classifications = []
 
@@ -845,13 +1236,11 @@ class Client:
             )
             total = onto_list['total']
             onto_ids = [onto['id'] for onto in onto_list['list']]
-            result = []
-            for onto_id in onto_ids:
-                onto = self._query_a_single_ontology(
-                    des_id=onto_id,
-                    des_type=des_type
-                )
-                result.append(onto)
+            with ThreadPoolExecutor(max_workers=max(1, min(len(onto_ids), 8))) as executor:
+                result = list(executor.map(
+                    lambda onto_id: self._query_a_single_ontology(des_id=onto_id, des_type=des_type),
+                    onto_ids
+                ))
 
             return _to_single(result, total)
 
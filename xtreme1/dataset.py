@@ -1,4 +1,4 @@
-from typing import List, Dict, Optional, Union
+from typing import List, Dict, Optional, Union, Iterator
 
 from .exporter.annotation import Annotation
 from .ontology.ontology import Ontology
@@ -156,12 +156,49 @@ class Dataset:
             annotation_status
         )
 
+    def iter_data(
+            self,
+            page_size: int = 1000,
+            name: Optional[str] = None,
+            annotation_status: Optional[str] = None,
+            **kwargs
+    ) -> Iterator[Dict]:
+        """
+        Iterate over all data under current dataset, page by page.
+
+        Parameters
+        ----------
+        page_size: int, default 1000
+            Number of data fetched in one request.
+        name: str
+            Name of the data you want to query.
+            Notice that it's a fuzzy query.
+        annotation_status: Optional[str], default None
+            Annotation status of the data that can only choose from this list:
+            ['ANNOTATED', 'NOT_ANNOTATED', 'INVALID'].
+        kwargs:
+            Other filters accepted by `Client.iter_data_under_dataset`.
+
+        Returns
+        -------
+        Iterator[Dict]
+            A generator of data information dicts.
+        """
+        return self._client.iter_data_under_dataset(
+            dataset_id=self.id,
+            page_size=page_size,
+            name=name,
+            annotation_status=annotation_status,
+            **kwargs
+        )
+
     def download_data(
             self,
             output_folder: str,
             data_id: Union[str, List[str], None] = None,
-            remain_directory_structure: bool = True
-    ) -> List[Dict]:
+            remain_directory_structure: bool = True,
+            workers: int = 8
+    ) -> Union[str, Dict]:
         """
         Download all or given data from current dataset.
 
@@ -177,25 +214,31 @@ class Dataset:
             will remain exactly the same as it was uploaded.
             If this parameter is set to False, all data will be put in 'output_folder'
             even if there are files with the same name.
+        workers: int, default 8
+            The number of files downloaded at the same time.
 
         Returns
         -------
-        Union[str, List[Dict]]
-            If find target data, returns a list of error information produced during downloading.
+        Union[str, Dict]
+            If find target data, returns a download report. See `Client.download_data`.
             If not find target data, returns 'No data'.
         """
         return self._client.download_data(
             output_folder=output_folder,
             data_id=data_id,
             dataset_id=self.id,
-            remain_directory_structure=remain_directory_structure
+            remain_directory_structure=remain_directory_structure,
+            workers=workers
         )
 
     def query_data_and_result(
             self,
             data_ids: Union[int, List[int], None] = None,
             limit: int = 5000,
-            dropna: bool = False
+            dropna: bool = False,
+            columnar: bool = False,
+            batch_size: Optional[int] = 100,
+            workers: int = 4
     ) -> Annotation:
         """
         Query both the data information and the annotation result of current dataset.
@@ -210,6 +253,12 @@ class Dataset:
             Change this parameter according to your system memory.
         dropna: bool, default False
             Whether the unannotated data is preserved or not.
+        columnar: bool, default False
+            Keep the objects in numpy arrays instead of nested dicts. See `Client.query_data_and_result`.
+        batch_size: Optional[int], default 100
+            Number of data fetched in one request. None fetches them all in a single request.
+        workers: int, default 4
+            The number of batches fetched at the same time.
 
         Returns
         -------
@@ -222,7 +271,10 @@ class Dataset:
             dataset_id=self.id,
             data_ids=data_ids,
             limit=limit,
-            dropna=dropna
+            dropna=dropna,
+            columnar=columnar,
+            batch_size=batch_size,
+            workers=workers
         )
 
     def query_classes_stat(
@@ -256,3 +308,90 @@ class Dataset:
             des_type='dataset',
             name=None
         )
+
+
+class AsyncDataset(Dataset):
+    """
+    A `Dataset` returned by `AsyncClient`. Its network methods are coroutines,
+    except `iter_data`, which is an async iterator.
+    Ontologies are only loaded by `Client`, so it has no `query_ontology` method.
+    """
+
+    async def edit(
+            self,
+            new_name: Optional[str] = None,
+            new_description: Optional[str] = None
+    ):
+        """
+        Awaitable version of `Dataset.edit`.
+        """
+        self.name = new_name or self.name
+        self.description = new_description or self.description
+        return await self._client.edit_dataset(self.id, self.name, self.description)
+
+    async def delete(
+            self,
+            is_sure: bool
+    ) -> bool:
+        """
+        Awaitable version of `Dataset.delete`.
+        """
+        return await self._client.delete_dataset(self.id, is_sure)
+
+    async def download_data(
+            self,
+            output_folder: str,
+            data_id: Union[str, List[str], None] = None,
+            remain_directory_structure: bool = True,
+            concurrency: int = 16
+    ) -> Union[str, Dict]:
+        """
+        Awaitable version of `Dataset.download_data`.
+        At most 'concurrency' files are downloaded at the same time.
+        """
+        return await self._client.download_data(
+            output_folder=output_folder,
+            data_id=data_id,
+            dataset_id=self.id,
+            remain_directory_structure=remain_directory_structure,
+            concurrency=concurrency
+        )
+
+    async def query_data_and_result(
+            self,
+            data_ids: Union[int, List[int], None] = None,
+            limit: int = 5000,
+            dropna: bool = False,
+            columnar: bool = False,
+            batch_size: Optional[int] = 100,
+            concurrency: int = 4
+    ) -> Annotation:
+        """
+        Awaitable version of `Dataset.query_data_and_result`.
+        At most 'concurrency' batches are fetched at the same time.
+        """
+        return await self._client.query_data_and_result(
+            dataset_id=self.id,
+            data_ids=data_ids,
+            limit=limit,
+            dropna=dropna,
+            columnar=columnar,
+            batch_size=batch_size,
+            concurrency=concurrency
+        )
+
+    async def query_classes_stat(
+            self
+    ) -> Dict:
+        """
+        Awaitable version of `Dataset.query_classes_stat`.
+        """
+        return await self._client.query_classes_stat(
+            dataset_id=self.id
+        )
+
+    @property
+    def query_ontology(self):
+        raise AttributeError(
+            f"'{self.__class__.__name__}' object has no attribute 'query_ontology', use `Client.query_ontology`"
+        )
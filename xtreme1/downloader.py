@@ -0,0 +1,522 @@
+import os
+import json
+import time
+import asyncio
+import shutil
+import threading
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .cache import BlobCache
+
+MANIFEST_NAME = '.x1_download_manifest.json'
+PART_SUFFIX = '.part'
+MANIFEST_INTERVAL = 2.0
+
+
+def _output_path(
+        path: str,
+        output_folder: str,
+        remain_directory_structure: bool = True
+) -> str:
+    if not remain_directory_structure:
+        return os.path.join(output_folder, os.path.basename(path))
+    return str(Path(output_folder, *Path(path).parts[3:]))
+
+
+def _object_meta(
+        status: int,
+        headers
+) -> Tuple[Optional[int], Optional[str]]:
+    # The size and ETag of an object, from the answer to a HEAD or a one-byte ranged GET.
+    etag = headers.get('ETag')
+    if status == 206:
+        total = headers.get('Content-Range', '').rpartition('/')[2]
+        return (int(total) if total.isdigit() else None), etag
+    if 200 <= status < 300:
+        size = headers.get('Content-Length')
+        return (int(size) if size and size.isdigit() else None), etag
+
+    return None, None
+
+
+def _remote_meta(
+        request: Callable,
+        url: str
+) -> Tuple[Optional[int], Optional[str]]:
+    # The size and ETag of a file without downloading it. 'request' is like `Api.file_request`.
+    with request('HEAD', url) as resp:
+        size, etag = _object_meta(resp.status_code, resp.headers)
+    if size is None:
+        # Presigned urls are often only signed for GET.
+        with request('GET', url, headers={'Range': 'bytes=0-0'}, stream=True) as resp:
+            size, etag = _object_meta(resp.status_code, resp.headers)
+
+    return size, etag
+
+
+def _group_by_output(
+        files: List[Tuple],
+        output_folder: str,
+        remain_directory_structure: bool
+) -> List[List[Tuple[int, Tuple]]]:
+    # Files that go to the same path are downloaded one after another by one task,
+    # so they never share a part file and the last of them wins.
+    groups = {}
+    for i, file in enumerate(files):
+        output_path = _output_path(file[1], output_folder, remain_directory_structure)
+        groups.setdefault(output_path, []).append((i, file))
+
+    return list(groups.values())
+
+
+def _new_record(
+        file: Tuple,
+        output_path: str
+) -> Dict:
+    data_id, path, url = file
+    return {
+        'id': data_id,
+        'path': path,
+        'url': url,
+        'output_path': output_path,
+        'status': 'failed',
+        'bytes': 0,
+        'elapsed': 0.0,
+        'error': None
+    }
+
+
+def _report(
+        records: List[Dict],
+        elapsed: float
+) -> Dict:
+    report = {
+        'total': len(records),
+        'downloaded': 0,
+        'resumed': 0,
+        'cached': 0,
+        'skipped': 0,
+        'failed': 0,
+        'bytes': sum(r['bytes'] for r in records),
+        'elapsed': elapsed,
+        'files': records,
+        'errors': [r for r in records if r['status'] == 'failed']
+    }
+    for r in records:
+        report[r['status']] += 1
+
+    return report
+
+
+class Downloader:
+    """
+    Download files with a bounded pool of worker threads.
+
+    Bodies are streamed to disk chunk by chunk. A file is first written to '<name>.part'
+    and renamed once it's complete, so an interrupted download is resumed with an http
+    'Range' request next time. A file that already exists with the same size (and the same
+    'ETag', if it was recorded) online is skipped, which is checked with a HEAD request.
+    ETags are recorded in a small manifest file inside the output folder, saved every few
+    seconds while files finish so that an interrupted run keeps them.
+
+    With a `BlobCache`, the size and ETag of every file are asked for first, and a cached copy
+    that matches them is used instead of downloading the file. Every downloaded file is added to it.
+    """
+
+    def __init__(
+            self,
+            api,
+            workers: int = 8,
+            chunk_size: int = 1 << 20,
+            cache: Optional[BlobCache] = None
+    ):
+        self.api = api
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._manifest = {}
+        self._manifest_path = None
+        self._saved_at = 0.0
+
+    def _load_manifest(
+            self,
+            output_folder: str
+    ):
+        manifest_path = os.path.join(output_folder, MANIFEST_NAME)
+        self._manifest_path = manifest_path
+        self._saved_at = time.monotonic()
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                self._manifest = json.load(f)
+        except (OSError, ValueError):
+            self._manifest = {}
+
+    def _save_manifest(
+            self
+    ):
+        manifest_path = self._manifest_path
+        os.makedirs(os.path.dirname(manifest_path) or '.', exist_ok=True)
+        tmp_path = f'{manifest_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f)
+        os.replace(tmp_path, manifest_path)
+        self._saved_at = time.monotonic()
+
+    def _save_manifest_locked(
+            self
+    ):
+        with self._lock:
+            self._save_manifest()
+
+    def _write_body(
+            self,
+            resp,
+            part_path: str,
+            mode: str
+    ) -> int:
+        written = 0
+        with open(part_path, mode) as f:
+            for chunk in resp.iter_content(chunk_size=self.chunk_size):
+                if chunk:
+                    f.write(chunk)
+                    written += len(chunk)
+
+        return written
+
+    def _get(
+            self,
+            url: str,
+            part_path: str
+    ) -> Tuple[int, Optional[str]]:
+        with self.api.file_request('GET', url, stream=True) as resp:
+            resp.raise_for_status()
+            return self._write_body(resp, part_path, 'wb'), resp.headers.get('ETag')
+
+    def _record_etag(
+            self,
+            key: str,
+            etag: Optional[str]
+    ):
+        # The manifest is saved as files finish, at most every few seconds,
+        # so an interrupted run still knows the ETags of what it got.
+        if not etag:
+            return
+        with self._lock:
+            if self._manifest.get(key) == etag:
+                return
+            self._manifest[key] = etag
+            if time.monotonic() - self._saved_at >= MANIFEST_INTERVAL:
+                self._save_manifest()
+
+    def _fetch(
+            self,
+            url: str,
+            output_path: str,
+            key: str
+    ) -> Tuple[str, int]:
+        part_path = output_path + PART_SUFFIX
+        known_etag = self._manifest.get(key)
+
+        size = etag = None
+        if self.cache or os.path.exists(output_path):
+            size, etag = _remote_meta(self.api.file_request, url)
+
+        if os.path.exists(output_path) and size == os.path.getsize(output_path) \
+                and (not (known_etag and etag) or known_etag == etag):
+            if self.cache:
+                self.cache.put_file(url, output_path, etag)
+            self._record_etag(key, etag)
+            return 'skipped', 0
+
+        # A cached copy is only trusted if it's still the same as the file online.
+        cached = self.cache.get(url, size=size, etag=etag) if self.cache and size is not None else None
+        if cached:
+            shutil.copyfile(cached, part_path)
+            os.replace(part_path, output_path)
+            self._record_etag(key, etag)
+            return 'cached', 0
+
+        if os.path.exists(output_path) or not os.path.exists(part_path):
+            written, etag = self._get(url, part_path)
+            status = 'downloaded'
+
+        else:
+            offset = os.path.getsize(part_path)
+            headers = {'Range': f'bytes={offset}-'}
+            if known_etag:
+                headers['If-Range'] = known_etag
+            with self.api.file_request('GET', url, headers=headers, stream=True) as resp:
+                if resp.status_code == 416:
+                    # The range starts at or past the end. The part file is complete
+                    # only if it's exactly as long as the file online.
+                    total = resp.headers.get('Content-Range', '').rpartition('/')[2]
+                    if total.isdigit() and int(total) == offset:
+                        etag, written, status = known_etag, 0, 'resumed'
+                    else:
+                        status = None
+                else:
+                    resp.raise_for_status()
+                    etag = resp.headers.get('ETag')
+                    if resp.status_code == 206:
+                        written = self._write_body(resp, part_path, 'ab')
+                        status = 'resumed'
+                    else:
+                        written = self._write_body(resp, part_path, 'wb')
+                        status = 'downloaded'
+            if status is None:
+                written, etag = self._get(url, part_path)
+                status = 'downloaded'
+
+        os.replace(part_path, output_path)
+        self._record_etag(key, etag)
+        if self.cache:
+            self.cache.put_file(url, output_path, etag)
+
+        return status, written
+
+    def _download_one(
+            self,
+            file: Tuple,
+            output_folder: str,
+            remain_directory_structure: bool
+    ) -> Dict:
+        output_path = _output_path(file[1], output_folder, remain_directory_structure)
+        key = os.path.relpath(output_path, output_folder)
+        record = _new_record(file, output_path)
+
+        start = time.perf_counter()
+        try:
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            record['status'], record['bytes'] = self._fetch(file[2], output_path, key)
+        except Exception as e:
+            record['error'] = repr(e)
+        record['elapsed'] = time.perf_counter() - start
+
+        return record
+
+    def _download_group(
+            self,
+            group: List[Tuple[int, Tuple]],
+            output_folder: str,
+            remain_directory_structure: bool
+    ) -> List[Tuple[int, Dict]]:
+        return [
+            (i, self._download_one(file, output_folder, remain_directory_structure))
+            for i, file in group
+        ]
+
+    def download(
+            self,
+            files: List[Tuple],
+            output_folder: str,
+            remain_directory_structure: bool = True
+    ) -> Dict:
+        """
+        Download a list of files.
+
+        Parameters
+        ----------
+        files: List[Tuple]
+            A list of (id, path, url) tuples.
+        output_folder: str
+            The folder path to save files.
+        remain_directory_structure: bool, default True
+            Keep the folder structure of 'path' or put all files in 'output_folder'.
+            Files that end up at the same path overwrite each other in the order they're listed.
+
+        Returns
+        -------
+        Dict
+            A report with the count of each status, total bytes, total seconds,
+            a record for every file and a list of failed records.
+        """
+        self._load_manifest(output_folder)
+
+        start = time.perf_counter()
+        records = [None] * len(files)
+        groups = _group_by_output(files, output_folder, remain_directory_structure)
+        from rich.progress import track
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(self._download_group, group, output_folder, remain_directory_structure)
+                for group in groups
+            ]
+            for future in track(as_completed(futures), total=len(futures), description='Downloading'):
+                for i, record in future.result():
+                    records[i] = record
+        elapsed = time.perf_counter() - start
+
+        self._save_manifest_locked()
+
+        return _report(records, elapsed)
+
+
+class AsyncDownloader(Downloader):
+    """
+    The asyncio version of `Downloader`, for `AsyncClient`.
+
+    It resumes '.part' files, renames them once they're complete, skips files that are up to date
+    and keeps the same manifest and report as `Downloader`. At most 'workers' files are downloaded
+    at a time, and files are written from a worker thread so the event loop never waits for the disk.
+    """
+
+    async def _remote_meta(
+            self,
+            url: str
+    ) -> Tuple[Optional[int], Optional[str]]:
+        async with self.api.file_request('HEAD', url) as resp:
+            size, etag = _object_meta(resp.status, resp.headers)
+        if size is None:
+            async with self.api.file_request('GET', url, headers={'Range': 'bytes=0-0'}) as resp:
+                size, etag = _object_meta(resp.status, resp.headers)
+
+        return size, etag
+
+    async def _write_body(
+            self,
+            resp,
+            part_path: str,
+            mode: str
+    ) -> int:
+        written = 0
+        f = await asyncio.to_thread(open, part_path, mode)
+        try:
+            async for chunk in resp.content.iter_chunked(self.chunk_size):
+                await asyncio.to_thread(f.write, chunk)
+                written += len(chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+
+        return written
+
+    async def _get(
+            self,
+            url: str,
+            part_path: str
+    ) -> Tuple[int, Optional[str]]:
+        async with self.api.file_request('GET', url) as resp:
+            resp.raise_for_status()
+            return await self._write_body(resp, part_path, 'wb'), resp.headers.get('ETag')
+
+    async def _fetch(
+            self,
+            url: str,
+            output_path: str,
+            key: str
+    ) -> Tuple[str, int]:
+        part_path = output_path + PART_SUFFIX
+        known_etag = self._manifest.get(key)
+        exists = await asyncio.to_thread(os.path.exists, output_path)
+
+        size = etag = None
+        if self.cache or exists:
+            size, etag = await self._remote_meta(url)
+
+        if exists and size == await asyncio.to_thread(os.path.getsize, output_path) \
+                and (not (known_etag and etag) or known_etag == etag):
+            if self.cache:
+                await asyncio.to_thread(self.cache.put_file, url, output_path, etag)
+            await asyncio.to_thread(self._record_etag, key, etag)
+            return 'skipped', 0
+
+        # A cached copy is only trusted if it's still the same as the file online.
+        cached = None
+        if self.cache and size is not None:
+            cached = await asyncio.to_thread(self.cache.get, url, size, etag)
+        if cached:
+            await asyncio.to_thread(shutil.copyfile, cached, part_path)
+            await asyncio.to_thread(os.replace, part_path, output_path)
+            await asyncio.to_thread(self._record_etag, key, etag)
+            return 'cached', 0
+
+        if exists or not await asyncio.to_thread(os.path.exists, part_path):
+            written, etag = await self._get(url, part_path)
+            status = 'downloaded'
+
+        else:
+            offset = await asyncio.to_thread(os.path.getsize, part_path)
+            headers = {'Range': f'bytes={offset}-'}
+            if known_etag:
+                headers['If-Range'] = known_etag
+            async with self.api.file_request('GET', url, headers=headers) as resp:
+                if resp.status == 416:
+                    # The part file is complete only if it's exactly as long as the file online.
+                    total = resp.headers.get('Content-Range', '').rpartition('/')[2]
+                    if total.isdigit() and int(total) == offset:
+                        etag, written, status = known_etag, 0, 'resumed'
+                    else:
+                        status = None
+                else:
+                    resp.raise_for_status()
+                    etag = resp.headers.get('ETag')
+                    if resp.status == 206:
+                        written = await self._write_body(resp, part_path, 'ab')
+                        status = 'resumed'
+                    else:
+                        written = await self._write_body(resp, part_path, 'wb')
+                        status = 'downloaded'
+            if status is None:
+                written, etag = await self._get(url, part_path)
+                status = 'downloaded'
+
+        await asyncio.to_thread(os.replace, part_path, output_path)
+        await asyncio.to_thread(self._record_etag, key, etag)
+        if self.cache:
+            await asyncio.to_thread(self.cache.put_file, url, output_path, etag)
+
+        return status, written
+
+    async def _download_one(
+            self,
+            file: Tuple,
+            output_folder: str,
+            remain_directory_structure: bool
+    ) -> Dict:
+        output_path = _output_path(file[1], output_folder, remain_directory_structure)
+        key = os.path.relpath(output_path, output_folder)
+        record = _new_record(file, output_path)
+
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(os.makedirs, os.path.dirname(output_path) or '.', exist_ok=True)
+            record['status'], record['bytes'] = await self._fetch(file[2], output_path, key)
+        except Exception as e:
+            record['error'] = repr(e)
+        record['elapsed'] = time.perf_counter() - start
+
+        return record
+
+    async def download(
+            self,
+            files: List[Tuple],
+            output_folder: str,
+            remain_directory_structure: bool = True
+    ) -> Dict:
+        """
+        Awaitable version of `Downloader.download`.
+        """
+        await asyncio.to_thread(self._load_manifest, output_folder)
+
+        start = time.perf_counter()
+        records = [None] * len(files)
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def _download_group(group):
+            async with semaphore:
+                for i, file in group:
+                    records[i] = await self._download_one(file, output_folder, remain_directory_structure)
+
+        try:
+            await asyncio.gather(*[
+                _download_group(group)
+                for group in _group_by_output(files, output_folder, remain_directory_structure)
+            ])
+        finally:
+            # The ETags of the files that finished are kept even if the download is cancelled.
+            await asyncio.to_thread(self._save_manifest_locked)
+        elapsed = time.perf_counter() - start
+
+        return _report(records, elapsed)
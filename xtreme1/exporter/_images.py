@@ -0,0 +1,134 @@
+import os
+import uuid
+from collections import deque
+from typing import Iterable, Iterator, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from xtreme1.api import Api, DEFAULT_TIMEOUT
+from xtreme1.cache import BlobCache
+from xtreme1.downloader import _remote_meta
+
+
+def _image_name(
+        url: str
+) -> str:
+    return url.split('?')[0].split('/')[-1]
+
+
+class _ImageFetcher:
+    """
+    Fetch the images of annotation items with a bounded pool of threads sharing one session,
+    the one of the client's `Api` (with its timeout and retries) if there is one.
+
+    Items without a result are never fetched. With a `BlobCache` images are looked up in it
+    first, by their size and ETag online, and kept in it after downloading, so exporting
+    the same dataset again, in any format, doesn't download the images again.
+    """
+
+    def __init__(
+            self,
+            api: Optional[Api] = None,
+            workers: int = 8,
+            cache: Optional[BlobCache] = None
+    ):
+        self._api = api
+        self._session = None if api else requests.Session()
+        self.workers = workers
+        self.cache = cache
+
+    def _request(
+            self,
+            method: str,
+            url: str,
+            **kwargs
+    ) -> requests.Response:
+        if self._api:
+            return self._api.file_request(method, url, **kwargs)
+        return self._session.request(method, url, timeout=DEFAULT_TIMEOUT, **kwargs)
+
+    def fetch(
+            self,
+            url: str
+    ) -> bytes:
+        if self.cache:
+            size, etag = _remote_meta(self._request, url)
+            content = self.cache.read(url, size=size, etag=etag) if size is not None else None
+            if content is not None:
+                return content
+
+        resp = self._request('GET', url)
+        resp.raise_for_status()
+        if self.cache:
+            self.cache.put(url, resp.content, resp.headers.get('ETag'))
+
+        return resp.content
+
+    def _save(
+            self,
+            url: str,
+            content: bytes,
+            image_folder: str
+    ):
+        # The cached image is hard-linked next to the export when it can be, and copied otherwise,
+        # so the export never depends on the cache, which may evict it.
+        path = os.path.join(image_folder, _image_name(url))
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        blob_path = self.cache.get(url) if self.cache else None
+        try:
+            if blob_path is None:
+                raise OSError
+            os.link(blob_path, tmp_path)
+        except OSError:
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+        os.replace(tmp_path, path)
+
+    def _fetch_item(
+            self,
+            anno: dict,
+            keep_content: bool,
+            image_folder: Optional[str] = None
+    ) -> Optional[bytes]:
+        if not anno.get('result'):
+            return None
+        url = anno['data']['imageUrl']
+        content = self.fetch(url)
+        if image_folder:
+            self._save(url, content, image_folder)
+        return content if keep_content else None
+
+    def imap(
+            self,
+            annotation: Iterable[dict],
+            keep_content: bool = True,
+            image_folder: Optional[str] = None
+    ) -> Iterator[Tuple[dict, Optional[bytes]]]:
+        """
+        Yield (item, image content) pairs in input order, fetching a few items ahead.
+        With 'keep_content=False' None is yielded instead of the content.
+        With an 'image_folder' every image is also saved in it under its file name.
+        """
+        window = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                for anno in annotation:
+                    window.append((anno, executor.submit(self._fetch_item, anno, keep_content, image_folder)))
+                    if len(window) > self.workers * 2:
+                        anno, future = window.popleft()
+                        yield anno, future.result()
+                while window:
+                    anno, future = window.popleft()
+                    yield anno, future.result()
+            finally:
+                for _, future in window:
+                    future.cancel()
+
+
+def _api_of(
+        client
+) -> Optional[Api]:
+    # Only a synchronous client has a requests session to share.
+    api = getattr(client, 'api', None)
+    return api if isinstance(api, Api) else None
@@ -0,0 +1,97 @@
+from functools import partial
+from itertools import islice
+from collections import deque
+from typing import Callable, Iterable, Iterator, Optional
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _progress(
+        iterable: Iterable,
+        total: Optional[int] = None,
+        description: str = 'progress'
+):
+    # Lazy sequences and generators may not know their length; rich copes with total=None.
+    if total is None and hasattr(iterable, '__len__'):
+        total = len(iterable)
+    from rich.progress import track
+    return track(iterable, total=total, description=description)
+
+
+def _run_per_item(
+        func: Callable,
+        annotation: Iterable,
+        export_folder: str,
+        workers: int = 1,
+        chunk_size: Optional[int] = None,
+        total: Optional[int] = None,
+        **kwargs
+):
+    """
+    Call `func(anno, export_folder, **kwargs)` for every item, optionally in a pool of processes.
+
+    `func` must be a module-level function so that it can be pickled. Items are sent to the
+    workers in chunks, a bounded number of chunks at a time, and the progress bar advances in
+    input order. Every item writes its own, deterministically named, file.
+
+    Parameters
+    ----------
+    func: Callable
+        The per-item exporter.
+    annotation: Iterable
+        The items to export.
+    export_folder: str
+        The folder the files are written to.
+    workers: int, default 1
+        The number of processes. 1 runs everything in the current process.
+    chunk_size: Optional[int], default None
+        The number of items sent to a worker at a time. Picked from the number of items by default.
+    total: Optional[int], default None
+        The number of items, for the progress bar. Taken from `len(annotation)` if it's not given.
+    kwargs
+        Passed on to `func`.
+    """
+    if total is None and hasattr(annotation, '__len__'):
+        total = len(annotation)
+    func = partial(func, export_folder=export_folder, **kwargs)
+    if workers <= 1:
+        for anno in _progress(annotation, total):
+            func(anno)
+        return
+
+    if chunk_size is None:
+        chunk_size = max(1, min(64, total // (workers * 4))) if total else 16
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for _ in _progress(_submit_chunks(executor, func, annotation, chunk_size, workers * 2), total):
+            pass
+
+
+def _call_chunk(
+        func: Callable,
+        chunk: list
+):
+    for item in chunk:
+        func(item)
+
+
+def _submit_chunks(
+        executor: ProcessPoolExecutor,
+        func: Callable,
+        annotation: Iterable,
+        chunk_size: int,
+        window_size: int
+) -> Iterator[None]:
+    # Unlike `executor.map`, which submits everything up front, only keep 'window_size' chunks
+    # in flight so that a long (or lazy) input is never held in memory as a whole.
+    # Yields once per finished item, in input order.
+    window = deque()
+    items = iter(annotation)
+    while True:
+        chunk = list(islice(items, chunk_size))
+        if chunk:
+            window.append((len(chunk), executor.submit(_call_chunk, func, chunk)))
+        if window and (not chunk or len(window) >= window_size):
+            size, future = window.popleft()
+            future.result()
+            yield from range(size)
+        elif not chunk:
+            return
@@ -1,9 +1,7 @@
 import os
 import json
-from rich import print_json
 from os.path import join, exists
-from xtreme1.exporter.standard import _to_json, _to_csv, _to_txt, _to_xml
-from xtreme1.exporter.popular import _to_coco, _to_voc, _to_yolo, _to_labelme, _to_kitti
+from xtreme1.cache import _as_cache
 from xtreme1.exceptions import *
 
 __supported_format__ = {
@@ -47,19 +45,26 @@ class Annotation:
             dataset_name,
             version=None,
             dataset_id=None,
-            export_time=None
+            export_time=None,
+            dataset_type=None,
+            columnar=False
     ):
         self.version = version
         self.dataset_id = dataset_id
         self.dataset_name = dataset_name
         self.export_time = export_time
+        if columnar:
+            from xtreme1.exporter.columnar import ColumnarAnnotation
+            annotation = ColumnarAnnotation(annotation)
         self.annotation = annotation
+        self._index = None
         self._client = client
-        self.anno_type = self.__query_dataset_type()
+        self.anno_type = dataset_type or self.__query_dataset_type()
 
     def __query_dataset_type(self):
-
-        return self._client.query_dataset(self.dataset_id).type
+        if self._client is None:
+            return None
+        return self._client._query_dataset_info(self.dataset_id)['type']
 
     def __str__(self):
         return f"Annotation(dataset_id={self.dataset_id}, dataset_name={self.dataset_name})"
@@ -79,7 +84,13 @@ class Annotation:
             os.makedirs(save_folder, exist_ok=True)
         return save_folder
 
+    def __image_cache(self, image_cache):
+        if image_cache is None:
+            return getattr(self._client, 'cache', None)
+        return _as_cache(image_cache)
+
     def view(self, count: int = 5):
+        from rich import print_json
         print_json(json.dumps(self.annotation[:count]))
 
     def supported_format(self):
@@ -123,10 +134,68 @@ class Annotation:
         """
         return self.annotation[-count:]
 
+    def filter(
+            self,
+            class_name=None,
+            tool_type=None,
+            data_id=None,
+            status=None,
+            min_score: float = None,
+            max_score: float = None,
+            min_objects: int = None,
+            max_objects: int = None
+    ):
+        """Select a part of the annotation results.
+        The indexes needed are built the first time they are used and reused by later calls.
+
+        Parameters
+        ----------
+        class_name: A class name or a list of them. Only objects of these classes are kept
+        tool_type: A tool type ('RECTANGLE', 'POLYGON'...) or a list of them. Only objects of these types are kept
+        data_id: A data id or a list of them
+        status: An annotation status of data ('ANNOTATED', 'NOT_ANNOTATED', 'INVALID') or a list of them
+        min_score: Only keep objects with a model confidence of at least this
+        max_score: Only keep objects with a model confidence of at most this
+        min_objects: Only keep data with at least this many (kept) objects
+        max_objects: Only keep data with at most this many (kept) objects
+
+        Data without any kept object are dropped when an object filter is given.
+
+        Returns
+        -------
+        Annotation
+            A new instance over a view of this one. Nothing is copied, and all export methods work on it.
+        """
+        if self._index is None:
+            from xtreme1.exporter.query import AnnotationIndex
+            self._index = AnnotationIndex(self.annotation)
+        view = self._index.select(
+            class_name=class_name,
+            tool_type=tool_type,
+            data_id=data_id,
+            status=status,
+            min_score=min_score,
+            max_score=max_score,
+            min_objects=min_objects,
+            max_objects=max_objects
+        )
+
+        return Annotation(
+            client=self._client,
+            annotation=view,
+            dataset_name=self.dataset_name,
+            version=self.version,
+            dataset_id=self.dataset_id,
+            export_time=self.export_time,
+            dataset_type=self.anno_type
+        )
+
     def to_dict(self):
-        return self.annotation
+        if isinstance(self.annotation, list):
+            return self.annotation
+        return list(self.annotation)
 
-    def convert(self, format: str, export_folder: str):
+    def convert(self, format: str, export_folder: str, workers: int = 1):
         """Convert the saved result to a target format.
         Find more info, see `description <https://docs.xtreme1.io/xtreme1-docs>`_.
 
@@ -138,35 +207,39 @@ class Annotation:
         export_folder: str
             The path to save the conversion result
 
+        workers: int, default 1
+            The number of processes for the formats that write a file per data (JSON, VOC, LABELME).
+            On platforms that spawn processes (Windows, macOS), call this under `if __name__ == '__main__':`.
+
         Returns
         -------
 
         """
         format = format.upper()
         if format == 'JSON':
-            self.to_json(self.__gen_dir(export_folder))
+            self.to_json(export_folder, workers=workers)
         elif format == 'CSV':
-            self.to_csv(self.__gen_dir(export_folder))
+            self.to_csv(export_folder)
         elif format == 'XML':
-            self.to_xml(self.__gen_dir(export_folder))
+            self.to_xml(export_folder)
         elif format == 'TXT':
-            self.to_txt(self.__gen_dir(export_folder))
+            self.to_txt(export_folder)
         elif format in ['COCO', 'VOC', 'YOLO', 'LABELME']:
             if self.anno_type == 'IMAGE':
                 if format == 'COCO':
-                    self.to_coco(self.__gen_dir(export_folder))
+                    self.to_coco(export_folder)
                 elif format == 'VOC':
-                    self.to_voc(self.__gen_dir(export_folder))
+                    self.to_voc(export_folder, workers=workers)
                 elif format == 'YOLO':
-                    self.to_yolo(self.__gen_dir(export_folder))
+                    self.to_yolo(export_folder)
                 else:
-                    self.to_labelme(self.__gen_dir(export_folder))
+                    self.to_labelme(export_folder, workers=workers)
             else:
                 raise ConverterException(message='Annotations do not support this format')
         elif format in ['KITTI']:
             if self.anno_type == 'LIDAR_FUSION':
                 if format == 'KITTI':
-                    self.to_kitti(self.__gen_dir(export_folder))
+                    self.to_kitti(export_folder)
             else:
                 raise ConverterException(message='Annotations do not support this format')
         elif self.anno_type == 'LIDAR_BASIC':
@@ -174,19 +247,22 @@ class Annotation:
         else:
             raise ConverterException(message='Annotations do not support this format')
 
-    def to_json(self, export_folder):
+    def to_json(self, export_folder, workers: int = 1):
         """Convert the saved result to a json file in the xtreme1 standard format.
 
         Parameters
         ----------
         export_folder: The path to save the conversion result
+        workers: The number of processes writing the files, one per data
 
         Returns
         -------
 
         """
+        from xtreme1.exporter.standard import _to_json
         _to_json(annotation=self.annotation,
-                 export_folder=self.__gen_dir(export_folder))
+                 export_folder=self.__gen_dir(export_folder),
+                 workers=workers)
 
     def to_csv(self, export_folder):
         """Convert the saved result to a csv file in the xtreme1 standard format.
@@ -199,6 +275,7 @@ class Annotation:
         -------
 
         """
+        from xtreme1.exporter.standard import _to_csv
         _to_csv(annotation=self.annotation,
                 dataset_name=self.dataset_name,
                 export_folder=self.__gen_dir(export_folder))
@@ -214,6 +291,7 @@ class Annotation:
         -------
 
         """
+        from xtreme1.exporter.standard import _to_xml
         _to_xml(annotation=self.annotation,
                 dataset_name=self.dataset_name,
                 export_folder=self.__gen_dir(export_folder))
@@ -229,11 +307,12 @@ class Annotation:
         -------
 
         """
+        from xtreme1.exporter.standard import _to_txt
         _to_txt(annotation=self.annotation,
                 dataset_name=self.dataset_name,
                 export_folder=self.__gen_dir(export_folder))
 
-    def to_coco(self, export_folder):
+    def to_coco(self, export_folder, use_rle: bool = False, compact: bool = False, compress: bool = False):
         """
         Export data in coco format, and the resulting format varies somewhat depending on the tool type
         (RECTANGLE,POLYGON,POLYLINE,KEYPOINTS).
@@ -242,33 +321,54 @@ class Annotation:
         Parameters
         ----------
         export_folder: The path to save the conversion result
+        use_rle: Encode the segmentation of polygons as uncompressed RLE instead of a list of points
+        compact: Write the json without indentation
+        compress: Write a gzip-compressed '<dataset_name>_coco.json.gz' instead
+
+        The file is written incrementally, one image at a time, so memory use doesn't grow with the dataset.
 
         Returns
         -------
 
         """
         if self.anno_type == 'IMAGE':
+            from xtreme1.exporter.popular import _to_coco
             _to_coco(annotation=self.annotation,
                      dataset_name=self.dataset_name,
-                     export_folder=self.__gen_dir(export_folder))
+                     export_folder=self.__gen_dir(export_folder),
+                     use_rle=use_rle,
+                     compact=compact,
+                     compress=compress)
         else:
             raise ConverterException(message='This annotations do not support export to coco format')
 
-    def to_voc(self, export_folder):
+    def to_voc(self, export_folder, workers: int = 1, embed_image: bool = True, image_cache=None):
         """
 
         Parameters
         ----------
         export_folder
+        workers: The number of processes writing the files, one pair per data
+        embed_image: Embed every image in its json as base64. Otherwise the json only references it by 'imagePath'
+        image_cache: A folder (or a `BlobCache`) to keep the downloaded images in, so that later exports
+            don't download them again. The cache of the client is used by default.
+            Without 'embed_image', the images are then put next to the jsons, hard-linked from the cache
+            where possible, and 'imagePath' is their file name
 
         Returns
         -------
 
         """
         if self.anno_type == 'IMAGE':
+            from xtreme1.exporter.popular import _to_voc
+            from xtreme1.exporter._images import _api_of
             _to_voc(annotation=self.annotation,
                     dataset_name=self.dataset_name,
-                    export_folder=self.__gen_dir(export_folder))
+                    export_folder=self.__gen_dir(export_folder),
+                    workers=workers,
+                    embed_image=embed_image,
+                    image_cache=self.__image_cache(image_cache),
+                    api=_api_of(self._client))
         else:
             raise ConverterException(message='This annotations do not support export to voc format')
 
@@ -284,27 +384,41 @@ class Annotation:
 
         """
         if self.anno_type == 'IMAGE':
+            from xtreme1.exporter.popular import _to_yolo
             _to_yolo(annotation=self.annotation,
                      dataset_name=self.dataset_name,
                      export_folder=self.__gen_dir(export_folder))
         else:
             raise ConverterException(message='This annotations do not support export to yolo format')
 
-    def to_labelme(self, export_folder):
+    def to_labelme(self, export_folder, workers: int = 1, embed_image: bool = True, image_cache=None):
         """Export data in label_me format.
         Note that exports in this format only support image-type annotations.
+        Images are downloaded concurrently, and only for data that has a result.
 
         Parameters
         ----------
         export_folder
+        workers: The number of processes writing the files, one per data
+        embed_image: Embed every image in its json as base64. Otherwise the json only references it by 'imagePath'
+        image_cache: A folder (or a `BlobCache`) to keep the downloaded images in, so that later exports
+            don't download them again. The cache of the client is used by default.
+            Without 'embed_image', the images are then put next to the jsons, hard-linked from the cache
+            where possible, and 'imagePath' is their file name
 
         Returns
         -------
 
         """
         if self.anno_type == 'IMAGE':
+            from xtreme1.exporter.popular import _to_labelme
+            from xtreme1.exporter._images import _api_of
             _to_labelme(annotation=self.annotation,
-                        export_folder=self.__gen_dir(export_folder))
+                        export_folder=self.__gen_dir(export_folder),
+                        workers=workers,
+                        embed_image=embed_image,
+                        image_cache=self.__image_cache(image_cache),
+                        api=_api_of(self._client))
         else:
             raise ConverterException(message='This annotations do not support export to labelme format')
 
@@ -320,6 +434,7 @@ class Annotation:
 
         """
         if self.anno_type == 'LIDAR_FUSION':
+            from xtreme1.exporter.popular import _to_kitti
             _to_kitti(annotation=self.annotation,
                       dataset_name=self.dataset_name,
                       export_folder=self.__gen_dir(export_folder))
@@ -0,0 +1,270 @@
+from collections.abc import Sequence
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from xtreme1.exporter.geometry import bounding_box
+
+
+def _is_flat_points(points) -> bool:
+    return isinstance(points, list) and all(
+        isinstance(p, dict) and len(p) == 2 and 'x' in p and 'y' in p for p in points
+    )
+
+
+class _Names:
+    # Interns strings to small integer ids.
+
+    def __init__(self):
+        self.names = []
+        self._ids = {}
+
+    def id(self, name: Optional[str]) -> int:
+        if name is None:
+            return -1
+        i = self._ids.get(name)
+        if i is None:
+            i = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+
+# Object fields with a column of their own. 'contour' only has one when its points are plain 2D points.
+_OBJECT_COLUMNS = ('id', 'trackId', 'trackName', 'className', 'type', 'modelConfidence', 'classValues', 'contour')
+
+class _Missing:
+    # Marks a field an object doesn't have in the columns of Python values.
+    # It's unpickled as the same object, so stores can be sent to other processes.
+
+    def __reduce__(self):
+        return '_MISSING'
+
+    def __repr__(self):
+        return '_MISSING'
+
+
+_MISSING = _Missing()
+
+
+class ColumnarAnnotation(Sequence):
+    """
+    Annotation items kept in contiguous numpy arrays instead of nested dicts.
+
+    Objects of all items are stored column by column: class ids (into 'class_names'), tool
+    types (into 'tool_types'), bboxes, model confidences ('scores', NaN when there is none)
+    and one flat buffer of contour points with per-object offsets. Points take 18 bytes
+    instead of a dict each. Ids, track ids, track names and class values are kept in plain
+    lists, and only the fields no column knows about are kept in a dict for the object.
+
+    It's a read-only sequence of the same `{'data': ..., 'result': ...}` dicts it was built
+    from; an item is put back together when it's accessed.
+    """
+
+    def __init__(
+            self,
+            items: Iterable[Dict]
+    ):
+        classes = _Names()
+        tools = _Names()
+        # Key orders are kept so that items come back exactly as they were (down to json output).
+        # There are only a few distinct orders, so each is stored once and objects refer to it.
+        orders = _Names()
+        datas, headers = [], []
+        item_offsets = [0]
+        class_ids, tool_ids, scores, extras = [], [], [], []
+        object_ids, track_ids, track_names, class_values = [], [], [], []
+        order_ids, contour_order_ids = [], []
+        point_offsets, coords, int_coords, bboxes = [0], [], [], []
+
+        for item in items:
+            datas.append(item.get('data'))
+            result = item.get('result')
+            objects = result.get('objects') if isinstance(result, dict) else None
+            if objects is None:
+                headers.append((result, None))
+                item_offsets.append(item_offsets[-1])
+                continue
+            headers.append(({k: v for k, v in result.items() if k != 'objects'},
+                            orders.names[orders.id(tuple(result))]))
+
+            for obj in objects:
+                # Fields that don't fit a column (a missing class, a non-numeric score,
+                # 3D points...) are kept in the object's dict of other fields.
+                extra = {k: v for k, v in obj.items() if k not in _OBJECT_COLUMNS}
+                order_ids.append(orders.id(tuple(obj)))
+                object_ids.append(obj.get('id', _MISSING))
+                track_ids.append(obj.get('trackId', _MISSING))
+                track_names.append(obj.get('trackName', _MISSING))
+                class_values.append(obj.get('classValues', _MISSING))
+
+                class_name = obj.get('className')
+                if not isinstance(class_name, str):
+                    class_name = None
+                    if 'className' in obj:
+                        extra['className'] = obj['className']
+                tool_type = obj.get('type')
+                if not isinstance(tool_type, str):
+                    tool_type = None
+                    if 'type' in obj:
+                        extra['type'] = obj['type']
+                score = obj.get('modelConfidence')
+                if not isinstance(score, float):
+                    # Ints are kept as they are, but are still usable as scores.
+                    if 'modelConfidence' in obj:
+                        extra['modelConfidence'] = score
+                    if not isinstance(score, int) or isinstance(score, bool):
+                        score = None
+                class_ids.append(classes.id(class_name))
+                tool_ids.append(tools.id(tool_type))
+                scores.append(np.nan if score is None else score)
+
+                contour = obj.get('contour')
+                points = contour.get('points') if isinstance(contour, dict) else None
+                if _is_flat_points(points):
+                    rest = {k: v for k, v in contour.items() if k != 'points'}
+                    if rest:
+                        extra['contour'] = rest
+                    contour_order_ids.append(orders.id(tuple(contour)))
+                    flat = [v for p in points for v in (p['x'], p['y'])]
+                    coords.extend(flat)
+                    int_coords.extend(type(v) is int for v in flat)
+                    bboxes.append(bounding_box(points) if points else [np.nan] * 4)
+                else:
+                    if 'contour' in obj:
+                        extra['contour'] = contour
+                    contour_order_ids.append(-1)
+                    bboxes.append([np.nan] * 4)
+                point_offsets.append(len(coords) // 2)
+                extras.append(extra or None)
+            item_offsets.append(len(class_ids))
+
+        self._datas = datas
+        self._headers = headers
+        self._extras = extras
+        self._object_ids = object_ids
+        self._track_ids = track_ids
+        self._track_names = track_names
+        self._class_values = class_values
+        self._orders = orders.names
+        self._order_ids = np.array(order_ids, dtype=np.int32)
+        self._contour_order_ids = np.array(contour_order_ids, dtype=np.int32)
+        self.class_names = classes.names
+        self.tool_types = tools.names
+        self.item_offsets = np.array(item_offsets, dtype=np.int64)
+        self.class_ids = np.array(class_ids, dtype=np.int32)
+        self.tool_ids = np.array(tool_ids, dtype=np.int16)
+        self.scores = np.array(scores, dtype=np.float64)
+        self.bboxes = np.array(bboxes, dtype=np.float64).reshape(-1, 4)
+        self.point_offsets = np.array(point_offsets, dtype=np.int64)
+        self.points = np.array(coords, dtype=np.float64).reshape(-1, 2)
+        self.int_coords = np.array(int_coords, dtype=bool).reshape(-1, 2)
+
+    @property
+    def object_item(
+            self
+    ) -> np.ndarray:
+        """
+        The index of the item every object belongs to.
+        """
+        return np.repeat(np.arange(len(self)), np.diff(self.item_offsets))
+
+    @property
+    def nbytes(
+            self
+    ) -> int:
+        """
+        The size of the numpy arrays in bytes.
+        """
+        arrays = (self.item_offsets, self.class_ids, self.tool_ids, self.scores, self.bboxes,
+                  self.point_offsets, self.points, self.int_coords, self._order_ids, self._contour_order_ids)
+        return sum(a.nbytes for a in arrays)
+
+    def object_points(
+            self,
+            i: int
+    ) -> Optional[np.ndarray]:
+        """
+        The contour points of the i-th object as an (N, 2) array view,
+        or None if they aren't plain 2D points.
+        """
+        if self._contour_order_ids[i] < 0:
+            return None
+        return self.points[self.point_offsets[i]: self.point_offsets[i + 1]]
+
+    def object_coords(
+            self,
+            i: int
+    ) -> List[list]:
+        """
+        The contour points of the i-th object as [x, y] lists, with the int coordinates kept as ints.
+        """
+        start, end = self.point_offsets[i], self.point_offsets[i + 1]
+        coords = self.points[start: end].tolist()
+        ints = self.int_coords[start: end]
+        if ints.any():
+            coords = [[int(v) if is_int else v for v, is_int in zip(xy, flags)]
+                      for xy, flags in zip(coords, ints.tolist())]
+
+        return coords
+
+    def _object(
+            self,
+            i: int
+    ) -> Dict:
+        extra = self._extras[i]
+        values = dict(extra) if extra else {}
+        for key, column in (('id', self._object_ids), ('trackId', self._track_ids),
+                            ('trackName', self._track_names), ('classValues', self._class_values)):
+            value = column[i]
+            if value is not _MISSING:
+                values[key] = value
+        class_id, tool_id = self.class_ids[i], self.tool_ids[i]
+        if class_id >= 0:
+            values['className'] = self.class_names[class_id]
+        if tool_id >= 0:
+            values['type'] = self.tool_types[tool_id]
+        if 'modelConfidence' not in values and not np.isnan(self.scores[i]):
+            values['modelConfidence'] = self.scores[i].item()
+        contour_order = self._contour_order_ids[i]
+        if contour_order >= 0:
+            coords = self.object_coords(i)
+            contour = dict(values.get('contour') or {}, points=[{'x': x, 'y': y} for x, y in coords])
+            values['contour'] = {k: contour[k] for k in self._orders[contour_order]}
+
+        return {k: values[k] for k in self._orders[self._order_ids[i]]}
+
+    def _item(
+            self,
+            index: int
+    ) -> Dict:
+        result, order = self._headers[index]
+        if order is not None:
+            start, end = self.item_offsets[index], self.item_offsets[index + 1]
+            values = dict(result, objects=[self._object(i) for i in range(start, end)])
+            result = {k: values[k] for k in order}
+
+        return {'data': self._datas[index], 'result': result}
+
+    def __len__(self):
+        return len(self._datas)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('annotation index out of range')
+        return self._item(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._item(i)
+
+    def __repr__(self):
+        return f"ColumnarAnnotation(items={len(self)}, objects={len(self.class_ids)}, points={len(self.points)})"
+
+    def to_list(
+            self
+    ) -> List[Dict]:
+        return list(self)
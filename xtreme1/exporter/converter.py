@@ -1,10 +1,185 @@
 import zipfile
-import json
 import os
+from itertools import chain
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from os.path import *
 from xtreme1.exporter.annotation import __supported_format__, Annotation
 from xtreme1.exceptions import *
+from xtreme1._others import _json_loads
+
+
+def _member_key(parts: List[str]) -> str:
+    # The path of a member under 'data/' or 'result/', without its extension.
+    return splitext('/'.join([parts[0]] + parts[2:]))[0]
+
+
+def _split(items: list, parts: int) -> List[list]:
+    size = max(1, -(-len(items) // parts))
+    return [items[i: i + size] for i in range(0, len(items), size)]
+
+
+def _decode_pairs(src_zipfile: str, pairs: List[Tuple[str, Optional[str]]]) -> List[Dict]:
+    # Runs in a worker process, with its own handle of the zip.
+    with zipfile.ZipFile(src_zipfile, 'r') as zip_file:
+        return [
+            {
+                'data': _json_loads(zip_file.read(data)),
+                'result': _json_loads(zip_file.read(result)) if result else {}
+            }
+            for data, result in pairs
+        ]
+
+
+def _read_ids(src_zipfile: str, names: List[str], key: str) -> List[Tuple[str, object]]:
+    with zipfile.ZipFile(src_zipfile, 'r') as zip_file:
+        return [(name, _json_loads(zip_file.read(name)).get(key)) for name in names]
+
+
+class ZipAnnotation(Sequence):
+    """
+    The annotations of an offline export zip, read lazily.
+
+    The members of the zip are indexed once when it's opened: every 'data' member is paired
+    with the 'result' member at the same path under 'result/'. Only if some can't be paired that way,
+    the unpaired members are read once to pair them by 'dataId'. Members are only decoded
+    when an item is accessed, so iterating over the whole export needs the memory of a
+    single item. Items are `{'data': ..., 'result': ...}` dicts like the ones of `Annotation`.
+
+    With 'workers' > 1 the whole zip is decoded up front instead, by a pool of processes that
+    each read their share of the members through their own handle of the zip.
+    """
+
+    def __init__(
+            self,
+            src_zipfile: str,
+            dropna: bool = False,
+            workers: int = 1
+    ):
+        self.src_zipfile = src_zipfile
+        self.dropna = dropna
+        self.workers = workers
+        self._zip = None
+        self._items = None
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                self._pairs = self._index(executor)
+                self._items = self._decode_all(executor)
+        else:
+            self._pairs = self._index()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_zip'] = None
+        return state
+
+    def _open(self) -> zipfile.ZipFile:
+        if self._zip is None:
+            self._zip = zipfile.ZipFile(self.src_zipfile, 'r')
+        return self._zip
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def _index(self, executor: Optional[ProcessPoolExecutor] = None) -> List[Tuple[str, Optional[str]]]:
+        datas = []
+        results = {}
+        for name in self._open().namelist():
+            parts = name.split('/')
+            if name.endswith('/') or len(parts) < 3:
+                continue
+            if parts[1] == 'result':
+                results[_member_key(parts)] = name
+            else:
+                datas.append(name)
+
+        pairs = [(data, results.pop(_member_key(data.split('/')), None)) for data in datas]
+        if results and any(result is None for _, result in pairs):
+            pairs = self._pair_by_id(pairs, list(results.values()), executor)
+        if self.dropna:
+            pairs = [pair for pair in pairs if pair[1] is not None]
+
+        return pairs
+
+    def _pair_by_id(
+            self,
+            pairs: List[Tuple[str, Optional[str]]],
+            results: List[str],
+            executor: Optional[ProcessPoolExecutor] = None
+    ) -> List[Tuple[str, Optional[str]]]:
+        unpaired = [data for data, result in pairs if result is None]
+        result_ids = self._read_ids(results, 'dataId', executor)
+        data_ids = dict(self._read_ids(unpaired, 'id', executor))
+
+        id_result = {data_id: result for result, data_id in result_ids}
+        return [(data, result or id_result.get(data_ids[data])) for data, result in pairs]
+
+    def _read_ids(
+            self,
+            names: List[str],
+            key: str,
+            executor: Optional[ProcessPoolExecutor] = None
+    ) -> List[Tuple[str, object]]:
+        if executor is None:
+            return [(name, self._load(name).get(key)) for name in names]
+        chunks = _split(names, self.workers * 4)
+        return list(chain.from_iterable(
+            executor.map(_read_ids, [self.src_zipfile] * len(chunks), chunks, [key] * len(chunks))
+        ))
+
+    def _decode_all(self, executor: ProcessPoolExecutor) -> List[Dict]:
+        chunks = _split(self._pairs, self.workers * 4)
+        return list(chain.from_iterable(
+            executor.map(_decode_pairs, [self.src_zipfile] * len(chunks), chunks)
+        ))
+
+    def _load(self, name: str) -> Dict:
+        return _json_loads(self._open().read(name))
+
+    def _item(self, pair: Tuple[str, Optional[str]]) -> Dict:
+        data, result = pair
+        return {
+            'data': self._load(data),
+            'result': self._load(result) if result else {}
+        }
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def __getitem__(self, index):
+        if self._items is not None:
+            return self._items[index]
+        if isinstance(index, slice):
+            return [self._item(pair) for pair in self._pairs[index]]
+        return self._item(self._pairs[index])
+
+    def __iter__(self) -> Iterator[Dict]:
+        if self._items is not None:
+            yield from self._items
+            return
+        for pair in self._pairs:
+            yield self._item(pair)
+
+    def __repr__(self):
+        return f"ZipAnnotation(src_zipfile={self.src_zipfile}, items={len(self)})"
+
+
+def _infer_type(
+        annotation: Sequence
+) -> Optional[str]:
+    # An offline export doesn't say what type the dataset is, but image data has an 'imageUrl'.
+    if not len(annotation):
+        return None
+    data = annotation[0]['data']
+    if data.get('type'):
+        return data['type']
+    if 'imageUrl' in data:
+        return 'IMAGE'
+    return None
 
 
 class Result:
@@ -13,7 +188,8 @@ class Result:
     def __init__(self,
                  src_zipfile: str,
                  export_folder: str = None,
-                 dropna: bool = False
+                 dropna: bool = False,
+                 workers: int = 1
                  ):
         if zipfile.is_zipfile(src_zipfile):
             self.src_zipfile = src_zipfile
@@ -28,7 +204,13 @@ class Result:
         if not exists(self.export_folder):
             os.mkdir(self.export_folder)
         self.dropna = dropna
-        self.annotation = Annotation(annotation=self.__reconstitution(), dataset_name=self.dataset_name)
+        items = ZipAnnotation(src_zipfile, dropna=dropna, workers=workers)
+        self.annotation = Annotation(
+            client=None,
+            annotation=items,
+            dataset_name=self.dataset_name,
+            dataset_type=_infer_type(items)
+        )
 
     def __setattr__(self, key, value):
         if key == '_SUPPORTED_FORMAT':
@@ -36,37 +218,11 @@ class Result:
         else:
             self.__dict__[key] = value
 
-    def __reconstitution(self):
-        dropna = self.dropna
-        zip_file = zipfile.ZipFile(self.src_zipfile, 'r')
-        file_list = zip_file.namelist()
-        results = []
-        datas = []
-        for fl in file_list:
-            if fl.split('/')[1] == 'result':
-                results.append(fl)
-            else:
-                datas.append(fl)
-        id_result = {}
-        annotation = []
-        for result in results:
-            result_content = json.loads(zip_file.read(result))
-            id_result[result_content['dataId']] = result_content
-        for data in datas:
-            data_content = json.loads(zip_file.read(data))
-            data_result = id_result.get(data_content['id'], {})
-            anno = {
-                'data': data_content,
-                'result': data_result
-            }
-            if dropna:
-                if data_result:
-                    annotation.append(anno)
-                else:
-                    continue
-            else:
-                annotation.append(anno)
-        return annotation
+    def iter_annotation(self) -> Iterator[Dict]:
+        """
+        Yield the {'data': ..., 'result': ...} items of the zip one by one.
+        """
+        yield from self.annotation.annotation
 
     def __str__(self):
         return f"Offline annotation(dataset_name={self.dataset_name})"
@@ -92,16 +248,16 @@ class Result:
         return self._SUPPORTED_FORMAT_INFO
 
     def head(self, count=5):
-        self.annotation.head(count)
+        return self.annotation.head(count)
 
     def tail(self, count=5):
-        self.annotation.tail(count)
+        return self.annotation.tail(count)
 
     def view(self, count: int = 5):
         self.annotation.view(count)
 
     def to_dict(self):
-        self.annotation.to_dict()
+        return list(self.annotation.to_dict())
 
     def convert(self, format: str, export_folder: str = None):
 
@@ -0,0 +1,157 @@
+from typing import List, Dict, Union
+
+import numpy as np
+
+Points = Union[List[Dict], np.ndarray]
+
+
+def to_array(
+        points: Points
+) -> np.ndarray:
+    """
+    Turn a list of {'x': x, 'y': y} points into an (N, 2) float array.
+    """
+    if isinstance(points, np.ndarray):
+        return points.reshape(-1, 2).astype(np.float64, copy=False)
+    return np.array([[p['x'], p['y']] for p in points], dtype=np.float64).reshape(-1, 2)
+
+
+def polygon_area(
+        points: Points
+) -> float:
+    """
+    The area of a simple polygon, computed with the shoelace formula.
+
+    Parameters
+    ----------
+    points: Union[List[Dict], np.ndarray]
+        Vertices of the polygon, in order.
+
+    Returns
+    -------
+    float
+        The area in pixels.
+    """
+    pts = to_array(points)
+    if len(pts) < 3:
+        return 0.0
+    x, y = pts[:, 0], pts[:, 1]
+
+    return float(abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2)
+
+
+def bounding_box(
+        points: Points
+) -> List[float]:
+    """
+    The axis-aligned bounding box of some points.
+
+    Parameters
+    ----------
+    points: Union[List[Dict], np.ndarray]
+        Any points.
+
+    Returns
+    -------
+    List[float]
+        [x_min, y_min, width, height], the same as a COCO bbox.
+    """
+    pts = to_array(points)
+    if not len(pts):
+        return [0, 0, 0, 0]
+    x0, y0 = pts.min(axis=0)
+    x1, y1 = pts.max(axis=0)
+
+    return [_to_number(x0), _to_number(y0), _to_number(x1 - x0), _to_number(y1 - y0)]
+
+
+def _to_number(
+        value: float
+) -> Union[int, float]:
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def _rasterize(
+        pts: np.ndarray,
+        height: int,
+        width: int
+):
+    # Scanline fill of the polygon, only over its bounding box.
+    # A pixel is inside if its center is inside the polygon (even-odd rule).
+    x0 = max(int(np.floor(pts[:, 0].min())), 0)
+    x1 = min(int(np.ceil(pts[:, 0].max())), width)
+    y0 = max(int(np.floor(pts[:, 1].min())), 0)
+    y1 = min(int(np.ceil(pts[:, 1].max())), height)
+    if x1 <= x0 or y1 <= y0:
+        return np.zeros((0, 0), dtype=bool), x0, y0
+
+    w = x1 - x0
+    rows = (np.arange(y0, y1) + 0.5)[:, None]
+    px, py = pts[:, 0], pts[:, 1]
+    qx, qy = np.roll(px, -1), np.roll(py, -1)
+
+    crosses = (py <= rows) != (qy <= rows)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xs = px + (rows - py) / (qy - py) * (qx - px)
+    xs = np.where(crosses, xs, np.inf)
+    if xs.shape[1] % 2:
+        xs = np.hstack([xs, np.full((xs.shape[0], 1), np.inf)])
+    xs.sort(axis=1)
+
+    starts = np.clip(np.ceil(xs[:, 0::2] - 0.5) - x0, 0, w).astype(np.int64)
+    ends = np.clip(np.ceil(xs[:, 1::2] - 0.5) - x0, 0, w).astype(np.int64)
+    offsets = (np.arange(len(rows)) * (w + 1))[:, None]
+    size = len(rows) * (w + 1)
+
+    diff = np.bincount((starts + offsets).ravel(), minlength=size) - \
+        np.bincount((ends + offsets).ravel(), minlength=size)
+    mask = np.cumsum(diff.reshape(len(rows), w + 1)[:, :w], axis=1) > 0
+
+    return mask, x0, y0
+
+
+def polygon_to_rle(
+        points: Points,
+        height: int,
+        width: int
+) -> Dict:
+    """
+    Encode a polygon as an uncompressed COCO RLE.
+    Only the bounding box of the polygon is rasterized, never the whole image.
+
+    Parameters
+    ----------
+    points: Union[List[Dict], np.ndarray]
+        Vertices of the polygon, in order.
+    height: int
+        Image height.
+    width: int
+        Image width.
+
+    Returns
+    -------
+    Dict
+        {'size': [height, width], 'counts': [...]}, in column-major order like pycocotools.
+    """
+    pts = to_array(points)
+    total = height * width
+    if len(pts) < 3:
+        return {'size': [height, width], 'counts': [total]}
+
+    mask, x0, y0 = _rasterize(pts, height, width)
+    if not mask.size:
+        return {'size': [height, width], 'counts': [total]}
+
+    h, w = mask.shape
+    edge = np.zeros((1, w), dtype=np.int8)
+    changes = np.diff(np.vstack([edge, mask.astype(np.int8), edge]), axis=0)
+    cols, rows = np.nonzero(changes.T)
+    positions = (cols + x0) * height + rows + y0
+    # A run ending at the bottom of a column and one starting at the top of the next are one run:
+    # both changes fall on the same position and cancel out. A change at the very end changes nothing.
+    positions, times = np.unique(positions, return_counts=True)
+    positions = positions[(times % 2 == 1) & (positions < total)]
+    counts = np.diff(np.concatenate([[0], positions, [total]]))
+
+    return {'size': [height, width], 'counts': counts.tolist()}
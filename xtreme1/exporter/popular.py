@@ -1,135 +1,169 @@
 import os
 import json
-import cv2
-import numpy as np
+import gzip
 import base64
+import shutil
+import tempfile
 
-import requests
-from rich.progress import track
+from typing import Optional
 from datetime import datetime
 from os.path import join
-from xml.dom.minidom import Document
+import numpy as np
 from xtreme1._version import __version__
 from xtreme1.exceptions import ConverterException
-
-
-def _to_coco(annotation: list, dataset_name: str, export_folder: str):
-    images = []
-    annotations = []
-    categorys = []
-    category_mapping = {}
-    img_id = 0
-    object_id = 0
-    category_id = 1
-    for anno in track(annotation, description='progress'):
+from xtreme1.exporter._parallel import _progress, _run_per_item
+from xtreme1.cache import BlobCache
+from xtreme1.exporter._images import _ImageFetcher, _image_name
+from xtreme1.exporter.geometry import polygon_area, bounding_box, polygon_to_rle
+from xtreme1.exporter.columnar import ColumnarAnnotation, _MISSING
+
+
+_SHAPE_TYPES = {
+    "RECTANGLE": 'rectangle',
+    "POLYGON": 'polygon',
+    "POLYLINE": 'polyline'
+}
+
+
+def _with_images(annotation, export_folder: str, embed_image: bool, image_cache: Optional[BlobCache], api,
+                 fetch_workers: int):
+    # Images are only needed to embed them, or to put them next to the jsons that reference them.
+    if not (embed_image or image_cache):
+        return ((anno, None) for anno in annotation)
+    fetcher = _ImageFetcher(api=api, workers=fetch_workers, cache=image_cache)
+    return fetcher.imap(annotation, keep_content=embed_image, image_folder=None if embed_image else export_folder)
+
+
+def _rectangle_corners(bbox: list):
+    x0, y0, width, height = bbox
+    return [[x0, y0], [x0 + width, y0], [x0 + width, y0 + height], [x0, y0 + height]]
+
+
+class _CocoWriter:
+    """
+    Write a COCO json file incrementally.
+    Images are written to the target file as they come; annotations are spooled to a temporary
+    file and appended at the end, so memory doesn't grow with the dataset.
+    """
+
+    def __init__(
+            self,
+            save_path: str,
+            info: dict,
+            compact: bool = False,
+            compress: bool = False
+    ):
+        self._dump_kwargs = {'ensure_ascii': False}
+        if compact:
+            self._dump_kwargs['separators'] = (',', ':')
+        else:
+            self._dump_kwargs['indent'] = 1
+        self._save_path = save_path
+        if compress:
+            self._file = gzip.open(save_path, 'wt', encoding='utf-8')
+        else:
+            self._file = open(save_path, 'w', encoding='utf-8')
+        self._spool = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self._image_count = 0
+        self._annotation_count = 0
+        self._file.write('{"info": ' + self._dumps(info) + ', "licenses": [], "images": [\n')
+
+    def _dumps(
+            self,
+            obj
+    ) -> str:
+        return json.dumps(obj, **self._dump_kwargs)
+
+    def add_image(
+            self,
+            image: dict
+    ):
+        if self._image_count:
+            self._file.write(',\n')
+        self._file.write(self._dumps(image))
+        self._image_count += 1
+
+    def add_annotation(
+            self,
+            annotation: dict
+    ):
+        if self._annotation_count:
+            self._spool.write(',\n')
+        self._spool.write(self._dumps(annotation))
+        self._annotation_count += 1
+
+    def close(
+            self,
+            categories: list
+    ):
+        self._file.write('\n], "annotations": [\n')
+        self._spool.seek(0)
+        shutil.copyfileobj(self._spool, self._file)
+        self._spool.close()
+        self._file.write('\n], "categories": ' + self._dumps(categories) + '}\n')
+        self._file.close()
+
+    def abort(
+            self
+    ):
+        # Close both files and remove the unfinished one.
+        self._spool.close()
+        self._file.close()
         try:
-            img_width = anno['data']['width']
-            img_height = anno['data']['height']
-            img_url = anno['data']['imageUrl']
+            os.remove(self._save_path)
+        except OSError:
+            pass
+
+
+_NO_SCORE = object()
+
+
+def _dict_objects(result: dict):
+    # (class name, tool type, [x, y] points, points for the geometry, class values, score) of every object,
+    # or None for an object without a class.
+    for obj in result['objects']:
+        if 'className' not in obj.keys():
+            yield None
+            continue
+        points = obj['contour']['points']
+        yield (obj['className'], obj['type'], [(p['x'], p['y']) for p in points], points,
+               obj.get('classValues'), obj.get('modelConfidence', _NO_SCORE))
+
+
+def _columnar_objects(store: ColumnarAnnotation, index: int):
+    # The same as `_dict_objects`, read from the columns without putting the objects back together.
+    for i in range(store.item_offsets[index], store.item_offsets[index + 1]):
+        shape = store.object_points(i)
+        class_values = store._class_values[i]
+        if store._extras[i] is not None or shape is None or class_values is _MISSING or store.tool_ids[i] < 0:
+            # An unusual object: fields outside the columns decide what it is.
+            yield from _dict_objects({'objects': [store._object(i)]})
+            continue
+        if store.class_ids[i] < 0:
+            yield None
+            continue
+        score = store.scores[i]
+        yield (store.class_names[store.class_ids[i]], store.tool_types[store.tool_ids[i]], store.object_coords(i),
+               shape, class_values, _NO_SCORE if np.isnan(score) else score.item())
+
+
+def _coco_items(annotation):
+    # (data, objects) of every item, with objects None for an item without a result.
+    if not isinstance(annotation, ColumnarAnnotation):
+        for anno in annotation:
             result = anno['result']
-            if not result:
-                continue
-            else:
-                objects = result['objects']
-                for obj in objects:
-                    if 'className' not in obj.keys():
-                        continue
-                    else:
-                        class_name = obj['className']
-                        if class_name not in category_mapping.keys():
-                            category_mapping[class_name] = category_id
-                            category = {
-                                "id": category_id,
-                                "name": class_name,
-                                "supercategory": "",
-                                "attributes": {}
-                            }
-                            categorys.append(category)
-                            category_id += 1
-
-                        tool_type = obj['type']
-                        points = obj['contour']['points']
-                        if tool_type == 'RECTANGLE':
-                            xl = []
-                            yl = []
-                            for point in points:
-                                xl.append(point['x'])
-                                yl.append(point['y'])
-                            x0 = min(xl)
-                            y0 = min(yl)
-                            width = max(xl) - x0
-                            height = max(yl) - y0
-                            new_anno = {
-                                "id": object_id,
-                                "image_id": img_id,
-                                "category_id": category_mapping[class_name],
-                                "segmentation": [],
-                                "area": width * height,
-                                "bbox": [x0, y0, width, height],
-                                "iscrowd": 0
-                            }
-                        elif tool_type == 'POLYGON':
-                            segmentation = []
-                            coordinate = []
-                            for point in points:
-                                coordinate.append([int(point['x']), int(point['y'])])
-                                segmentation.append(point['x'])
-                                segmentation.append(point['y'])
-                            mask = np.zeros((img_height, img_width), dtype=np.int32)
-                            cv2.fillPoly(mask, [np.array(coordinate)], 1)
-                            aera = int(np.sum(mask))
-                            new_anno = {
-                                "id": object_id,
-                                "image_id": img_id,
-                                "category_id": category_mapping[class_name],
-                                "segmentation": segmentation,
-                                "area": aera,
-                                "bbox": [],
-                                "iscrowd": 0
-                            }
-                        elif tool_type == 'POLYLINE':
-                            keypoints = []
-                            for point in points:
-                                keypoints.append(point['x'])
-                                keypoints.append(point['y'])
-                                keypoints.append(2)
-                            new_anno = {
-                                "id": object_id,
-                                "image_id": img_id,
-                                "category_id": category_mapping[class_name],
-                                "segmentation": [],
-                                "bbox": [],
-                                "keypoints": keypoints,
-                                "num_keypoints": len(points),
-                                "iscrowd": 0
-                            }
-                        else:
-                            continue
-                        attributes = {}
-                        class_values = obj['classValues']
-                        for cv in class_values:
-                            attributes[cv['name']] = cv['value']
-                        if attributes:
-                            new_anno['attributes'] = attributes
-                        if 'modelConfidence' in obj.keys():
-                            new_anno['score'] = obj['modelConfidence']
-                        annotations.append(new_anno)
-                        object_id += 1
-
-                one_image = {
-                    "id": img_id,
-                    "license": 0,
-                    "file_name": img_url.split('?')[0].split('/')[-1],
-                    "xtreme1_url": img_url,
-                    "width": img_width,
-                    "height": img_height,
-                    "date_captured": None
-                }
-                images.append(one_image)
-                img_id += 1
-        except Exception:
-            raise ConverterException
-
+            yield anno['data'], _dict_objects(result) if result else None
+        return
+    for index, data in enumerate(annotation._datas):
+        result, order = annotation._headers[index]
+        if order is not None:
+            yield data, _columnar_objects(annotation, index)
+        else:
+            yield data, _dict_objects(result) if result else None
+
+
+def _to_coco(annotation: list, dataset_name: str, export_folder: str, use_rle: bool = False,
+             compact: bool = False, compress: bool = False):
     info = {
         "contributor": "",
         "date_created": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
@@ -139,266 +173,356 @@ def _to_coco(annotation: list, dataset_name: str, export_folder: str):
         "year": f"{datetime.utcnow().year}",
         "version": __version__,
     }
-
-    anno_json = {
-        "info": info,
-        "licenses": [],
-        "images": images,
-        "annotations": annotations,
-        "categories": categorys
-    }
-    save_json = join(export_folder, f'{dataset_name}_coco.json')
-    with open(save_json, 'w', encoding='utf-8') as jf:
-        json.dump(anno_json, jf, indent=1, ensure_ascii=False)
-
-
-def _to_voc(annotation: list, dataset_name: str, export_folder: str):
-    type_mapping = {
-        "RECTANGLE": 'rectangle',
-        "POLYGON": 'polygon',
-        "POLYLINE": 'polyline'
-    }
-    for anno in track(annotation, description='progress'):
-        try:
-            file_name = f"{anno['data'].get('name')}-{anno['data'].get('id')}"
-            json_file = join(export_folder, file_name + '.json')
-            annotations = []
-            img_width = anno['data']['width']
-            img_height = anno['data']['height']
-            img_url = anno['data']['imageUrl']
-            rps = requests.get(img_url)
-            img_f_base64 = base64.b64encode(rps.content)
-            img_data = img_f_base64.decode()
-            result = anno['result']
-            if not result:
-                continue
-            else:
-                objects = result['objects']
-
-                doc = Document()
-                root = doc.createElement('annotation')
-                doc.appendChild(root)
-
-                _folder = doc.createElement('folder')
-                root.appendChild(_folder)
-                folder_text = doc.createTextNode(img_url.split('?')[0].split('/')[-1])
-                _folder.appendChild(folder_text)
-
-                filename = doc.createElement('filename')
-                root.appendChild(filename)
-                filename_text = doc.createTextNode(img_url.split('/')[-1])
-                filename.appendChild(filename_text)
-
-                source = doc.createElement('source')
-                root.appendChild(source)
-                database = doc.createElement('database')
-                source.appendChild(database)
-                database_text = doc.createTextNode('Unknown')
-                database.appendChild(database_text)
-
-                size = doc.createElement('size')
-                root.appendChild(size)
-
-                _width = doc.createElement('width')
-                size.appendChild(_width)
-                width_text = doc.createTextNode(str(img_width))
-                _width.appendChild(width_text)
-
-                _height = doc.createElement('height')
-                size.appendChild(_height)
-                height_text = doc.createTextNode(str(img_height))
-                _height.appendChild(height_text)
-
-                depth = doc.createElement('depth')
-                size.appendChild(depth)
-                depth_text = doc.createTextNode('3')
-                depth.appendChild(depth_text)
-
-                segmented = doc.createElement('segmented')
-                root.appendChild(segmented)
-                segmented_text = doc.createTextNode('0')
-                segmented.appendChild(segmented_text)
-
-                for obj in objects:
-                    if 'className' not in obj.keys():
-                        continue
-                    else:
-                        label = obj['className']
-                        points = []
-                        points_x = []
-                        points_y = []
-                        for point in obj['contour']['points']:
-                            points.append([point['x'], point['y']])
-                            points_x.append(point['x'])
-                            points_y.append(point['y'])
-
-                        tool_type = obj['type']
-                        if tool_type == 'RECTANGLE':
-                            coordinate = [[min(points_x), min(points_y)], [max(points_x), min(points_y)],
-                                          [max(points_x), max(points_y)], [min(points_x), max(points_y)]]
+    save_json = join(export_folder, f'{dataset_name}_coco.json' + ('.gz' if compress else ''))
+    writer = _CocoWriter(save_json, info, compact=compact, compress=compress)
+
+    try:
+        categorys = []
+        category_mapping = {}
+        img_id = 0
+        object_id = 0
+        category_id = 1
+        for data, objects in _progress(_coco_items(annotation), total=len(annotation) if hasattr(annotation, '__len__') else None):
+            try:
+                img_width = data['width']
+                img_height = data['height']
+                img_url = data['imageUrl']
+                if objects is None:
+                    continue
+                else:
+                    for obj in objects:
+                        if obj is None:
+                            continue
                         else:
-                            coordinate = points
-                        attributes = {}
-                        class_values = obj['classValues']
-                        for cv in class_values:
-                            attributes[cv['name']] = cv['value']
-
-                        new_anno = {
-                            "label": label,
-                            "points": coordinate,
-                            "group_id": None,
-                            "shape_type": type_mapping[tool_type],
-                            "flags": {}
-                        }
-                        if attributes:
-                            new_anno['attributes'] = attributes
-                        annotations.append(new_anno)
-
-                        _object = doc.createElement('object')
-                        root.appendChild(_object)
-
-                        sup_cate = doc.createElement('supercategory')
-                        _object.appendChild(sup_cate)
-                        sup_cate_text = doc.createTextNode('')
-                        sup_cate.appendChild(sup_cate_text)
-
-                        _name = doc.createElement('name')
-                        _object.appendChild(_name)
-                        name_text = doc.createTextNode(label)
-                        _name.appendChild(name_text)
-
-                        _pose = doc.createElement('pose')
-                        _object.appendChild(_pose)
-                        pose_text = doc.createTextNode('Unspecified')
-                        _pose.appendChild(pose_text)
-
-                        _truncated = doc.createElement('truncated')
-                        _object.appendChild(_truncated)
-                        truncated_text = doc.createTextNode('0')
-                        _truncated.appendChild(truncated_text)
-
-                        _difficult = doc.createElement('difficult')
-                        _object.appendChild(_difficult)
-                        difficult_text = doc.createTextNode('0')
-                        _difficult.appendChild(difficult_text)
-
-                        _bndbox = doc.createElement('bndbox')
-                        _object.appendChild(_bndbox)
-
-                        xmin = doc.createElement('xmin')
-                        _bndbox.appendChild(xmin)
-                        xmin_text = doc.createTextNode(str(min(xl)))
-                        xmin.appendChild(xmin_text)
-
-                        ymin = doc.createElement('ymin')
-                        _bndbox.appendChild(ymin)
-                        ymin_text = doc.createTextNode(str(min(yl)))
-                        ymin.appendChild(ymin_text)
-
-                        xmax = doc.createElement('xmax')
-                        _bndbox.appendChild(xmax)
-                        xmax_text = doc.createTextNode(str(max(xl)))
-                        xmax.appendChild(xmax_text)
-
-                        ymax = doc.createElement('ymax')
-                        _bndbox.appendChild(ymax)
-                        ymax_text = doc.createTextNode(str(max(yl)))
-                        ymax.appendChild(ymax_text)
-
-                    xml_file = os.path.join(xml_dir, file_name + '.xml')
-                    with open(xml_file, 'wb+') as xml_file:
-                        xml_file.write(doc.toprettyxml(encoding='utf-8'))
-
-                anno_json = {
-                    "version": "5.0.1",
-                    "flags": {},
-                    "shapes": annotations,
-                    "imagePath": img_url.split('?')[0].split('/')[-1],
-                    "imageData": img_data,
-                    "imageHeight": img_height,
-                    "imageWidth": img_width
-                }
-                with open(json_file, 'w', encoding='utf-8') as nf:
-                    json.dump(anno_json, nf, indent=1, ensure_ascii=False)
-
-        except Exception:
-            raise ConverterException
+                            class_name, tool_type, coords, shape, class_values, score = obj
+                            if class_name not in category_mapping.keys():
+                                category_mapping[class_name] = category_id
+                                category = {
+                                    "id": category_id,
+                                    "name": class_name,
+                                    "supercategory": "",
+                                    "attributes": {}
+                                }
+                                categorys.append(category)
+                                category_id += 1
+
+                            if tool_type == 'RECTANGLE':
+                                bbox = bounding_box(shape)
+                                new_anno = {
+                                    "id": object_id,
+                                    "image_id": img_id,
+                                    "category_id": category_mapping[class_name],
+                                    "segmentation": [],
+                                    "area": bbox[2] * bbox[3],
+                                    "bbox": bbox,
+                                    "iscrowd": 0
+                                }
+                            elif tool_type == 'POLYGON':
+                                if use_rle:
+                                    segmentation = polygon_to_rle(shape, img_height, img_width)
+                                else:
+                                    segmentation = [[]]
+                                    for x, y in coords:
+                                        segmentation[0].append(x)
+                                        segmentation[0].append(y)
+                                new_anno = {
+                                    "id": object_id,
+                                    "image_id": img_id,
+                                    "category_id": category_mapping[class_name],
+                                    "segmentation": segmentation,
+                                    "area": polygon_area(shape),
+                                    "bbox": bounding_box(shape),
+                                    "iscrowd": 0
+                                }
+                            elif tool_type == 'POLYLINE':
+                                keypoints = []
+                                for x, y in coords:
+                                    keypoints.append(x)
+                                    keypoints.append(y)
+                                    keypoints.append(2)
+                                new_anno = {
+                                    "id": object_id,
+                                    "image_id": img_id,
+                                    "category_id": category_mapping[class_name],
+                                    "segmentation": [],
+                                    "bbox": [],
+                                    "keypoints": keypoints,
+                                    "num_keypoints": len(coords),
+                                    "iscrowd": 0
+                                }
+                            else:
+                                continue
+                            attributes = {}
+                            for cv in class_values:
+                                attributes[cv['name']] = cv['value']
+                            if attributes:
+                                new_anno['attributes'] = attributes
+                            if score is not _NO_SCORE:
+                                new_anno['score'] = score
+                            writer.add_annotation(new_anno)
+                            object_id += 1
+
+                    one_image = {
+                        "id": img_id,
+                        "license": 0,
+                        "file_name": img_url.split('?')[0].split('/')[-1],
+                        "xtreme1_url": img_url,
+                        "width": img_width,
+                        "height": img_height,
+                        "date_captured": None
+                    }
+                    writer.add_image(one_image)
+                    img_id += 1
+            except Exception as e:
+                raise ConverterException(message=f"Can't convert data {data.get('id')} to coco") from e
+
+        writer.close(categorys)
+    except BaseException:
+        # Don't leave a truncated, invalid json behind.
+        writer.abort()
+        raise
+
+
+def _voc_item(item: tuple, export_folder: str, embed_image: bool = True):
+    anno, image = item
+    try:
+        file_name = f"{anno['data'].get('name')}-{anno['data'].get('id')}"
+        json_file = join(export_folder, file_name + '.json')
+        annotations = []
+        img_width = anno['data']['width']
+        img_height = anno['data']['height']
+        img_url = anno['data']['imageUrl']
+        result = anno['result']
+        if not result:
+            return
+        else:
+            objects = result['objects']
+
+            from xml.dom.minidom import Document
+            doc = Document()
+            root = doc.createElement('annotation')
+            doc.appendChild(root)
+
+            _folder = doc.createElement('folder')
+            root.appendChild(_folder)
+            folder_text = doc.createTextNode(img_url.split('?')[0].split('/')[-1])
+            _folder.appendChild(folder_text)
+
+            filename = doc.createElement('filename')
+            root.appendChild(filename)
+            filename_text = doc.createTextNode(img_url.split('/')[-1])
+            filename.appendChild(filename_text)
+
+            source = doc.createElement('source')
+            root.appendChild(source)
+            database = doc.createElement('database')
+            source.appendChild(database)
+            database_text = doc.createTextNode('Unknown')
+            database.appendChild(database_text)
+
+            size = doc.createElement('size')
+            root.appendChild(size)
+
+            _width = doc.createElement('width')
+            size.appendChild(_width)
+            width_text = doc.createTextNode(str(img_width))
+            _width.appendChild(width_text)
+
+            _height = doc.createElement('height')
+            size.appendChild(_height)
+            height_text = doc.createTextNode(str(img_height))
+            _height.appendChild(height_text)
+
+            depth = doc.createElement('depth')
+            size.appendChild(depth)
+            depth_text = doc.createTextNode('3')
+            depth.appendChild(depth_text)
+
+            segmented = doc.createElement('segmented')
+            root.appendChild(segmented)
+            segmented_text = doc.createTextNode('0')
+            segmented.appendChild(segmented_text)
+
+            for obj in objects:
+                if 'className' not in obj.keys():
+                    continue
+                else:
+                    label = obj['className']
+                    points = [[point['x'], point['y']] for point in obj['contour']['points']]
+                    bbox = bounding_box(obj['contour']['points'])
+
+                    tool_type = obj['type']
+                    if tool_type == 'RECTANGLE':
+                        coordinate = _rectangle_corners(bbox)
+                    else:
+                        coordinate = points
+                    attributes = {}
+                    class_values = obj['classValues']
+                    for cv in class_values:
+                        attributes[cv['name']] = cv['value']
+
+                    new_anno = {
+                        "label": label,
+                        "points": coordinate,
+                        "group_id": None,
+                        "shape_type": _SHAPE_TYPES[tool_type],
+                        "flags": {}
+                    }
+                    if attributes:
+                        new_anno['attributes'] = attributes
+                    annotations.append(new_anno)
+
+                    _object = doc.createElement('object')
+                    root.appendChild(_object)
+
+                    sup_cate = doc.createElement('supercategory')
+                    _object.appendChild(sup_cate)
+                    sup_cate_text = doc.createTextNode('')
+                    sup_cate.appendChild(sup_cate_text)
+
+                    _name = doc.createElement('name')
+                    _object.appendChild(_name)
+                    name_text = doc.createTextNode(label)
+                    _name.appendChild(name_text)
+
+                    _pose = doc.createElement('pose')
+                    _object.appendChild(_pose)
+                    pose_text = doc.createTextNode('Unspecified')
+                    _pose.appendChild(pose_text)
+
+                    _truncated = doc.createElement('truncated')
+                    _object.appendChild(_truncated)
+                    truncated_text = doc.createTextNode('0')
+                    _truncated.appendChild(truncated_text)
+
+                    _difficult = doc.createElement('difficult')
+                    _object.appendChild(_difficult)
+                    difficult_text = doc.createTextNode('0')
+                    _difficult.appendChild(difficult_text)
+
+                    _bndbox = doc.createElement('bndbox')
+                    _object.appendChild(_bndbox)
+
+                    xmin = doc.createElement('xmin')
+                    _bndbox.appendChild(xmin)
+                    xmin_text = doc.createTextNode(str(bbox[0]))
+                    xmin.appendChild(xmin_text)
+
+                    ymin = doc.createElement('ymin')
+                    _bndbox.appendChild(ymin)
+                    ymin_text = doc.createTextNode(str(bbox[1]))
+                    ymin.appendChild(ymin_text)
+
+                    xmax = doc.createElement('xmax')
+                    _bndbox.appendChild(xmax)
+                    xmax_text = doc.createTextNode(str(bbox[0] + bbox[2]))
+                    xmax.appendChild(xmax_text)
+
+                    ymax = doc.createElement('ymax')
+                    _bndbox.appendChild(ymax)
+                    ymax_text = doc.createTextNode(str(bbox[1] + bbox[3]))
+                    ymax.appendChild(ymax_text)
+
+            xml_file = os.path.join(export_folder, file_name + '.xml')
+            with open(xml_file, 'wb+') as xml_file:
+                xml_file.write(doc.toprettyxml(encoding='utf-8'))
+
+            anno_json = {
+                "version": "5.0.1",
+                "flags": {},
+                "shapes": annotations,
+                "imagePath": _image_name(img_url),
+                "imageData": base64.b64encode(image).decode() if embed_image else None,
+                "imageHeight": img_height,
+                "imageWidth": img_width
+            }
+            with open(json_file, 'w', encoding='utf-8') as nf:
+                json.dump(anno_json, nf, indent=1, ensure_ascii=False)
+
+    except Exception:
+        raise ConverterException
+
+
+def _to_voc(annotation: list, dataset_name: str, export_folder: str, workers: int = 1,
+            embed_image: bool = True, image_cache: Optional[BlobCache] = None, api=None, fetch_workers: int = 8):
+    _run_per_item(_voc_item,
+                  _with_images(annotation, export_folder, embed_image, image_cache, api, fetch_workers),
+                  export_folder,
+                  workers=workers,
+                  total=len(annotation) if hasattr(annotation, '__len__') else None,
+                  embed_image=embed_image)
 
 
 def _to_yolo(annotation: list, dataset_name: str, export_folder: str):
     pass
 
 
-def _to_labelme(annotation: list, export_folder: str):
-    type_mapping = {
-        "RECTANGLE": 'rectangle',
-        "POLYGON": 'polygon',
-        "POLYLINE": 'polyline'
-    }
-    for anno in track(annotation, description='progress'):
-        try:
-            file_name = f"{anno['data'].get('name')}-{anno['data'].get('id')}"
-            json_file = join(export_folder, file_name + '.json')
-            annotations = []
-            img_width = anno['data']['width']
-            img_height = anno['data']['height']
-            img_url = anno['data']['imageUrl']
-            rps = requests.get(img_url)
-            img_f_base64 = base64.b64encode(rps.content)
-            img_data = img_f_base64.decode()
-            result = anno['result']
-            if not result:
-                continue
-            else:
-                objects = result['objects']
-                for obj in objects:
-                    if 'className' not in obj.keys():
-                        continue
+def _labelme_item(item: tuple, export_folder: str, embed_image: bool = True):
+    anno, image = item
+    try:
+        file_name = f"{anno['data'].get('name')}-{anno['data'].get('id')}"
+        json_file = join(export_folder, file_name + '.json')
+        annotations = []
+        img_width = anno['data']['width']
+        img_height = anno['data']['height']
+        img_url = anno['data']['imageUrl']
+        result = anno['result']
+        if not result:
+            return
+        else:
+            objects = result['objects']
+            for obj in objects:
+                if 'className' not in obj.keys():
+                    continue
+                else:
+                    label = obj['className']
+                    points = [[point['x'], point['y']] for point in obj['contour']['points']]
+                    bbox = bounding_box(obj['contour']['points'])
+
+                    tool_type = obj['type']
+                    if tool_type == 'RECTANGLE':
+                        coordinate = _rectangle_corners(bbox)
                     else:
-                        label = obj['className']
-                        points = []
-                        points_x = []
-                        points_y = []
-                        for point in obj['contour']['points']:
-                            points.append([point['x'], point['y']])
-                            points_x.append(point['x'])
-                            points_y.append(point['y'])
-
-                        tool_type = obj['type']
-                        if tool_type == 'RECTANGLE':
-                            coordinate = [[min(points_x), min(points_y)], [max(points_x), min(points_y)],
-                                          [max(points_x), max(points_y)], [min(points_x), max(points_y)]]
-                        else:
-                            coordinate = points
-                        attributes = {}
-                        class_values = obj['classValues']
-                        for cv in class_values:
-                            attributes[cv['name']] = cv['value']
-
-                        new_anno = {
-                            "label": label,
-                            "points": coordinate,
-                            "group_id": None,
-                            "shape_type": type_mapping[tool_type],
-                            "flags": {}
-                        }
-                        if attributes:
-                            new_anno['attributes'] = attributes
-                        annotations.append(new_anno)
-                anno_json = {
-                    "version": "5.0.1",
-                    "flags": {},
-                    "shapes": annotations,
-                    "imagePath": img_url.split('?')[0].split('/')[-1],
-                    "imageData": img_data,
-                    "imageHeight": img_height,
-                    "imageWidth": img_width
-                }
-                with open(json_file, 'w', encoding='utf-8') as nf:
-                    json.dump(anno_json, nf, indent=1, ensure_ascii=False)
-
-        except Exception:
-            raise ConverterException
+                        coordinate = points
+                    attributes = {}
+                    class_values = obj['classValues']
+                    for cv in class_values:
+                        attributes[cv['name']] = cv['value']
+
+                    new_anno = {
+                        "label": label,
+                        "points": coordinate,
+                        "group_id": None,
+                        "shape_type": _SHAPE_TYPES[tool_type],
+                        "flags": {}
+                    }
+                    if attributes:
+                        new_anno['attributes'] = attributes
+                    annotations.append(new_anno)
+            anno_json = {
+                "version": "5.0.1",
+                "flags": {},
+                "shapes": annotations,
+                "imagePath": _image_name(img_url),
+                "imageData": base64.b64encode(image).decode() if embed_image else None,
+                "imageHeight": img_height,
+                "imageWidth": img_width
+            }
+            with open(json_file, 'w', encoding='utf-8') as nf:
+                json.dump(anno_json, nf, indent=1, ensure_ascii=False)
+
+    except Exception:
+        raise ConverterException
+
+
+def _to_labelme(annotation: list, export_folder: str, workers: int = 1,
+                embed_image: bool = True, image_cache: Optional[BlobCache] = None, api=None, fetch_workers: int = 8):
+    _run_per_item(_labelme_item,
+                  _with_images(annotation, export_folder, embed_image, image_cache, api, fetch_workers),
+                  export_folder,
+                  workers=workers,
+                  total=len(annotation) if hasattr(annotation, '__len__') else None,
+                  embed_image=embed_image)
 
 
 def _to_kitti(annotation: list, dataset_name: str, export_folder: str):
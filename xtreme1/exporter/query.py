@@ -0,0 +1,217 @@
+from collections.abc import Sequence
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from xtreme1.exporter.columnar import ColumnarAnnotation, _Names
+
+Names = Union[str, List[str], None]
+
+
+def _as_list(value) -> list:
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+class AnnotationView(Sequence):
+    """
+    A selection of the items of another annotation sequence, without copying them.
+
+    'objects' optionally keeps only some objects of every selected item: the result of such
+    an item is a shallow copy holding a list of the selected object dicts.
+    """
+
+    def __init__(
+            self,
+            base: Sequence,
+            indices: np.ndarray,
+            objects: Optional[List[tuple]] = None
+    ):
+        self._base = base
+        self._indices = indices
+        self._objects = objects
+
+    def _item(
+            self,
+            position: int
+    ) -> Dict:
+        item = self._base[int(self._indices[position])]
+        if self._objects is None:
+            return item
+        result = item['result']
+        objects = result['objects']
+        result = dict(result, objects=[objects[j] for j in self._objects[position]])
+
+        return {'data': item['data'], 'result': result}
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('annotation index out of range')
+        return self._item(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._item(i)
+
+    def __repr__(self):
+        return f"AnnotationView(items={len(self)})"
+
+
+class _ObjectTable:
+    # The object columns needed for filtering, taken from a `ColumnarAnnotation`
+    # or collected from a sequence of item dicts in one pass.
+
+    def __init__(
+            self,
+            annotation: Sequence
+    ):
+        if isinstance(annotation, ColumnarAnnotation):
+            self.class_names = annotation.class_names
+            self.class_ids = annotation.class_ids
+            self.tool_types = annotation.tool_types
+            self.tool_ids = annotation.tool_ids
+            self.scores = annotation.scores
+            self.item_offsets = annotation.item_offsets
+            return
+
+        classes, tools = _Names(), _Names()
+        class_ids, tool_ids, scores, item_offsets = [], [], [], [0]
+        for item in annotation:
+            result = item.get('result')
+            for obj in (result.get('objects') or []) if isinstance(result, dict) else []:
+                class_name, tool_type = obj.get('className'), obj.get('type')
+                class_ids.append(classes.id(class_name if isinstance(class_name, str) else None))
+                tool_ids.append(tools.id(tool_type if isinstance(tool_type, str) else None))
+                score = obj.get('modelConfidence')
+                scores.append(score if isinstance(score, (int, float)) else np.nan)
+            item_offsets.append(len(class_ids))
+
+        self.class_names = classes.names
+        self.class_ids = np.array(class_ids, dtype=np.int32)
+        self.tool_types = tools.names
+        self.tool_ids = np.array(tool_ids, dtype=np.int16)
+        self.scores = np.array(scores, dtype=np.float64)
+        self.item_offsets = np.array(item_offsets, dtype=np.int64)
+
+    @property
+    def object_item(
+            self
+    ) -> np.ndarray:
+        return np.repeat(np.arange(len(self.item_offsets) - 1), np.diff(self.item_offsets))
+
+
+def _ids_of(
+        names: list,
+        values: Names
+) -> List[int]:
+    lookup = {name: i for i, name in enumerate(names)}
+    return [lookup[v] for v in _as_list(values) if v in lookup]
+
+
+class AnnotationIndex:
+    """
+    Lazily built indexes over an annotation sequence.
+    Every index is built the first time a filter needs it and reused afterwards.
+    """
+
+    def __init__(
+            self,
+            annotation: Sequence
+    ):
+        self._annotation = annotation
+        self._objects = None
+        self._data_ids = None
+        self._status_names = None
+        self._status_ids = None
+
+    @property
+    def objects(
+            self
+    ) -> _ObjectTable:
+        if self._objects is None:
+            self._objects = _ObjectTable(self._annotation)
+        return self._objects
+
+    @property
+    def data_ids(
+            self
+    ) -> Dict:
+        if self._data_ids is None:
+            self._data_ids = {item['data'].get('id'): i for i, item in enumerate(self._annotation)}
+        return self._data_ids
+
+    def _statuses(
+            self
+    ):
+        if self._status_ids is None:
+            statuses = _Names()
+            self._status_ids = np.array(
+                [statuses.id(item['data'].get('annotationStatus')) for item in self._annotation],
+                dtype=np.int16
+            )
+            self._status_names = statuses.names
+        return self._status_names, self._status_ids
+
+    def select(
+            self,
+            class_name: Names = None,
+            tool_type: Names = None,
+            data_id=None,
+            status: Names = None,
+            min_score: Optional[float] = None,
+            max_score: Optional[float] = None,
+            min_objects: Optional[int] = None,
+            max_objects: Optional[int] = None
+    ) -> AnnotationView:
+        items = np.ones(len(self._annotation), dtype=bool)
+
+        if data_id is not None:
+            positions = [self.data_ids[i] for i in _as_list(data_id) if i in self.data_ids]
+            selected = np.zeros_like(items)
+            selected[positions] = True
+            items &= selected
+
+        if status is not None:
+            names, ids = self._statuses()
+            items &= np.isin(ids, _ids_of(names, status))
+
+        by_object = any(v is not None for v in (class_name, tool_type, min_score, max_score))
+        objects = None
+        matched = object_item = None
+        if by_object or min_objects is not None or max_objects is not None:
+            table = self.objects
+            matched = np.ones(len(table.class_ids), dtype=bool)
+            if class_name is not None:
+                matched &= np.isin(table.class_ids, _ids_of(table.class_names, class_name))
+            if tool_type is not None:
+                matched &= np.isin(table.tool_ids, _ids_of(table.tool_types, tool_type))
+            if min_score is not None:
+                matched &= table.scores >= min_score
+            if max_score is not None:
+                matched &= table.scores <= max_score
+
+            object_item = table.object_item
+            counts = np.bincount(object_item[matched], minlength=len(items))
+            if by_object:
+                items &= counts > 0
+            if min_objects is not None:
+                items &= counts >= min_objects
+            if max_objects is not None:
+                items &= counts <= max_objects
+
+        selected = np.flatnonzero(items)
+        if by_object:
+            # The positions of the matched objects inside their items, grouped by selected item.
+            positions = np.flatnonzero(matched & items[object_item])
+            owners = object_item[positions]
+            local = (positions - table.item_offsets[owners]).tolist()
+            ends = np.searchsorted(owners, selected, side='right').tolist()
+            objects = [tuple(local[start: end]) for start, end in zip([0] + ends[:-1], ends)]
+
+        return AnnotationView(self._annotation, selected, objects)
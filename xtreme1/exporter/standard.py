@@ -2,17 +2,19 @@ import os
 import json
 
 from os.path import *
-from rich.progress import track
+from xtreme1.exporter._parallel import _run_per_item
 
 
-def _to_json(annotation: list, export_folder: str):
-    for anno in track(annotation, description='progress'):
-        file_name = f"{anno['data'].get('name')}-{anno['data'].get('id')}"
-        json_file = join(export_folder, file_name + '.json')
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(anno.get('result'), f, indent=1, ensure_ascii=False)
+def _json_item(anno: dict, export_folder: str):
+    file_name = f"{anno['data'].get('name')}-{anno['data'].get('id')}"
+    json_file = join(export_folder, file_name + '.json')
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(anno.get('result'), f, indent=1, ensure_ascii=False)
 
 
+def _to_json(annotation: list, export_folder: str, workers: int = 1):
+    _run_per_item(_json_item, annotation, export_folder, workers=workers)
+
 
 def _to_csv(annotation: dict, dataset_name: str, export_folder: str):
     pass
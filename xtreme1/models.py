@@ -1,8 +1,68 @@
+import os
+import json
+import asyncio
+import threading
 from enum import Enum
-from typing import List, Union, Optional, Dict, FrozenSet
+from typing import List, Union, Optional, Dict, FrozenSet, Iterator, Tuple, Callable
 from functools import reduce
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from .exceptions import ParamException
+from ._throttle import TokenBucket
+
+
+class _Checkpoint:
+    """
+    Predicted results appended to a json-lines file, so that an interrupted run can skip finished data.
+    Without a path nothing is loaded or written.
+    """
+
+    def __init__(
+            self,
+            path: Optional[str] = None
+    ):
+        self.path = path
+        self._done = {}
+        self._file = None
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut off by an interruption.
+                        continue
+                    self._done[str(record['dataId'])] = record['result']
+
+    def __enter__(self):
+        if self.path:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._file:
+            self._file.close()
+
+    def __contains__(self, data_id):
+        return str(data_id) in self._done
+
+    def __getitem__(self, data_id):
+        return self._done[str(data_id)]
+
+    def add(
+            self,
+            data_id,
+            result
+    ):
+        if self._file is None:
+            return
+        with self._lock:
+            self._file.write(json.dumps({'dataId': data_id, 'result': result}) + '\n')
+            self._file.flush()
 
 
 class ImageModelClass(Enum):
@@ -55,39 +115,110 @@ class Model:
 
         return {x.name: x.value for x in self.classes}
 
-    def _predict(
-            self,
-            endpoint: str,
-            min_confidence: Union[int, float] = 0.5,
-            max_confidence: Union[int, float] = 1,
-            data_id: Optional[Union[str, List[str]]] = None,
-            dataset_id: Optional[str] = None,
+    @staticmethod
+    def _build_payloads(
+            data_id: List,
+            min_confidence: Union[int, float],
+            max_confidence: Union[int, float],
             **kwargs
     ) -> List[Dict]:
+        payloads = []
+        for cur_id in data_id:
+            payload = {
+                'dataId': cur_id,
+                'minConfidence': min_confidence,
+                'maxConfidence': max_confidence,
+            }
+            payload.update(kwargs)
+            payloads.append(payload)
+
+        return payloads
+
+    def _resolve_data_ids(
+            self,
+            data_id: Optional[Union[str, List[str]]] = None,
+            dataset_id: Optional[str] = None
+    ) -> List:
         if data_id:
-            if type(data_id) == str:
+            if type(data_id) in [str, int]:
                 data_id = [data_id]
         else:
             if dataset_id:
-                data = self._client.query_data_under_dataset(dataset_id)
-                data_id = [x['id'] for x in data['datas']]
+                data_id = [x['id'] for x in self._client.iter_data_under_dataset(dataset_id)]
             else:
                 raise ParamException(message='You need to pass either data_id or dataset_id !!!')
 
-        n = len(data_id)
+        return data_id
 
-        total = []
-        for i in range(n):
-            payload = {
-                'dataId': data_id[i],
-                'minConfidence': min_confidence,
-                'maxConfidence': max_confidence,
-            }
-            payload.update(kwargs)
+    def _iter_predict(
+            self,
+            endpoint: str,
+            payloads: List[Dict],
+            workers: int = 4,
+            rate_limit: Optional[float] = None,
+            checkpoint: Optional[str] = None
+    ) -> Iterator[Tuple]:
+        bucket = TokenBucket(rate_limit) if rate_limit else None
+
+        def predict_one(payload):
+            if bucket:
+                bucket.acquire()
+            return self._client.api.post_request(endpoint, payload=payload)
+
+        with _Checkpoint(checkpoint) as ckpt:
+            for payload in payloads:
+                if payload['dataId'] in ckpt:
+                    yield payload['dataId'], ckpt[payload['dataId']]
+            todo = [payload for payload in payloads if payload['dataId'] not in ckpt]
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(predict_one, payload): payload['dataId'] for payload in todo}
+                try:
+                    for future in as_completed(futures):
+                        cur_id = futures[future]
+                        result = future.result()
+                        ckpt.add(cur_id, result)
+                        yield cur_id, result
+                finally:
+                    for future in futures:
+                        future.cancel()
+
+    def _predict(
+            self,
+            endpoint: str,
+            min_confidence: Union[int, float] = 0.5,
+            max_confidence: Union[int, float] = 1,
+            data_id: Optional[Union[str, List[str]]] = None,
+            dataset_id: Optional[str] = None,
+            workers: int = 4,
+            rate_limit: Optional[float] = None,
+            callback: Optional[Callable[[int, Dict], None]] = None,
+            checkpoint: Optional[str] = None,
+            stream: bool = False,
+            **kwargs
+    ) -> Union[List[Dict], Iterator[Tuple[int, Dict]]]:
+        data_id = self._resolve_data_ids(data_id, dataset_id)
+        payloads = self._build_payloads(data_id, min_confidence, max_confidence, **kwargs)
+
+        results = self._iter_predict(
+            endpoint=endpoint,
+            payloads=payloads,
+            workers=workers,
+            rate_limit=rate_limit,
+            checkpoint=checkpoint
+        )
+
+        def with_callback():
+            for cur_id, result in results:
+                if callback:
+                    callback(cur_id, result)
+                yield cur_id, result
 
-            total.append(self._client.api.post_request(endpoint, payload=payload))
+        if stream:
+            return with_callback()
 
-        return total
+        total = dict(with_callback())
+        return [total[cur_id] for cur_id in data_id]
 
 
 class ImageModel(Model):
@@ -105,8 +236,13 @@ class ImageModel(Model):
             max_confidence: Union[int, float] = 1,
             classes: Optional[Union[str, List[str]]] = None,
             data_id: Optional[Union[int, List[int]]] = None,
-            dataset_id: Optional[int] = None
-    ) -> List[Dict]:
+            dataset_id: Optional[int] = None,
+            workers: int = 4,
+            rate_limit: Optional[float] = None,
+            callback: Optional[Callable[[int, Dict], None]] = None,
+            checkpoint: Optional[str] = None,
+            stream: bool = False
+    ) -> Union[List[Dict], Iterator[Tuple[int, Dict]]]:
         """
         Use a trained model to recognize given objects in an image.
 
@@ -127,11 +263,24 @@ class ImageModel(Model):
             If you pass this parameter, the model will only predict the given data.
         dataset_id: Optional[int], default None
             If you pass this parameter, the model will predict all the data under this dataset.
+        workers: int, default 4
+            The number of data predicted at the same time.
+        rate_limit: Optional[float], default None
+            The max number of requests sent per second.
+        callback: Optional[Callable[[int, Dict], None]], default None
+            Called with the data id and the result of each data as soon as it's returned.
+        checkpoint: Optional[str], default None
+            A json-lines file to save finished results in.
+            Run again with the same file to resume an interrupted prediction without predicting finished data again.
+        stream: bool, default False
+            Return a generator which yields (data id, result) pairs as soon as they are returned,
+            in the order they finish.
 
         Returns
         -------
-        List[Dict]
-            A list of data dict. Each dict represents a copy of data, containing all the boxes predicted by the model.
+        Union[List[Dict], Iterator[Tuple[int, Dict]]]
+            A list of data dict, in the order of the data ids, or with 'stream' a generator of (data id, dict) pairs.
+            Each dict represents a copy of data, containing all the boxes predicted by the model.
             Here's an example of objects::
 
                 [
@@ -163,6 +312,11 @@ class ImageModel(Model):
             max_confidence=max_confidence,
             data_id=data_id,
             dataset_id=dataset_id,
+            workers=workers,
+            rate_limit=rate_limit,
+            callback=callback,
+            checkpoint=checkpoint,
+            stream=stream,
             classes=classes
         )
 
@@ -182,8 +336,13 @@ class PointCloudModel(Model):
             min_confidence: Union[int, float] = 0.5,
             max_confidence: Union[int, float] = 1,
             data_id: Optional[Union[str, List[str]]] = None,
-            dataset_id: Optional[str] = None
-    ):
+            dataset_id: Optional[str] = None,
+            workers: int = 4,
+            rate_limit: Optional[float] = None,
+            callback: Optional[Callable[[int, Dict], None]] = None,
+            checkpoint: Optional[str] = None,
+            stream: bool = False
+    ) -> Union[List[Dict], Iterator[Tuple[int, Dict]]]:
         """
         Use a trained model to recognize given objects in a point cloud.
 
@@ -204,11 +363,24 @@ class PointCloudModel(Model):
             If you pass this parameter, the model will only predict the given data.
         dataset_id: Optional[str], default None
             If you pass this parameter, the model will predict all the data under this dataset.
+        workers: int, default 4
+            The number of data predicted at the same time.
+        rate_limit: Optional[float], default None
+            The max number of requests sent per second.
+        callback: Optional[Callable[[int, Dict], None]], default None
+            Called with the data id and the result of each data as soon as it's returned.
+        checkpoint: Optional[str], default None
+            A json-lines file to save finished results in.
+            Run again with the same file to resume an interrupted prediction without predicting finished data again.
+        stream: bool, default False
+            Return a generator which yields (data id, result) pairs as soon as they are returned,
+            in the order they finish.
 
         Returns
         -------
-        List[Dict]
-            A list of data dict. Each dict represents a copy of data, containing all the boxes predicted by the model.
+        Union[List[Dict], Iterator[Tuple[int, Dict]]]
+            A list of data dict, in the order of the data ids, or with 'stream' a generator of (data id, dict) pairs.
+            Each dict represents a copy of data, containing all the boxes predicted by the model.
             Here's an example of objects::
 
                 [
@@ -245,5 +417,70 @@ class PointCloudModel(Model):
             max_confidence=max_confidence,
             data_id=data_id,
             dataset_id=dataset_id,
+            workers=workers,
+            rate_limit=rate_limit,
+            callback=callback,
+            checkpoint=checkpoint,
+            stream=stream,
             classes=classes
         )
+
+
+class _AsyncModelMixin:
+    """
+    Turns `Model._predict` into a coroutine so that `predict` becomes awaitable.
+    Requests of one call are sent concurrently on the event loop, at most `workers` at a time.
+    """
+
+    async def _predict(
+            self,
+            endpoint: str,
+            min_confidence: Union[int, float] = 0.5,
+            max_confidence: Union[int, float] = 1,
+            data_id: Optional[Union[str, List[str]]] = None,
+            dataset_id: Optional[str] = None,
+            workers: int = 4,
+            rate_limit: Optional[float] = None,
+            callback: Optional[Callable[[int, Dict], None]] = None,
+            checkpoint: Optional[str] = None,
+            stream: bool = False,
+            **kwargs
+    ) -> List[Dict]:
+        if stream:
+            raise ParamException(message="'stream' is not supported by async models, use 'callback' instead.")
+
+        if data_id:
+            if type(data_id) in [str, int]:
+                data_id = [data_id]
+        else:
+            if dataset_id:
+                data_id = [x['id'] async for x in self._client.iter_data_under_dataset(dataset_id)]
+            else:
+                raise ParamException(message='You need to pass either data_id or dataset_id !!!')
+
+        payloads = self._build_payloads(data_id, min_confidence, max_confidence, **kwargs)
+        semaphore = asyncio.Semaphore(workers)
+        bucket = TokenBucket(rate_limit) if rate_limit else None
+
+        with _Checkpoint(checkpoint) as ckpt:
+            async def predict_one(payload):
+                if payload['dataId'] in ckpt:
+                    return ckpt[payload['dataId']]
+                async with semaphore:
+                    if bucket:
+                        await asyncio.sleep(bucket.reserve())
+                    result = await self._client.api.post_request(endpoint, payload=payload)
+                ckpt.add(payload['dataId'], result)
+                if callback:
+                    callback(payload['dataId'], result)
+                return result
+
+            return list(await asyncio.gather(*[predict_one(payload) for payload in payloads]))
+
+
+class AsyncImageModel(_AsyncModelMixin, ImageModel):
+    pass
+
+
+class AsyncPointCloudModel(_AsyncModelMixin, PointCloudModel):
+    pass
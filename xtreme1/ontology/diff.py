@@ -0,0 +1,118 @@
+import json
+import hashlib
+from typing import List, Dict
+
+from .node import RootNode
+
+NODE_TYPES = ['class', 'classification']
+
+
+def _node_hash(
+        node: RootNode
+) -> str:
+    # The dict of a node holds its whole subtree but not its id,
+    # so equal classes hash the same wherever they come from.
+    content = json.dumps(node.to_dict(), sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(content.encode()).hexdigest()
+
+
+def _name_key(
+        node: RootNode
+):
+    return node.name, getattr(node, 'tool_type', None)
+
+
+class OntologyDiff:
+    """
+    What has to change online for an ontology to match a local one.
+
+    For classes it holds the local nodes to 'create', the local nodes whose online version
+    differs ('update'), the ones that are already the same ('unchanged') and the online nodes
+    that the local ontology doesn't have ('delete'). Classifications can't be loaded from the
+    server yet, so they aren't compared and their lists are always empty.
+    """
+
+    def __init__(
+            self
+    ):
+        self.create = {t: [] for t in NODE_TYPES}
+        self.update = {t: [] for t in NODE_TYPES}
+        self.unchanged = {t: [] for t in NODE_TYPES}
+        self.delete = {t: [] for t in NODE_TYPES}
+
+    def __repr__(self):
+        counts = ', '.join(
+            f'{kind}={sum(len(v) for v in getattr(self, kind).values())}'
+            for kind in ['create', 'update', 'unchanged', 'delete']
+        )
+        return f'<{self.__class__.__name__}> {counts}'
+
+    def __bool__(self):
+        return any(self.create.values()) or any(self.update.values()) or any(self.delete.values())
+
+
+def _diff_nodes(
+        local: List[RootNode],
+        remote: List[RootNode],
+        by_name: bool = False
+) -> Dict[str, List[RootNode]]:
+    # Nodes are paired by id, or by name and tool type for nodes copied from another ontology.
+    if by_name:
+        remote_index = {_name_key(n): n for n in remote}
+        key = _name_key
+    else:
+        remote_index = {n.id: n for n in remote if n.id is not None}
+
+        def key(n):
+            return n.id
+
+    result = {'create': [], 'update': [], 'unchanged': []}
+    paired = set()
+    for node in local:
+        online = remote_index.get(key(node))
+        if online is None:
+            result['create'].append(node)
+            continue
+        paired.add(id(online))
+        # The cached json of the nodes is usually enough to tell they're the same.
+        if node._to_json() == online._to_json() or _node_hash(node) == _node_hash(online):
+            result['unchanged'].append(node)
+        else:
+            result['update'].append(node)
+    result['delete'] = [n for n in remote if id(n) not in paired]
+
+    return result
+
+
+def diff_ontology(
+        local,
+        remote,
+        by_name: bool = False
+) -> OntologyDiff:
+    """
+    Compare a local `Ontology` with the online one.
+
+    Parameters
+    ----------
+    local: Ontology
+        The ontology as it should be.
+    remote: Ontology
+        The ontology as it's online.
+    by_name: bool, default False
+        Pair classes by name and tool type instead of id,
+        for ontologies copied from somewhere else.
+
+    Returns
+    -------
+    OntologyDiff
+        The classes to create, update and delete.
+    """
+    diff = OntologyDiff()
+    # Online classifications aren't loaded, so comparing them would create every local one again.
+    result = _diff_nodes(local.classes, remote.classes, by_name=by_name)
+    diff.create['class'] = result['create']
+    diff.update['class'] = result['update']
+    diff.unchanged['class'] = result['unchanged']
+    diff.delete['class'] = result['delete']
+
+    return diff
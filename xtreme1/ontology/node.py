@@ -6,18 +6,212 @@ from ..exceptions import NameDuplicatedException, ParamException
 
 INDENT = 4
 
+_encode = json.JSONEncoder(separators=(',', ':')).encode
+_set = object.__setattr__
+
+# Setting these doesn't change what a node serialises to.
+_UNTRACKED = {'_parent', '_cache'}
+
 
 def _check_dup(
         nodes,
         new_name
 ):
-    names = [x.name for x in nodes]
-    if new_name in names:
+    if isinstance(nodes, NodeList):
+        exists = nodes.by_name(new_name) is not None
+    else:
+        exists = new_name in [x.name for x in nodes]
+    if exists:
         raise NameDuplicatedException(message='This label already exists!')
 
 
+class NodeList(list):
+    """
+    The children of a node (or the classes of an ontology): a list that also indexes its nodes
+    by name and by id. The indexes are built on first use and then kept in sync by every change
+    of the list and by renaming a node in it, so lookups and duplicate checks take constant time.
+    """
+    __slots__ = ['owner', '_names', '_ids']
+
+    def __init__(
+            self,
+            nodes=(),
+            owner=None
+    ):
+        super().__init__(nodes)
+        self.owner = owner
+        self._names = None
+        self._ids = None
+        for node in self:
+            _set(node, '_parent', self)
+
+    def __reduce_ex__(self, protocol):
+        # Nodes point back to their list, so the items are restored as state
+        # once the list itself exists. The indexes are rebuilt when needed.
+        return NodeList, (), {'owner': self.owner, 'nodes': list(self)}
+
+    def __setstate__(self, state):
+        self.owner = state['owner']
+        self._names = None
+        self._ids = None
+        list.extend(self, state['nodes'])
+
+    def __deepcopy__(self, memo):
+        # The owner is only carried over when it's being copied too.
+        new_list = NodeList(owner=memo.get(id(self.owner)))
+        memo[id(self)] = new_list
+        new_list.extend(deepcopy(node, memo) for node in self)
+
+        return new_list
+
+    def _index(self):
+        if self._names is None:
+            self._names, self._ids = {}, {}
+            for node in self:
+                self._index_node(node)
+
+    def _index_node(self, node):
+        self._names.setdefault(node.name, []).append(node)
+        node_id = getattr(node, 'id', None)
+        if node_id is not None:
+            self._ids[node_id] = node
+
+    def _changed(self):
+        if isinstance(self.owner, Node):
+            self.owner._invalidate()
+
+    def _attach(self, node):
+        _set(node, '_parent', self)
+        if self._names is not None:
+            self._index_node(node)
+        self._changed()
+
+    def _detach(self, node):
+        if node._parent is self:
+            _set(node, '_parent', None)
+        self._changed()
+        if self._names is None:
+            return
+        same_name = self._names.get(node.name, [])
+        for i, other in enumerate(same_name):
+            if other is node:
+                del same_name[i]
+                break
+        if not same_name:
+            self._names.pop(node.name, None)
+        node_id = getattr(node, 'id', None)
+        if node_id is not None and self._ids.get(node_id) is node:
+            del self._ids[node_id]
+
+    def _rename(self, node, new_name):
+        self._index()
+        if any(other is not node for other in self._names.get(new_name, [])):
+            raise NameDuplicatedException(message='This label already exists!')
+        self._detach(node)
+        node._parent = self
+        node._name = new_name
+        self._index_node(node)
+
+    def by_name(
+            self,
+            name: str
+    ):
+        """
+        The node with this name, or None.
+        """
+        self._index()
+        same_name = self._names.get(name)
+        return same_name[0] if same_name else None
+
+    def by_id(
+            self,
+            node_id: int
+    ):
+        """
+        The node with this id, or None.
+        """
+        self._index()
+        return self._ids.get(node_id)
+
+    def append(self, node):
+        super().append(node)
+        self._attach(node)
+
+    def insert(self, index, node):
+        super().insert(index, node)
+        self._attach(node)
+
+    def extend(self, nodes):
+        for node in nodes:
+            self.append(node)
+
+    def __iadd__(self, nodes):
+        self.extend(nodes)
+        return self
+
+    def remove(self, node):
+        for i, other in enumerate(self):
+            if other is node:
+                break
+        else:
+            i = self.index(node)
+        del self[i]
+
+    def pop(self, index=-1):
+        node = super().pop(index)
+        self._detach(node)
+        return node
+
+    def clear(self):
+        for node in self:
+            self._detach(node)
+        super().clear()
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            # A slice can be replaced by a different number of nodes, or by an iterator.
+            old, value = self[index], list(value)
+            new = value
+        else:
+            old, new = [self[index]], [value]
+        for node in old:
+            self._detach(node)
+        super().__setitem__(index, value)
+        for node in new:
+            self._attach(node)
+
+    def __delitem__(self, index):
+        old = self[index]
+        for node in old if isinstance(index, slice) else [old]:
+            self._detach(node)
+        super().__delitem__(index)
+
+
+def _slot_names(cls):
+    # Every slot of a node class, with the names of private slots mangled.
+    for klass in cls.__mro__:
+        for slot in klass.__dict__.get('__slots__', ()):
+            if slot.startswith('__') and not slot.endswith('__'):
+                slot = f'_{klass.__name__.lstrip("_")}{slot}'
+            yield slot
+
+
+def _new_node(
+        cls,
+        name: str,
+        children: List
+):
+    # A node of 'cls' set up without `__init__` and its checks, for nodes from the server.
+    node = object.__new__(cls)
+    _set(node, '_parent', None)
+    _set(node, '_name', name)
+    _set(node, '_nodes', NodeList(children, owner=node))
+
+    return node
+
+
 class Node:
-    __slots__ = ['name', '_parent', '_nodes']
+    __slots__ = ['_name', '_parent', '_nodes', '_cache']
 
     total_attrs = []
     total_keys = []
@@ -27,16 +221,100 @@ class Node:
             name,
             nodes: Optional[List] = None
     ):
+        _set(self, '_parent', None)
         self.name = name
         if not nodes:
             nodes = []
-        self._nodes = nodes
+        self._nodes = NodeList(nodes, owner=self)
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        # Keep the name index of the list this node is in up to date.
+        if self._parent is not None:
+            self._parent._rename(self, value)
+        else:
+            self._name = value
+
+    def __setattr__(self, key, value):
+        _set(self, key, value)
+        if key not in _UNTRACKED:
+            self._invalidate()
+
+    def _invalidate(self):
+        # This node and every node above it have to be serialised again.
+        node = self
+        while isinstance(node, Node):
+            _set(node, '_cache', None)
+            parent = node._parent
+            node = parent.owner if parent is not None else None
+
+    def __getstate__(self):
+        # The cached json isn't pickled, it's made again when needed.
+        state = {}
+        for slot in _slot_names(self.__class__):
+            if slot != '_cache' and hasattr(self, slot):
+                state[slot] = object.__getattribute__(self, slot)
+
+        return state
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            _set(self, key, value)
+
+    def __deepcopy__(self, memo):
+        new_node = self.__class__.__new__(self.__class__)
+        memo[id(self)] = new_node
+        for slot in _slot_names(self.__class__):
+            try:
+                value = object.__getattribute__(self, slot)
+            except AttributeError:
+                continue
+            # A copy isn't in the list of the original. `NodeList` re-attaches it when it's copied with it.
+            value = None if slot == '_parent' else deepcopy(value, memo)
+            object.__setattr__(new_node, slot, value)
+
+        return new_node
 
     def __repr__(
             self
     ):
         return f'<{self.__class__.__name__}> {self.name}'
 
+    def _to_json(
+            self
+    ) -> str:
+        # The json of `to_dict()`. It's kept until the node or something under it changes,
+        # so unchanged subtrees are reused as they are. A node with a dict or list field isn't
+        # kept, as it could be changed in place, but its children still are.
+        cached = getattr(self, '_cache', None)
+        if cached is not None:
+            return cached
+
+        parts = []
+        cacheable = True
+        for attr, k in zip(self.total_attrs, self.total_keys):
+            value = getattr(self, attr, None)
+            if value is None:
+                continue
+            if attr == '_nodes':
+                if (not value) and isinstance(self, AttrNode):
+                    raise ParamException(message=f"Options of attribute '{self.name}' can not be null!")
+                value = '[' + ','.join(node._to_json() for node in value) + ']'
+            else:
+                cacheable = cacheable and not isinstance(value, (dict, list))
+                value = _encode(value)
+            parts.append(f'{_encode(k)}:{value}')
+
+        result = '{' + ','.join(parts) + '}'
+        if cacheable:
+            _set(self, '_cache', result)
+
+        return result
+
     def to_dict(
             self
     ) -> Dict:
@@ -90,14 +368,21 @@ class Node:
         Node
             A `Node` object.
         """
+        return cls._from_dict(org_dict)
+
+    @classmethod
+    def _from_dict(
+            cls,
+            org_dict: Dict
+    ):
+        # Through `__init__`, with the children built by the node type `NODE_MAP` gives.
+        # Attributes and options, which are most of the nodes of a big ontology, override this.
         cur_args, cur_child_nodes = cls._parse_dict(org_dict)
         new_node = cls(
             **cur_args
         )
-
-        for child in cur_child_nodes:
-            new_child_node = NODE_MAP[cls].to_node(child)
-            new_node._nodes.append(new_child_node)
+        child_cls = NODE_MAP[cls]
+        new_node._nodes.extend(child_cls._from_dict(child) for child in cur_child_nodes)
 
         return new_node
 
@@ -108,7 +393,7 @@ class Node:
 
 
 class AttrNode(Node):
-    __slots__ = ['name', '_nodes', 'type', 'required']
+    __slots__ = ['type', 'required']
 
     total_attrs = ['name', 'type', 'required', '_nodes']
     total_keys = ['name', 'type', 'required', 'options']
@@ -193,9 +478,20 @@ class AttrNode(Node):
 
         return kwargs, child_nodes
 
+    @classmethod
+    def _from_dict(
+            cls,
+            org_dict: Dict
+    ):
+        new_node = _new_node(cls, org_dict['name'], [OptionNode._from_dict(o) for o in org_dict['options']])
+        _set(new_node, 'type', org_dict['type'])
+        _set(new_node, 'required', org_dict['required'])
+
+        return new_node
+
 
 class OptionNode(Node):
-    __slots__ = ['name', '_nodes']
+    __slots__ = []
 
     total_attrs = ['name', '_nodes']
     total_keys = ['name', 'attributes']
@@ -207,7 +503,6 @@ class OptionNode(Node):
         super().__init__(
             name=name
         )
-        self._nodes = []
 
     def __str__(
             self
@@ -281,9 +576,16 @@ class OptionNode(Node):
 
         return kwargs, child_nodes
 
+    @classmethod
+    def _from_dict(
+            cls,
+            org_dict: Dict
+    ):
+        return _new_node(cls, org_dict['name'], [AttrNode._from_dict(a) for a in org_dict['attributes']])
+
 
 class RootNode(Node):
-    __slots__ = ['__id', 'name', '_nodes', 'node_type']
+    __slots__ = ['__id', 'node_type']
 
     def __init__(
             self,
@@ -371,8 +673,7 @@ class RootNode(Node):
 
 
 class ImageRootNode(RootNode):
-    __slots__ = ['__id', 'name', 'color', 'tool_type', 'tool_type_options',
-                 '_nodes', 'node_type']
+    __slots__ = ['color', 'tool_type', 'tool_type_options']
 
     total_attrs = ['name', 'tool_type', 'tool_type_options', '_nodes', 'color']
     total_keys = ['name', 'toolType', 'toolTypeOptions', 'attributes', 'color']
@@ -436,8 +737,7 @@ class ImageRootNode(RootNode):
 
 
 class LidarBasicRootNode(RootNode):
-    __slots__ = ['__id', 'name', 'color', 'tool_type', 'tool_type_options',
-                 '_nodes', 'node_type']
+    __slots__ = ['color', 'tool_type', 'tool_type_options']
 
     total_attrs = ['name', 'tool_type', 'tool_type_options', '_nodes', 'color']
     total_keys = ['name', 'toolType', 'toolTypeOptions', 'attributes', 'color']
@@ -514,8 +814,7 @@ class LidarBasicRootNode(RootNode):
 
 
 class LidarFusionRootNode(RootNode):
-    __slots__ = ['__id', 'name', 'color', 'tool_type', 'tool_type_options',
-                 '_nodes', 'node_type']
+    __slots__ = ['color', 'tool_type', 'tool_type_options']
 
     total_attrs = ['name', 'tool_type', 'tool_type_options', '_nodes', 'color']
     total_keys = ['name', 'toolType', 'toolTypeOptions', 'attributes', 'color']
@@ -1,15 +1,32 @@
+import gzip
 import json
+import pickle
 import warnings
 from io import BytesIO
 from typing import List, Dict, Optional, Union
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 
-from .node import _check_dup, RootNode, ImageRootNode, LidarBasicRootNode, LidarFusionRootNode, INDENT
+from .node import _check_dup, _encode, NodeList, RootNode, ImageRootNode, LidarBasicRootNode, LidarFusionRootNode, \
+    INDENT
+from .diff import NODE_TYPES, OntologyDiff, diff_ontology
 from ..exceptions import NodeIdException, ParamException
 
 
+def _nodes_json(
+        nodes: List[RootNode],
+        with_id: bool = False
+) -> str:
+    # Put the cached json of the nodes together instead of turning them into dicts first.
+    if with_id:
+        parts = ('{"id":' + _encode(n.id) + ',' + n._to_json()[1:] for n in nodes)
+    else:
+        parts = (n._to_json() for n in nodes)
+
+    return '[' + ','.join(parts) + ']'
+
+
 class Ontology:
-    __slots__ = ['_client', '_des_id', '_des_type', '_dataset_type', 'classes', 'classifications']
+    __slots__ = ['_client', '_des_id', '_des_type', '_dataset_type', '_classes', '_classifications']
 
     def __init__(
             self,
@@ -44,6 +61,32 @@ class Ontology:
         #     )
         #     self.classifications.append(new_classification)
 
+    @property
+    def classes(
+            self
+    ) -> NodeList:
+        return self._classes
+
+    @classes.setter
+    def classes(
+            self,
+            nodes: List[RootNode]
+    ):
+        self._classes = NodeList(nodes, owner=self)
+
+    @property
+    def classifications(
+            self
+    ) -> NodeList:
+        return self._classifications
+
+    @classifications.setter
+    def classifications(
+            self,
+            nodes: List[RootNode]
+    ):
+        self._classifications = NodeList(nodes, owner=self)
+
     def __repr__(
             self
     ):
@@ -78,6 +121,98 @@ class Ontology:
 
         return result
 
+    def __getstate__(
+            self
+    ):
+        # The client isn't saved with the ontology.
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot != '_client'}
+
+    def __setstate__(
+            self,
+            state
+    ):
+        self._client = None
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+    def save(
+            self,
+            path: str
+    ):
+        """
+        Save a snapshot of this `Ontology` object to a local file, which can be reloaded with `Ontology.load()`.
+
+        A path ending with '.pkl' or '.pickle' gives a binary snapshot that keeps everything as it is,
+        any other path gives a json file. Either can be compressed by adding '.gz' to the path.
+
+        Parameters
+        ----------
+        path: str
+            The path of the snapshot.
+        """
+        compressed = path.endswith('.gz')
+        suffix = path[:-3] if compressed else path
+        if suffix.endswith(('.pkl', '.pickle')):
+            content = pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            # Unlike `to_dict()`, the snapshot keeps the ids of the classes.
+            content = (
+                '{"desType":' + _encode(self._des_type)
+                + ',"desId":' + _encode(self._des_id)
+                + ',"datasetType":' + _encode(self._dataset_type)
+                + ',"classes":' + _nodes_json(self.classes, with_id=True)
+                + ',"classifications":' + _nodes_json(self.classifications, with_id=True)
+                + '}'
+            ).encode()
+
+        with (gzip.open if compressed else open)(path, 'wb') as f:
+            f.write(content)
+
+    @classmethod
+    def load(
+            cls,
+            path: str,
+            client=None
+    ):
+        """
+        Reload an `Ontology` object saved by `save()`.
+
+        Parameters
+        ----------
+        path: str
+            The path of the snapshot.
+        client: Client, default None
+            The client used to sync the ontology with the server.
+            Without it, the ontology can only be used locally.
+
+        Returns
+        -------
+        Ontology
+            The ontology in the snapshot.
+        """
+        compressed = path.endswith('.gz')
+        suffix = path[:-3] if compressed else path
+        with (gzip.open if compressed else open)(path, 'rb') as f:
+            content = f.read()
+
+        if suffix.endswith(('.pkl', '.pickle')):
+            onto = pickle.loads(content)
+            onto._client = client
+            return onto
+
+        snapshot = json.loads(content)
+        onto = Ontology(
+            client=client,
+            des_type=snapshot['desType'],
+            des_id=snapshot['desId'],
+            dataset_type=snapshot['datasetType'],
+            classes=snapshot['classes']
+        )
+        node_cls = DATASET_DICT[onto._dataset_type]
+        onto.classifications = [node_cls.to_node(org_dict=cf) for cf in snapshot['classifications']]
+
+        return onto
+
     def add_class(
             self,
             name,
@@ -122,13 +257,34 @@ class Ontology:
             node_type: str = 'class'
     ) -> Union[RootNode, None]:
         if node_type == 'class':
-            for c in self.classes:
-                if c.id == node_id:
-                    return c
+            return self.classes.by_id(node_id)
+        else:
+            return self.classifications.by_id(node_id)
+
+    def find(
+            self,
+            name: str,
+            node_type: str = 'class'
+    ) -> Union[RootNode, None]:
+        """
+        Get a class/classification by its name.
+
+        Parameters
+        ----------
+        name: str
+            The name of the class/classification.
+        node_type: str, default `class`
+            `class` or `classification`.
+
+        Returns
+        -------
+        Union[RootNode, None]
+            The `RootNode`, or None if there's no such name.
+        """
+        if node_type == 'class':
+            return self.classes.by_name(name)
         else:
-            for cf in self.classifications:
-                if cf.id == node_id:
-                    return cf
+            return self.classifications.by_name(name)
 
     def copy(
             self
@@ -229,6 +385,41 @@ class Ontology:
 
         return False
 
+    def _rootnode_endpoint(
+            self,
+            action: str,
+            node_id: int,
+            node_type: str
+    ) -> str:
+        if 'ontology' in self._des_type:
+            return f'{node_type}/{action}/{node_id}'
+        return f'dataset{node_type.capitalize()}/{action}/{node_id}'
+
+    def _update_rootnode(
+            self,
+            node: RootNode,
+            node_type: str
+    ):
+        onto_dict = node.to_dict()
+        if 'ontology' in self._des_type:
+            onto_dict['ontologyId'] = self._des_id
+        else:
+            onto_dict['datasetId'] = self._des_id
+
+        self._client.api.post_request(
+            endpoint=self._rootnode_endpoint('update', node.id, node_type),
+            payload=onto_dict
+        )
+
+    def _delete_rootnode(
+            self,
+            node: RootNode,
+            node_type: str
+    ):
+        return self._client.api.post_request(
+            endpoint=self._rootnode_endpoint('delete', node.id, node_type)
+        )
+
     def update_online_rootnode(
             self,
             node_id: int,
@@ -257,24 +448,14 @@ class Ontology:
         if not node:
             raise NodeIdException(message=f"Can't find this node: id-{node_id}!")
 
-        onto_dict = node.to_dict()
-
-        if 'ontology' in self._des_type:
-            endpoint = f'{node_type}/update/{node_id}'
-            onto_dict['ontologyId'] = self._des_id
-        else:
-            endpoint = f'dataset{node_type.capitalize()}/update/{node_id}'
-            onto_dict['datasetId'] = self._des_id
-
-        self._client.api.post_request(
-            endpoint=endpoint,
-            payload=onto_dict
-        )
+        self._update_rootnode(node, node_type)
 
         return True
 
     def _import_ontology(
-            self
+            self,
+            classes: Optional[List[RootNode]] = None,
+            classifications: Optional[List[RootNode]] = None
     ):
         endpoint = 'ontology/importByJson'
 
@@ -283,7 +464,12 @@ class Ontology:
             'desId': self._des_id
         }
 
-        file = BytesIO(json.dumps(self.to_dict()).encode())
+        onto_json = (
+            '{"classes":' + _nodes_json(self.classes if classes is None else classes)
+            + ',"classifications":' + _nodes_json(self.classifications if classifications is None else classifications)
+            + '}'
+        )
+        file = BytesIO(onto_json.encode())
         files = {
             'file': ('ontology.json', file)
         }
@@ -294,113 +480,105 @@ class Ontology:
             files=files
         )
 
-    def _split_dup_nodes(
+    def diff(
             self,
-    ):
-        existing_onto = self._client.query_ontology(
-            des_id=self._des_id,
-            des_type=self._des_type
-        )
-
-        existing_class_ids = [x.id for x in existing_onto.classes]
-        existing_classification_ids = [x.id for x in existing_onto.classifications]
-
-        dup_classes = []
-        cur_classes = deepcopy(self.classes)
-        for i in range(-len(cur_classes), 0):
-            if cur_classes[i].id in existing_class_ids:
-                dup_classes.append(cur_classes.pop(i))
-
-        dup_classifications = []
-        cur_classifications = deepcopy(self.classifications)
-        for i in range(-len(cur_classifications), 0):
-            if cur_classifications[i].id in existing_classification_ids:
-                dup_classifications.append(cur_classifications.pop(i))
+            ontology=None
+    ) -> OntologyDiff:
+        """
+        Compare this ontology, or another one to import into it, with the online version of this ontology.
+        Nothing is changed online.
 
-        return cur_classes, cur_classifications, dup_classes, dup_classifications
+        Parameters
+        ----------
+        ontology: SampleOntology, default None
+            An ontology to import into this one, such as one generated by the `copy()` method.
+            Its classes are paired with the online ones by name and tool type instead of id.
 
-    def _compare_dup_nodes(
-            self,
-    ):
-        existing_onto = self._client.query_ontology(
+        Returns
+        -------
+        OntologyDiff
+            The classes to create, update and delete.
+        """
+        online = self._client.query_ontology(
             des_id=self._des_id,
             des_type=self._des_type
         )
-
-        existing_classes = {x.name: getattr(x, 'tool_type', None) for x in existing_onto.classes}
-        existing_classification_names = [x.name for x in existing_onto.classifications]
-
-        dup_classes = []
-        cur_classes = deepcopy(self.classes)
-        for i in range(-len(cur_classes), 0):
-            if cur_classes[i].name in existing_classes:
-                if getattr(cur_classes[i], 'tool_type', None) == existing_classes[cur_classes[i].name]:
-                    dup_classes.append(cur_classes.pop(i))
-
-        dup_classifications = []
-        cur_classifications = deepcopy(self.classifications)
-        for i in range(-len(cur_classifications), 0):
-            if cur_classifications[i].id in existing_classification_names:
-                dup_classifications.append(cur_classifications.pop(i))
-
-        return cur_classes, cur_classifications, dup_classes, dup_classifications
+        if ontology is None:
+            return diff_ontology(self, online)
+        return diff_ontology(ontology, online, by_name=True)
 
     def import_ontology(
             self,
             ontology=None,
-            replace=False
+            replace=False,
+            delete=False,
+            workers: int = 8
     ) -> Dict:
         """
         Import this `Ontology` object to your online dataset or ontology center.
 
+        Only what differs is sent: the online ontology is fetched once and compared with this one
+        class by class, new classes are created with a single import request,
+        and changed ones are updated concurrently.
+        Classifications can't be loaded from the server yet, so they're neither compared nor imported.
+
         Parameters
         ----------
         ontology: SampleOntology
             A `SampleOntology` object generated by `copy()` method.
         replace: bool, default False
-            Whether overwrite the online class/classification if `id` is duplicate.
+            Whether overwrite the online class if `id` is duplicate.
+        delete: bool, default False
+            Whether delete the online classes that this ontology doesn't have.
+            Like 'replace', it only works when the ontology is importing itself.
+        workers: int, default 8
+            The number of update/delete requests sent at the same time.
+
         Returns
         -------
         Dict
             The information about which class/classification is appended into current ontology and which is updated.
         """
-        if ontology:
-            if replace:
-                warnings.warn(message="The 'replace' parameter only works when the ontology is importing itself.")
-                replace = False
-            ontology._des_id = self._des_id
-            ontology._des_type = self._des_type
-            ontology._dataset_type = self._dataset_type
-            ontology._client = self._client
-            cur_onto = ontology
-            no_dup_classes, no_dup_classifications, dup_classes, dup_classifications = cur_onto._compare_dup_nodes()
-        else:
-            cur_onto = self
-            no_dup_classes, no_dup_classifications, dup_classes, dup_classifications = cur_onto._split_dup_nodes()
+        if ontology and (replace or delete):
+            warnings.warn(message="The 'replace' and 'delete' parameters only work when the ontology is importing itself.")
+            replace = delete = False
 
-        new_onto = deepcopy(cur_onto)
-        new_onto.classes = no_dup_classes
-        new_onto.classifications = no_dup_classifications
-        new_onto._import_ontology()
+        if (ontology or self).classifications:
+            warnings.warn(message="Classifications aren't imported, only classes are.")
 
+        diff = self.diff(ontology)
+        if ontology:
+            # Classes with the same name and tool type are already there and are left as they are.
+            diff.update = {t: diff.update[t] + diff.unchanged[t] for t in NODE_TYPES}
+            diff.unchanged = {t: [] for t in NODE_TYPES}
+
+        if diff.create['class']:
+            self._import_ontology(
+                classes=diff.create['class'],
+                classifications=[]
+            )
+
+        tasks = []
         if replace:
-            for c in dup_classes:
-                cur_onto.update_online_rootnode(
-                    node_id=c.id,
-                    node_type='class'
-                )
-            for cf in dup_classifications:
-                cur_onto.update_online_rootnode(
-                    node_id=cf.id,
-                    node_type='classification'
-                )
+            tasks += [(self._update_rootnode, node, t) for t in NODE_TYPES for node in diff.update[t]]
+        if delete:
+            tasks += [(self._delete_rootnode, node, t) for t in NODE_TYPES for node in diff.delete[t]]
+        if tasks:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                for future in [executor.submit(*task) for task in tasks]:
+                    future.result()
 
         message = {
-            'update_classes': [{'id': x.id, 'name': x.name} for x in dup_classes],
-            'update_classifications': [{'id': x.id, 'name': x.name} for x in dup_classifications],
-            'append_classes': [{'id': x.id, 'name': x.name} for x in no_dup_classes],
-            'append_classifications': [{'id': x.id, 'name': x.name} for x in no_dup_classifications],
+            'update_classes': [{'id': x.id, 'name': x.name} for x in diff.update['class']],
+            'update_classifications': [{'id': x.id, 'name': x.name} for x in diff.update['classification']],
+            'append_classes': [{'id': x.id, 'name': x.name} for x in diff.create['class']],
+            'append_classifications': [{'id': x.id, 'name': x.name} for x in diff.create['classification']],
+            'unchanged_classes': [{'id': x.id, 'name': x.name} for x in diff.unchanged['class']],
+            'unchanged_classifications': [{'id': x.id, 'name': x.name} for x in diff.unchanged['classification']],
         }
+        if delete:
+            message['delete_classes'] = [{'id': x.id, 'name': x.name} for x in diff.delete['class']]
+            message['delete_classifications'] = [{'id': x.id, 'name': x.name} for x in diff.delete['classification']]
 
         return message
 
@@ -0,0 +1,281 @@
+import json
+import sqlite3
+from typing import Dict, List, Optional, Union, Iterable
+
+from .exporter.annotation import Annotation
+from ._others import _json_loads
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    dataset_id TEXT PRIMARY KEY,
+    name TEXT,
+    version TEXT,
+    export_time TEXT
+);
+CREATE TABLE IF NOT EXISTS items (
+    dataset_id TEXT NOT NULL,
+    data_id INTEGER NOT NULL,
+    updated_at TEXT,
+    position INTEGER,
+    data TEXT NOT NULL,
+    result TEXT,
+    PRIMARY KEY (dataset_id, data_id)
+);
+CREATE INDEX IF NOT EXISTS items_position ON items (dataset_id, position);
+"""
+
+
+def _version_of(
+        data: Dict
+) -> Optional[str]:
+    # 'updatedAt' is compared as it is, whatever format the server uses for it.
+    # Data without one have no version, so they can't be told unchanged.
+    updated_at = data.get('updatedAt')
+    return None if updated_at is None else json.dumps(updated_at)
+
+
+class LocalStore:
+    """
+    A local SQLite mirror of the data and annotation results of datasets.
+
+    Every item is stored with the 'updatedAt' of its data as the server lists it, which is what
+    `sync_dataset` compares against the listing to find the items that need to be fetched again.
+    Data listed without an 'updatedAt' are always fetched again.
+    One file can hold any number of datasets.
+    """
+
+    def __init__(
+            self,
+            db_path: str
+    ):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        self._conn.executescript(_SCHEMA)
+
+    def __repr__(self):
+        return f"LocalStore(db_path={self.db_path})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(
+            self
+    ):
+        self._conn.close()
+
+    def versions(
+            self,
+            dataset_id: Union[int, str]
+    ) -> Dict[int, str]:
+        """
+        The stored 'updatedAt' of every data of a dataset, by data id.
+        """
+        rows = self._conn.execute(
+            'SELECT data_id, updated_at FROM items WHERE dataset_id = ?',
+            (str(dataset_id),)
+        )
+        return dict(rows)
+
+    def info(
+            self,
+            dataset_id: Union[int, str]
+    ) -> Optional[Dict]:
+        row = self._conn.execute(
+            'SELECT name, version, export_time FROM datasets WHERE dataset_id = ?',
+            (str(dataset_id),)
+        ).fetchone()
+        if row is None:
+            return None
+
+        return {'datasetName': row[0], 'version': row[1], 'exportTime': row[2]}
+
+    def save_info(
+            self,
+            dataset_id: Union[int, str],
+            name: str,
+            version: Optional[str] = None,
+            export_time: Optional[str] = None
+    ):
+        with self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?)',
+                (str(dataset_id), name, version, export_time)
+            )
+
+    def upsert(
+            self,
+            dataset_id: Union[int, str],
+            items: Iterable[Dict],
+            versions: Optional[Dict[int, str]] = None
+    ):
+        """
+        Store {'data': ..., 'result': ...} items, replacing the stored ones with the same data id.
+
+        Parameters
+        ----------
+        dataset_id: Union[int, str]
+            The id of the dataset.
+        items: Iterable[Dict]
+            The items to store.
+        versions: Optional[Dict[int, str]], default None
+            The version to store for each data id, as seen where it will be compared later.
+            The 'updatedAt' of the data of an item is stored if its id isn't in it.
+        """
+        versions = versions or {}
+        rows = [
+            (str(dataset_id), item['data']['id'],
+             versions[item['data']['id']] if item['data']['id'] in versions else _version_of(item['data']),
+             json.dumps(item['data']), json.dumps(item['result']) if item['result'] else None)
+            for item in items
+        ]
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO items (dataset_id, data_id, updated_at, data, result) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+
+    def delete(
+            self,
+            dataset_id: Union[int, str],
+            data_ids: Iterable[int]
+    ):
+        with self._conn:
+            self._conn.executemany(
+                'DELETE FROM items WHERE dataset_id = ? AND data_id = ?',
+                [(str(dataset_id), data_id) for data_id in data_ids]
+            )
+
+    def set_order(
+            self,
+            dataset_id: Union[int, str],
+            data_ids: List[int]
+    ):
+        """
+        Record the order the data are listed in on the server, which `items` returns them in.
+        """
+        with self._conn:
+            self._conn.executemany(
+                'UPDATE items SET position = ? WHERE dataset_id = ? AND data_id = ?',
+                [(i, str(dataset_id), data_id) for i, data_id in enumerate(data_ids)]
+            )
+
+    def items(
+            self,
+            dataset_id: Union[int, str],
+            dropna: bool = False
+    ) -> List[Dict]:
+        """
+        All stored items of a dataset, as {'data': ..., 'result': ...} dicts.
+        """
+        query = 'SELECT data, result FROM items WHERE dataset_id = ?'
+        if dropna:
+            query += ' AND result IS NOT NULL'
+        query += ' ORDER BY position, data_id'
+
+        return [
+            {
+                'data': _json_loads(data),
+                'result': _json_loads(result) if result else {}
+            }
+            for data, result in self._conn.execute(query, (str(dataset_id),))
+        ]
+
+
+def sync_dataset(
+        client,
+        dataset_id: Union[int, str],
+        store: LocalStore,
+        batch_size: int = 100,
+        full: bool = False
+) -> Dict[str, int]:
+    """
+    Bring the mirror of a dataset in a `LocalStore` up to date.
+
+    The data of the dataset are listed page by page, which is cheap, and only the data
+    whose 'updatedAt' isn't the stored one, or that are listed without one, have their data
+    and results fetched again, 'batch_size' at a time. Data deleted on the server are deleted
+    from the store.
+
+    Parameters
+    ----------
+    client: Client
+        The client to fetch with.
+    dataset_id: Union[int, str]
+        The id of the dataset.
+    store: LocalStore
+        The store to update.
+    batch_size: int, default 100
+        Number of data fetched in one request.
+    full: bool, default False
+        Fetch every data again, whether it changed or not.
+
+    Returns
+    -------
+    Dict[str, int]
+        The number of 'added', 'updated', 'deleted' and 'unchanged' data.
+    """
+    stored = store.versions(dataset_id)
+
+    order = []
+    changed = []
+    # The versions seen in the listing are the ones stored, so that the next sync compares like with like.
+    listed = {}
+    for data in client.iter_data_under_dataset(dataset_id=dataset_id):
+        order.append(data['id'])
+        version = listed[data['id']] = _version_of(data)
+        if full or version is None or stored.get(data['id']) != version:
+            changed.append(data['id'])
+
+    report = {
+        'added': sum(data_id not in stored for data_id in changed),
+        'updated': sum(data_id in stored for data_id in changed),
+        'deleted': 0,
+        'unchanged': len(order) - len(changed)
+    }
+
+    deleted = set(stored) - set(order)
+    if deleted:
+        store.delete(dataset_id, deleted)
+        report['deleted'] = len(deleted)
+
+    resp = None
+    for i in range(0, len(changed), batch_size):
+        resp = client._get_data_and_result_info(dataset_id, changed[i: i + batch_size])
+        results = {result['dataId']: result for result in resp['results']}
+        store.upsert(
+            dataset_id,
+            ({'data': data, 'result': results.get(data['id'], {})} for data in resp['data']),
+            versions=listed
+        )
+
+    if resp is not None:
+        store.save_info(dataset_id, resp['datasetName'], resp.get('version'), resp.get('exportTime'))
+    elif store.info(dataset_id) is None:
+        store.save_info(dataset_id, client._query_dataset_info(dataset_id)['name'])
+    store.set_order(dataset_id, order)
+
+    return report
+
+
+def _annotation_of(
+        client,
+        dataset_id: Union[int, str],
+        store: LocalStore,
+        dropna: bool = False,
+        columnar: bool = False
+):
+    info = store.info(dataset_id) or {}
+    return Annotation(
+        client=client,
+        annotation=store.items(dataset_id, dropna=dropna),
+        dataset_name=info.get('datasetName'),
+        version=info.get('version'),
+        dataset_id=dataset_id,
+        export_time=info.get('exportTime'),
+        columnar=columnar
+    )
+
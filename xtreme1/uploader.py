@@ -0,0 +1,344 @@
+import os
+import time
+import threading
+from typing import List, Dict, Union, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed, wait
+
+import requests
+
+from .exceptions import SDKException
+
+
+def _collect_files(
+        paths: Union[str, List[str]]
+) -> List[str]:
+    if isinstance(paths, str):
+        paths = [paths]
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names))
+        else:
+            files.append(path)
+
+    return files
+
+
+class Uploader:
+    """
+    Upload local files to a dataset with a bounded pool of worker threads.
+
+    For every file a worker asks for a presigned url, streams the file to the object store
+    straight from disk (it's never read into memory as a whole), retries failed puts and
+    registers the uploaded object with 'data/upload'.
+    """
+
+    def __init__(
+            self,
+            client,
+            workers: int = 4,
+            max_retries: int = 3,
+            backoff: float = 1.0
+    ):
+        self._client = client
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def _put(
+            self,
+            url: str,
+            file_path: str
+    ) -> int:
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                with open(file_path, 'rb') as f:
+                    resp = self._client.api.file_request('PUT', url, retry=False, data=f)
+                if resp.status_code == 200:
+                    return attempts
+                error = SDKException(code=resp.status_code, message=resp.text)
+                if resp.status_code < 500 and resp.status_code != 429:
+                    raise error
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            if attempts > self.max_retries:
+                raise error
+            time.sleep(self.backoff * 2 ** (attempts - 1))
+
+    def _upload_one(
+            self,
+            file_path: str,
+            dataset_id: Union[int, str]
+    ) -> Dict:
+        record = {
+            'path': file_path,
+            'serial_number': None,
+            'bytes': 0,
+            'elapsed': 0.0,
+            'attempts': 0,
+            'error': None
+        }
+
+        start = time.perf_counter()
+        try:
+            record['bytes'] = os.path.getsize(file_path)
+            url_dict = self._client._generate_data_direct_upload_address(
+                os.path.basename(file_path),
+                dataset_id
+            )
+            record['attempts'] = self._put(url_dict['presignedUrl'], file_path)
+            record['serial_number'] = self._client._upload(url_dict['accessUrl'], dataset_id, 'LOCAL')
+        except Exception as e:
+            record['error'] = repr(e)
+        record['elapsed'] = time.perf_counter() - start
+
+        return record
+
+    def upload(
+            self,
+            paths: Union[str, List[str]],
+            dataset_id: Union[int, str]
+    ) -> Dict:
+        """
+        Upload files and directories to a dataset.
+
+        Parameters
+        ----------
+        paths: Union[str, List[str]]
+            A local file, a directory or a list of them.
+            Every file under a directory is uploaded as a separate copy of data.
+        dataset_id: Union[int, str]
+            The id of the target dataset.
+
+        Returns
+        -------
+        Dict
+            A report with the serial numbers, the throughput and a record for every file.
+        """
+        files = _collect_files(paths)
+
+        start = time.perf_counter()
+        records = [None] * len(files)
+        from rich.progress import track
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(self._upload_one, file, dataset_id): i
+                for i, file in enumerate(files)
+            }
+            for future in track(as_completed(futures), total=len(futures), description='Uploading'):
+                records[futures[future]] = future.result()
+        elapsed = time.perf_counter() - start
+
+        succeeded = [r for r in records if r['error'] is None]
+        total_bytes = sum(r['bytes'] for r in succeeded)
+
+        return {
+            'total': len(records),
+            'succeeded': len(succeeded),
+            'failed': len(records) - len(succeeded),
+            'bytes': total_bytes,
+            'elapsed': elapsed,
+            'mb_per_second': total_bytes / (1 << 20) / elapsed if elapsed else 0.0,
+            'files_per_second': len(succeeded) / elapsed if elapsed else 0.0,
+            'serial_numbers': [r['serial_number'] for r in succeeded],
+            'files': records,
+            'errors': [r for r in records if r['error'] is not None]
+        }
+
+
+class UploadTracker:
+    """
+    Track the parsing status of uploads without busy-polling.
+
+    All outstanding serial numbers are checked with one 'data/findUploadRecordBySerialNumbers'
+    request per tick on a background thread. The interval between ticks starts at 'min_interval',
+    grows by 'backoff' every tick that shows no progress and drops back once anything moves.
+
+    Every tracked serial number gets a `concurrent.futures.Future` which resolves to its final
+    upload record. Check the 'status' of the record: 'PARSE_COMPLETED' or 'FAILED'.
+    If polling fails 'max_errors' times in a row (a bad token, for example), the pending futures
+    are failed with the last error, which `wait()` raises.
+    """
+    FINISHED_STATUS = frozenset({'PARSE_COMPLETED', 'FAILED'})
+
+    def __init__(
+            self,
+            client,
+            min_interval: float = 1.0,
+            max_interval: float = 30.0,
+            backoff: float = 1.5,
+            batch_size: int = 500,
+            max_errors: int = 5
+    ):
+        self._client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self._pending = {}
+        self._states = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add(
+            self,
+            serial_number: Union[str, List[str]],
+            callback: Optional[Callable[[Dict], None]] = None
+    ) -> Union[Future, List[Future]]:
+        """
+        Start tracking one or more serial numbers.
+
+        Parameters
+        ----------
+        serial_number: Union[str, List[str]]
+            A serial number returned by 'upload_data' or a list of them.
+        callback: Optional[Callable[[Dict], None]], default None
+            Called with the final upload record when parsing of an upload finishes.
+
+        Returns
+        -------
+        Union[Future, List[Future]]
+            A future (or a list of futures) resolving to the final upload record.
+        """
+        if isinstance(serial_number, (list, tuple)):
+            return [self.add(sn, callback) for sn in serial_number]
+
+        with self._lock:
+            if self._closed:
+                raise SDKException(code='TrackerClosed', message='This tracker is closed and tracks no more uploads.')
+            future = self._pending.get(serial_number)
+            if future is None:
+                future = Future()
+                self._pending[serial_number] = future
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        if callback:
+            def _on_done(f):
+                if not f.cancelled() and f.exception() is None:
+                    callback(f.result())
+
+            future.add_done_callback(_on_done)
+        self._wake.set()
+
+        return future
+
+    def wait(
+            self,
+            timeout: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Block until every tracked upload has finished parsing.
+
+        Parameters
+        ----------
+        timeout: Optional[float], default None
+            The max seconds to wait.
+
+        Returns
+        -------
+        List[Dict]
+            The final upload records of the uploads that were pending.
+
+        Raises
+        ------
+        Exception
+            The error that kept the status from being polled, if polling gave up.
+        """
+        with self._lock:
+            futures = list(self._pending.values())
+        done, _ = wait(futures, timeout=timeout)
+
+        return [f.result() for f in futures if f in done]
+
+    def close(
+            self
+    ):
+        """
+        Stop the background thread. Unfinished futures are cancelled.
+        """
+        with self._lock:
+            self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+
+    def _poll(
+            self,
+            serial_numbers: List[str]
+    ) -> bool:
+        progress = False
+        for i in range(0, len(serial_numbers), self.batch_size):
+            records = self._client.query_upload_status(serial_numbers[i: i + self.batch_size])
+            for record in records or []:
+                sn = record.get('serialNumber')
+                state = (record.get('status'), record.get('downloadedFileSize'), record.get('parsedDataNum'))
+                if self._states.get(sn) != state:
+                    self._states[sn] = state
+                    progress = True
+                if record.get('status') in self.FINISHED_STATUS:
+                    with self._lock:
+                        future = self._pending.pop(sn, None)
+                    self._states.pop(sn, None)
+                    if future is not None:
+                        future.set_result(record)
+
+        return progress
+
+    def _fail_pending(
+            self,
+            error: Exception
+    ):
+        with self._lock:
+            futures = list(self._pending.values())
+            self._pending.clear()
+        self._states.clear()
+        for future in futures:
+            if not future.cancelled():
+                future.set_exception(error)
+
+    def _run(
+            self
+    ):
+        interval = self.min_interval
+        errors = 0
+        while not self._closed:
+            with self._lock:
+                serial_numbers = list(self._pending)
+            if not serial_numbers:
+                self._wake.wait()
+                self._wake.clear()
+                interval = self.min_interval
+                continue
+
+            try:
+                progress = self._poll(serial_numbers)
+                errors = 0
+            except Exception as e:
+                progress = False
+                errors += 1
+                if errors >= self.max_errors:
+                    # It isn't going to get better: let the callers know why instead of waiting forever.
+                    self._fail_pending(e)
+                    errors = 0
+
+            interval = self.min_interval if progress else min(interval * self.backoff, self.max_interval)
+            self._wake.wait(interval)
+            self._wake.clear()